@@ -3,6 +3,7 @@ import copy
 
 import numpy as np
 
+from pyzzle import Dictionary
 # from pyzzle.solver import SkeltonSolver
 
 
@@ -107,6 +108,7 @@ class SkeltonSolver:
         self.trees = []
         self.cover = np.array(cover)
         self.words = np.array(words)
+        self.dic = Dictionary(list(self.words))
         self.nwords = len(self.words)
         self.wlens = np.array(list(map(len, self.words)))
         self.vertical_cover = ndi.binary_opening(self.cover, structure=[[1],[1]]).astype(int)
@@ -173,7 +175,6 @@ class SkeltonSolver:
                     tmp_words = np.delete(tmp_words, np.where(tmp_words == uword)[0])
                 for _ in range(self.nwords-branch.depth):
                     cell = self.construct_cell_from_branch(branch)
-                    tmp_wlens = np.array(list(map(len, tmp_words)))
 
                     # get an edge
                     edges = self.find_any_edge(cell, self.cover)
@@ -184,15 +185,9 @@ class SkeltonSolver:
                         break
                     edge = edges[0]
                     # get useable_words
-                    useable_words = []
-                    for potential_word in tmp_words[tmp_wlens == edge["len"]]:
-                        use_this = True
-                        for ind, char in edge["cross"].items():
-                            if char != "" and potential_word[ind] != char:
-                                use_this = False
-                                break
-                        if use_this:
-                            useable_words.append(potential_word)
+                    pattern = [edge["cross"].get(ind, "") for ind in range(edge["len"])]
+                    remaining = set(tmp_words.tolist())
+                    useable_words = [self.dic.words[k] for k in self.dic.match(pattern) if self.dic.words[k] in remaining]
                     if len(useable_words) == 0:
                         # branch.completed = True
                         tree.remove(branch)
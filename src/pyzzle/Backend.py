@@ -0,0 +1,175 @@
+from abc import ABCMeta, abstractmethod
+import importlib
+import importlib.util
+import logging
+
+LOG = logging.getLogger(__name__)
+
+
+class Backend(metaclass=ABCMeta):
+    """
+    Compute backend of the hot loops of the search.
+
+    A backend judges the placeability of Placeable candidates, adds the words
+    as much as possible and makes a neighbor of the local search.
+    All the backends draw the same random numbers, so that they give the same
+    puzzle for the same seed.
+    The objective functions are served by the running counters of ``Puzzle``
+    and have no backend of their own.
+    """
+    name = None
+
+    @classmethod
+    def is_available(cls):
+        """Whether the backend can run in this environment."""
+        return True
+
+    @abstractmethod
+    def is_placeable(self, puzzle, candidates):
+        """
+        Returns the word placeability of Placeable candidates.
+
+        Parameters
+        ----------
+        puzzle : Puzzle
+            Puzzle to judge on
+        candidates : array_like
+            Candidate numbers in the Placeable
+
+        Returns
+        -------
+        result : ndarray
+            int8 numbers of the judgment results, same as ``Puzzle.is_placeable``
+        """
+        pass
+
+    @abstractmethod
+    def add_to_limit(self, puzzle):
+        """Adds the words to ``puzzle`` as much as possible."""
+        pass
+
+    @abstractmethod
+    def neighbor(self, puzzle):
+        """Drops and kicks words of ``puzzle`` and adds the words as much as possible."""
+        pass
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+class NumpyBackend(Backend):
+    """The methods of ``Puzzle`` in Python and NumPy. Always available."""
+    name = "numpy"
+
+    def is_placeable(self, puzzle, candidates):
+        return puzzle.is_placeable_batch(candidates)
+
+    def add_to_limit(self, puzzle):
+        puzzle.add_to_limit()
+
+    def neighbor(self, puzzle):
+        if puzzle.nwords >= 1:
+            puzzle.collapse()
+            puzzle.kick()
+        puzzle.add_to_limit()
+
+
+class KernelBackend(Backend):
+    """
+    Backend of a kernel module with the interface of ``futils``
+    (``judge``, ``add_to_limit`` and ``epoch``).
+    """
+    module = None
+
+    @classmethod
+    def is_available(cls):
+        try:
+            importlib.import_module(cls.module)
+        except ImportError as err:
+            LOG.debug(str(err))
+            return False
+        return True
+
+    @property
+    def kernels(self):
+        return importlib.import_module(self.module)
+
+    def is_placeable(self, puzzle, candidates):
+        return puzzle._judge_kernel(self.kernels, candidates)
+
+    def add_to_limit(self, puzzle):
+        puzzle._add_to_limit_kernel(self.kernels, puzzle._visiting_order())
+
+    def neighbor(self, puzzle):
+        puzzle._neighbor_kernel(self.kernels)
+
+
+class FortranBackend(KernelBackend):
+    """The f2py Fortran kernels, built with GCC and GFortran."""
+    name = "fortran"
+    module = "pyzzle.futils"
+
+
+class NumbaBackend(KernelBackend):
+    """The Numba JIT kernels. Requires Numba."""
+    name = "numba"
+    module = "pyzzle.nbutils"
+
+    @classmethod
+    def is_available(cls):
+        return importlib.util.find_spec("numba") is not None and super().is_available()
+
+
+# Backends by name, in the order of preference of "auto"
+BACKENDS = {
+    FortranBackend.name: FortranBackend,
+    NumbaBackend.name: NumbaBackend,
+    NumpyBackend.name: NumpyBackend,
+}
+
+
+def register_backend(backend):
+    """
+    Register a backend class under its ``name``.
+
+    Parameters
+    ----------
+    backend : type
+        Subclass of ``Backend``
+    """
+    if not (isinstance(backend, type) and issubclass(backend, Backend)) or not backend.name:
+        raise TypeError(f"backend must be a named subclass of Backend, not {backend!r}")
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+def available_backends():
+    """Returns the names of the backends available in this environment, in the order of preference."""
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def get_backend(name="auto"):
+    """
+    Returns a backend.
+
+    Parameters
+    ----------
+    name : str or Backend, default "auto"
+        Name of the backend. "auto" picks the first available one of
+        "fortran", "numba" and "numpy". A ``Backend`` is returned as it is.
+
+    Returns
+    -------
+    backend : Backend
+    """
+    if isinstance(name, Backend):
+        return name
+    if name == "auto":
+        name = available_backends()[0]
+        LOG.debug(f"Backend: {name}")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}")
+    if not BACKENDS[name].is_available():
+        raise ImportError(f"The {name} backend is not available.\n"
+                          "The fortran backend needs GCC and GFortran when installing pyzzle, and the numba backend needs Numba.")
+    return BACKENDS[name]()
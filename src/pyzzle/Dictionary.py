@@ -1,6 +1,9 @@
 import os
 import sys
 import copy
+import json
+import hashlib
+import tempfile
 from glob import glob
 from pathlib import PurePath
 import collections
@@ -9,26 +12,132 @@ import numpy as np
 
 from pyzzle.Word import Word
 
+# Compiled dictionary format: magic, header length, JSON header and the arrays aligned to ALIGN bytes
+COMPILED_MAGIC = b"PYZZLEDICT\n"
+COMPILED_VERSION = 1
+COMPILED_SUFFIX = ".pyzd"
+ALIGN = 64
+
+
+def _write_arrays(fname, header, arrays):
+    """Write arrays with a JSON header to a compiled file, replacing it atomically."""
+    header = dict(header, arrays={})
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = [array.dtype.str, list(array.shape), offset]
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    encoded = json.dumps(header).encode()
+    start = -(-(len(COMPILED_MAGIC) + 8 + len(encoded)) // ALIGN) * ALIGN
+    encoded += b" " * (start - len(COMPILED_MAGIC) - 8 - len(encoded))
+    f = tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(fname)), delete=False)
+    try:
+        with f:
+            f.write(COMPILED_MAGIC + len(encoded).to_bytes(8, "little") + encoded)
+            for name, array in arrays.items():
+                f.seek(start + header["arrays"][name][2])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate(start + offset)
+        # NamedTemporaryFile is private to its owner, give the file the permissions of the umask
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(f.name, 0o666 & ~umask)
+        os.replace(f.name, fname)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+
+def _readonly(array):
+    """Return a read-only view of an array."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def _map_arrays(fname):
+    """Return the header and the copy-on-write memory maps of the arrays of a compiled file."""
+    with open(fname, "rb") as f:
+        if f.read(len(COMPILED_MAGIC)) != COMPILED_MAGIC:
+            raise ValueError(f"{fname} is not a compiled dictionary")
+        length = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(length))
+    if header.get("version") != COMPILED_VERSION:
+        raise ValueError(f"{fname} has version {header.get('version')}, not {COMPILED_VERSION}")
+    start = len(COMPILED_MAGIC) + 8 + length
+    arrays = {}
+    for name, (dtype, shape, offset) in header["arrays"].items():
+        if np.prod(shape) == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(fname, dtype=dtype, mode="c", offset=start + offset, shape=tuple(shape))
+    return header, arrays
+
 
 class Dictionary:
     class Dataset:
+        """
+        Catalog of the bundled dictionaries.
+
+        The dictionaries are listed on first use. The ones read are kept in an LRU cache
+        of at most ``max_bytes`` bytes, and each lookup returns a copy-on-write view of
+        the cached Dictionary, so that modifying it leaves the cache intact.
+        """
         dict_dir = str(PurePath(__file__).parent/PurePath("dict"))
-        dict_list = list(map(lambda x: PurePath(x).stem, glob(f"{dict_dir}/*.txt")))
+
+        def __init__(self, max_bytes=64 * 2**20):
+            self.max_bytes = max_bytes
+            self._dict_list = None
+            # Name -> (Dictionary, size in bytes), from the least recently used
+            self._cache = collections.OrderedDict()
+            self._nbytes = 0
+
+        @property
+        def dict_list(self):
+            if self._dict_list is None:
+                self._dict_list = sorted(PurePath(x).stem for x in glob(f"{self.dict_dir}/*.txt"))
+            return self._dict_list
 
         def __getattr__(self, key):
-            if key not in self.dict_list:
+            if key.startswith("_") or key not in self.dict_list:
                 raise AttributeError(f"{key} must be an element of the 'dict_list'")
-            return Dictionary(f"{self.dict_dir}/{key}.txt")
+            return self[key]
 
         def __getitem__(self, key):
-            return Dictionary(f"{self.dict_dir}/{key}.txt")
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return copy.copy(self._cache[key][0])
+            dic = Dictionary(f"{self.dict_dir}/{key}.txt")
+            nbytes = sys.getsizeof(dic)
+            self._cache[key] = (dic, nbytes)
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                _, (_, nbytes) = self._cache.popitem(last=False)
+                self._nbytes -= nbytes
+            return copy.copy(dic)
+
+        def clear(self):
+            """Empty the cache."""
+            self._cache.clear()
+            self._nbytes = 0
 
     dataset = Dataset()
+    # Cache the text files read as compiled files in ``cache_dir``. Off by default, so that reading has no side effect
+    cache_compiled = False
+    # Directory of the cache. $XDG_CACHE_HOME/pyzzle or ~/.cache/pyzzle by default
+    cache_dir = None
 
     def __init__(self, dict_specifier=None, words=None, weight=None):
         self.dict_specifier = dict_specifier
         self.words = []
         self.removed_words = []
+        # Number of each word in ``words``, and the weights and the lengths in that order
+        self._ids = {}
+        self._weights = np.empty(0)
+        self._lens = np.empty(0, dtype=np.int16)
+        self._buckets = None
+        self._letter_counts = None
+        self._pattern_index = None
+        self._shared = False
         self._i = 0
         if isinstance(dict_specifier, (list, np.ndarray)):
             self.add(dict_specifier)
@@ -38,7 +147,37 @@ class Dictionary:
             self.add(words, weight)
 
     def __sizeof__(self):
-        return sys.getsizeof(self.words) + sys.getsizeof(self.removed_words)
+        return (sys.getsizeof(self.words) + sum(map(sys.getsizeof, self.words)) + sys.getsizeof(self.removed_words)
+                + sys.getsizeof(self._ids) + self._weights.nbytes + self._lens.nbytes)
+
+    def __copy__(self):
+        """Return a view sharing the words with this Dictionary until either of them is modified."""
+        dic = self.__class__.__new__(self.__class__)
+        dic.__dict__.update(self.__dict__)
+        dic.removed_words = list(self.removed_words)
+        dic._i = 0
+        self._shared = dic._shared = True
+        return dic
+
+    def __deepcopy__(self, memo):
+        dic = self.__class__.__new__(self.__class__)
+        memo[id(self)] = dic
+        for key, value in self.__dict__.items():
+            setattr(dic, key, copy.deepcopy(value, memo))
+        dic._weights = np.array(self._weights)
+        dic._lens = np.array(self._lens)
+        dic._shared = False
+        return dic
+
+    def _unshare(self):
+        """Take private copies of the words and the columns shared with other views."""
+        if not self._shared:
+            return
+        self.words = [Word(word, word.weight) for word in self.words]
+        self._ids = dict(self._ids)
+        self._weights = np.array(self._weights)
+        self._lens = np.array(self._lens)
+        self._shared = False
 
     @property
     def size(self):
@@ -46,20 +185,126 @@ class Dictionary:
 
     @property
     def weight(self):
-        return list(map(lambda x: x.weight, self.words))
+        """Weights of the words as a read-only float64 view."""
+        weight = self._weights[:self.size]
+        weight.flags.writeable = False
+        return weight
 
     @property
     def w_len(self):
-        return list(map(len, self.words))
+        """Lengths of the words as a read-only int16 view."""
+        w_len = self._lens[:self.size]
+        w_len.flags.writeable = False
+        return w_len
+
+    @property
+    def buckets(self):
+        """
+        Numbers of the words of each length, in order of the first appearance of the lengths.
+
+        Returns
+        -------
+        buckets : dict
+            Read-only ascending int64 arrays of the word numbers by length
+        """
+        if self._buckets is None:
+            w_len = self.w_len
+            order = np.argsort(w_len, kind="stable")
+            starts = np.flatnonzero(np.diff(w_len[order], prepend=-1))
+            groups = sorted(np.split(order, starts[1:]), key=lambda ks: ks[0]) if self.size else []
+            self._buckets = {int(w_len[ks[0]]): _readonly(ks) for ks in groups}
+        return self._buckets
+
+    def _build_pattern_index(self):
+        """Build the sorted numbers of the words by (length, offset, letter)."""
+        index = {}
+        for l, ks in self.buckets.items():
+            codes = np.frombuffer("".join(self.words[k] for k in ks.tolist()).encode("utf-32-le"), dtype="<u4")
+            codes = codes.reshape(ks.size, l)
+            for p in range(l):
+                order = np.argsort(codes[:, p], kind="stable")
+                letters = codes[order, p]
+                starts = np.flatnonzero(np.diff(letters, prepend=-1))
+                ends = np.append(starts[1:], letters.size)
+                for a, b in zip(starts.tolist(), ends.tolist()):
+                    index[(l, p, chr(letters[a]))] = _readonly(ks[order[a:b]])
+        self._pattern_index = index
+
+    def match(self, pattern, wildcard="?"):
+        """
+        Return the numbers of the words matching a pattern such as "?A??E".
+
+        Parameters
+        ----------
+        pattern : str or sequence of str
+            Letters of the word, where ``wildcard``, "" or None matches any letter.
+            A row or a column of ``Puzzle.cell`` can be given as it is.
+        wildcard : str, default "?"
+            Letter that matches any letter
+
+        Returns
+        -------
+        ks : ndarray
+            Read-only ascending int64 numbers of the matching words in ``words``
+        """
+        if self._pattern_index is None:
+            self._build_pattern_index()
+        l = len(pattern)
+        fixed = [(p, c) for p, c in enumerate(pattern) if c not in (wildcard, "", None)]
+        if not fixed:
+            return _readonly(self.buckets.get(l, np.empty(0, dtype=np.int64)))
+        lists = [self._pattern_index.get((l, p, c)) for p, c in fixed]
+        if any(ks is None for ks in lists):
+            return _readonly(np.empty(0, dtype=np.int64))
+        # Intersect from the shortest list
+        lists.sort(key=len)
+        ks = lists[0]
+        for other in lists[1:]:
+            if ks.size == 0:
+                break
+            ks = np.intersect1d(ks, other, assume_unique=True)
+        return _readonly(ks)
+
+    def match_batch(self, patterns, wildcard="?"):
+        """
+        Return the numbers of the words matching each pattern. See ``match``.
+
+        Parameters
+        ----------
+        patterns : iterable of str or of sequence of str
+            Patterns
+        wildcard : str, default "?"
+            Letter that matches any letter
+
+        Returns
+        -------
+        ks : list of ndarray
+            Numbers of the matching words for each pattern
+        """
+        results = {}
+        matched = []
+        for pattern in patterns:
+            key = tuple(c if c not in ("", None) else wildcard for c in pattern)
+            if key not in results:
+                results[key] = self.match(key, wildcard=wildcard)
+            matched.append(results[key])
+        return matched
+
+    @property
+    def letter_counts(self):
+        """Number of occurrences of each letter in the words, as a Counter."""
+        if self._letter_counts is None:
+            self._letter_counts = collections.Counter("".join(self.words))
+        return self._letter_counts
 
     def __getitem__(self, key):
-        return {'word': self.words[key], 'weight': self.words[key].weight, 'len': self.w_len[key]}
+        return {'word': self.words[key], 'weight': self.words[key].weight, 'len': int(self.w_len[key])}
 
     def __repr__(self):
-        return str({"words": self.words, "weight": self.weight})
+        return str({"words": self.words, "weight": self.weight.tolist()})
 
     def __str__(self):
-        return str({"words": self.words, "weight": self.weight})
+        return str({"words": self.words, "weight": self.weight.tolist()})
 
     def __len__(self):
         return self.size
@@ -100,10 +345,29 @@ class Dictionary:
         return word, word.weight
 
     def get_k(self, word):
-        return np.where(self.words == word)[0][0]
+        return self._ids[word]
 
     def include(self, word):
-        return word in self.words
+        return word in self._ids
+
+    def _extend(self, words):
+        """Append new words, whose numbers are already in ``_ids``, to the words and the columns."""
+        n, m = len(self.words), len(words)
+        if n + m > len(self._weights):
+            # Double the capacity of the columns
+            capacity = max(n + m, 2 * len(self._weights))
+            self._weights = np.resize(self._weights, capacity)
+            self._lens = np.resize(self._lens, capacity)
+        self._weights[n:n + m] = [word.weight for word in words]
+        self._lens[n:n + m] = [len(word) for word in words]
+        self.words.extend(words)
+        self._buckets = self._letter_counts = self._pattern_index = None
+
+    def _reset(self, words):
+        """Replace the words, renumbering them in order."""
+        self.words = []
+        self._ids = {word: k for k, word in enumerate(words)}
+        self._extend(words)
 
     def add(self, words=None, weight=None, dict_specifier=None):
         if words is None and dict_specifier is None:
@@ -121,25 +385,63 @@ class Dictionary:
                 weight = [weight]
             if len(words) != len(weight):
                 raise ValueError(f"'words' and 'weight' must be same size")
+            self._unshare()
+            n = len(self.words)
+            new_words = []
             for wo, we in zip(words, weight):
                 wo = wo.strip()
-                if self.include(wo): # replace the weight
-                    self.words[self.words.index(wo)].weight = we
+                k = self._ids.get(wo)
+                if k is None:
+                    self._ids[wo] = n + len(new_words)
+                    new_words.append(Word(wo, we))
+                elif k < n: # replace the weight
+                    self.words[k].weight = we
+                    self._weights[k] = we
                 else:
-                    self.words.append(Word(wo, we))
+                    new_words[k - n].weight = we
+            self._extend(new_words)
 
     def remove(self, words=None):
         if words is None:
             raise ValueError("'words' must be specified")
         if isinstance(words, str):
             words = [words]
-        for wo in words:
-            if self.include(wo):
-                index = self.words.index(wo)
-                del self.words[index]
-                del self.weight[index]
+        self._unshare()
+        ks = sorted({self._ids.pop(wo) for wo in words if wo in self._ids})
+        if not ks:
+            return
+        # Close up the words after the first removed one, keeping their order
+        start = ks[0]
+        keep = np.ones(self.size - start, dtype=bool)
+        keep[np.array(ks) - start] = False
+        kept = start + np.flatnonzero(keep)
+        end = start + kept.size
+        self.words[start:] = [self.words[k] for k in kept.tolist()]
+        self._weights[start:end] = self._weights[kept]
+        self._lens[start:end] = self._lens[kept]
+        for k in range(start, end):
+            self._ids[self.words[k]] = k
+        self._buckets = self._letter_counts = self._pattern_index = None
 
     def read(self, dict_specifier):
+        if dict_specifier.endswith(COMPILED_SUFFIX):
+            dic = self.load_compiled(dict_specifier)
+        else:
+            dic = self._load_cache(dict_specifier)
+        if dic is None:
+            dic = self.__class__()
+            dic.add(*self._parse(dict_specifier))
+            dic._save_cache(dict_specifier)
+        if self.size == 0:
+            # Take over the words and the columns
+            for name in ("words", "_ids", "_weights", "_lens", "_buckets", "_letter_counts", "_pattern_index"):
+                setattr(self, name, getattr(dic, name))
+        else:
+            self.add(dic.words, [word.weight for word in dic.words])
+
+    @staticmethod
+    def _parse(dict_specifier):
+        """Return the words and the weights in a text file."""
         with open(dict_specifier, 'r', encoding='utf-8-sig') as f:
             data = f.read().splitlines()
         data = [l for l in data if l != ""]
@@ -152,29 +454,161 @@ class Dictionary:
         dic_list = list(map(get_word_and_weight, data))
         word = [d[0] for d in dic_list]
         weight = [d[1] for d in dic_list]
-        self.add(word, weight)
+        return word, weight
+
+    @staticmethod
+    def _source_stat(dict_specifier):
+        stat = os.stat(dict_specifier)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    @classmethod
+    def _cache_path(cls, dict_specifier):
+        """Return the path of the cache of a text file in ``cache_dir``."""
+        cache_dir = cls.cache_dir
+        if cache_dir is None:
+            cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "pyzzle")
+        path = os.path.abspath(dict_specifier)
+        digest = hashlib.sha1(path.encode()).hexdigest()[:16]
+        return os.path.join(cache_dir, f"{os.path.basename(path)}-{digest}{COMPILED_SUFFIX}")
+
+    def _load_cache(self, dict_specifier):
+        """
+        Return the Dictionary of an up-to-date compiled file of a text file, else None.
+
+        The file compiled next to the text file by ``compile`` is used first, then the cache in ``cache_dir``.
+        """
+        fnames = [dict_specifier + COMPILED_SUFFIX]
+        if self.cache_compiled:
+            fnames.append(self._cache_path(dict_specifier))
+        for fname in fnames:
+            if not os.path.exists(fname):
+                continue
+            try:
+                dic = self.load_compiled(fname)
+            except (OSError, ValueError, KeyError):
+                continue
+            if dic._source == self._source_stat(dict_specifier):
+                return dic
+        return None
+
+    def _save_cache(self, dict_specifier):
+        """Write the words read from a text file to the cache in ``cache_dir``, if enabled and possible."""
+        if not self.cache_compiled:
+            return
+        fname = self._cache_path(dict_specifier)
+        try:
+            os.makedirs(os.path.dirname(fname), exist_ok=True)
+            self._write_compiled(fname, source=self._source_stat(dict_specifier))
+        except OSError:
+            pass
+
+    def _write_compiled(self, fname, source=None):
+        lens = self.w_len.astype(np.int64)
+        buckets = self.buckets
+        letters = sorted(self.letter_counts)
+        arrays = {
+            "codes": np.frombuffer("".join(self.words).encode("utf-32-le"), dtype="<u4"),
+            "offsets": np.concatenate([[0], np.cumsum(lens)]).astype("<i8"),
+            "weights": self.weight.astype("<f8"),
+            "lens": self.w_len.astype("<i2"),
+            "bucket_lens": np.array(list(buckets), dtype="<i8"),
+            "bucket_offsets": np.concatenate([[0], np.cumsum([len(ks) for ks in buckets.values()])]).astype("<i8"),
+            "bucket_ids": np.concatenate([np.empty(0, dtype=np.int64)] + list(buckets.values())).astype("<i8"),
+            "letters": np.array(list(map(ord, letters)), dtype="<u4"),
+            "letter_counts": np.array([self.letter_counts[c] for c in letters], dtype="<i8"),
+        }
+        integral = all(isinstance(word.weight, (int, np.integer)) for word in self.words)
+        _write_arrays(fname, {"version": COMPILED_VERSION, "integral_weights": integral, "source": source}, arrays)
+
+    @classmethod
+    def compile(cls, dict_specifier, fname=None):
+        """
+        Compile a dictionary text file into a binary file loaded by ``load_compiled``.
+
+        The file holds the codepoints of the words in a buffer with their offsets,
+        the weights, the lengths, the length buckets and the letter counts.
+
+        Parameters
+        ----------
+        dict_specifier : str
+            Path of the text file
+        fname : str, optional
+            Path of the compiled file. ``dict_specifier + ".pyzd"`` by default,
+            which ``read`` loads instead of the text file while it is up to date.
+
+        Returns
+        -------
+        fname : str
+            Path of the compiled file
+        """
+        if fname is None:
+            fname = dict_specifier + COMPILED_SUFFIX
+        dic = cls()
+        dic.add(*cls._parse(dict_specifier))
+        dic._write_compiled(fname, source=cls._source_stat(dict_specifier))
+        return fname
+
+    @classmethod
+    def load_compiled(cls, fname):
+        """
+        Load a dictionary compiled by ``compile``.
+
+        The weights, the lengths and the buckets are memory-mapped copy-on-write,
+        so that processes loading the same file share their pages.
+
+        Parameters
+        ----------
+        fname : str
+            Path of the compiled file
+
+        Returns
+        -------
+        dic : Dictionary
+        """
+        header, arrays = _map_arrays(fname)
+        text = arrays["codes"].tobytes().decode("utf-32-le")
+        offsets = arrays["offsets"].tolist()
+        weights = arrays["weights"].tolist()
+        if header["integral_weights"]:
+            weights = list(map(int, weights))
+        dic = cls()
+        dic.dict_specifier = fname
+        dic.words = [Word(text[a:b], we) for a, b, we in zip(offsets, offsets[1:], weights)]
+        dic._ids = dict(zip(dic.words, range(len(dic.words))))
+        dic._weights = arrays["weights"]
+        dic._lens = arrays["lens"]
+        bucket_offsets = arrays["bucket_offsets"].tolist()
+        dic._buckets = {l: _readonly(arrays["bucket_ids"][a:b]) for l, a, b in
+                        zip(arrays["bucket_lens"].tolist(), bucket_offsets, bucket_offsets[1:])}
+        dic._letter_counts = collections.Counter(dict(zip(map(chr, arrays["letters"].tolist()),
+                                                          arrays["letter_counts"].tolist())))
+        dic._source = header["source"]
+        return dic
 
     def delete_unusable_words(self):
         """
         This method checks words in the dictionary and erases words that can not cross any other words.
         """
-        merged_words = "".join(self.words)
-        counts = collections.Counter(merged_words)
-        for i, w in enumerate(self.words[:]):
+        counts = self.letter_counts
+        self._unshare()
+        usable_words = []
+        for w in self.words:
             char_value = 0
             for char in set(w):
                 char_value += counts[char]
             if char_value == len(w):
                 self.removed_words.append(w)
-                del self.words[i]
+            else:
+                usable_words.append(w)
+        self._reset(usable_words)
 
     def calc_weight(self):
         """
         Calculate word weights in the dictionary.
         """
-        merged_words = "".join(self.words)
-        counts = collections.Counter(merged_words)
-
+        counts = self.letter_counts
+        self._unshare()
         for i, w in enumerate(self.words):
             for char in w:
                 self.words[i].weight += counts[char]
+        self._weights[:self.size] = [w.weight for w in self.words]
@@ -1,5 +1,9 @@
+import bisect
+import copy
 from enum import Enum
 
+import numpy as np
+
 
 class HistoryCode(Enum):
     """
@@ -50,4 +54,213 @@ class HistoryItemMove(HistoryItem):
         return self[1]
     @property
     def n(self):
-        return self[2]
\ No newline at end of file
+        return self[2]
+
+_CODES = {code.value: code for code in HistoryCode}
+
+
+class _Entries:
+    """Preallocated columns of a History, shared by its copies."""
+    def __init__(self, capacity):
+        self.codes = np.zeros(capacity, dtype=np.int8)
+        self.oris = np.zeros(capacity, dtype=np.int8)
+        self.i = np.zeros(capacity, dtype=np.int32)
+        self.j = np.zeros(capacity, dtype=np.int32)
+        self.words = np.zeros(capacity, dtype=np.int32)
+        self.size = 0
+        # The largest size of the copies sharing the columns
+        self.pinned = 0
+
+    def take(self, size, capacity):
+        """Return new columns with the first ``size`` entries of these."""
+        entries = _Entries(capacity)
+        for name in ("codes", "oris", "i", "j", "words"):
+            getattr(entries, name)[:size] = getattr(self, name)[:size]
+        entries.size = size
+        return entries
+
+
+class History:
+    """
+    History of the operations on a puzzle, as a sequence of HistoryItem.
+
+    The entries are kept in NumPy columns of the code, ori, i, j and a number of the word
+    (direction and n for a move), which double their capacity when they are full.
+    A snapshot of the board can be stored every ``interval`` entries, so that a past state
+    is restored from the nearest snapshot by replaying less than about ``interval`` entries.
+    Copies share the columns until one of them appends an entry.
+    """
+    def __init__(self, items=(), interval=64, capacity=64):
+        """
+        Parameters
+        ----------
+        items : iterable of HistoryItem, optional
+            Initial entries
+        interval : int, default 64
+            Number of entries between the snapshots
+        capacity : int, default 64
+            Number of entries allocated first
+        """
+        self.interval = interval
+        self._entries = _Entries(max(capacity, 1))
+        self._size = 0
+        # Words numbered in order of appearance, shared by the copies
+        self._words = []
+        self._word_ids = {}
+        # (size, state) in ascending order of the size
+        self._snapshots = []
+        self.extend(items)
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return f"History(size={self._size}, snapshots={len(self._snapshots)})"
+
+    def __copy__(self):
+        history = self.__class__.__new__(self.__class__)
+        history.__dict__.update(self.__dict__)
+        history._snapshots = list(self._snapshots)
+        self._entries.pinned = max(self._entries.pinned, self._size)
+        return history
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def __getstate__(self):
+        # Pickle the entries in use only
+        state = self.__dict__.copy()
+        state["_entries"] = self._entries.take(self._size, max(self._size, 1))
+        return state
+
+    def __eq__(self, other):
+        if isinstance(other, History):
+            return len(self) == len(other) and self.startswith(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def _item(self, code, ori, i, j, word):
+        code = _CODES[code]
+        if code == HistoryCode.MOVE:
+            return HistoryItemMove(code, ori, i)
+        return HistoryItem(code, ori, i, j, self._words[word])
+
+    def _columns(self, stop):
+        entries = self._entries
+        return (entries.codes[:stop], entries.oris[:stop], entries.i[:stop], entries.j[:stop], entries.words[:stop])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._size)
+            return [self._item(*entry) for entry in
+                    zip(*(column[start:stop:step].tolist() for column in self._columns(self._size)))]
+        n = range(self._size)[key]
+        return self._item(*(column[n].item() for column in self._columns(self._size)))
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __delitem__(self, key):
+        if not isinstance(key, slice) or key.step not in (None, 1) or key.indices(self._size)[1] != self._size:
+            raise ValueError("Only the tail of a history can be deleted")
+        self.truncate(key.indices(self._size)[0])
+
+    def append(self, item):
+        """
+        Append an entry.
+
+        Parameters
+        ----------
+        item : HistoryItem or HistoryItemMove
+            Entry to append
+        """
+        entries = self._entries
+        capacity = len(entries.codes)
+        if entries.size != self._size or self._size == capacity:
+            # Another copy has appended to the shared columns, or they are full
+            new_capacity = capacity * 2 if self._size == capacity else capacity
+            entries = self._entries = entries.take(self._size, new_capacity)
+        n = self._size
+        entries.codes[n] = item.code.value
+        entries.oris[n] = item[1]
+        entries.i[n] = item[2]
+        if item.code == HistoryCode.MOVE:
+            entries.j[n] = entries.words[n] = -1
+        else:
+            word = item.word
+            key = (word, getattr(word, "weight", None))
+            if key not in self._word_ids:
+                self._word_ids[key] = len(self._words)
+                self._words.append(word)
+            entries.j[n] = item.j
+            entries.words[n] = self._word_ids[key]
+        entries.size = self._size = n + 1
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def truncate(self, size):
+        """
+        Keep the first ``size`` entries and the snapshots taken within them.
+
+        Parameters
+        ----------
+        size : int
+            Number of entries to keep
+        """
+        if size >= self._size:
+            return
+        entries = self._entries
+        if entries.size == self._size and entries.pinned <= size:
+            # No copy sees the dropped entries, so they can be overwritten
+            entries.size = size
+        self._size = size
+        while self._snapshots and self._snapshots[-1][0] > size:
+            self._snapshots.pop()
+
+    def head(self, size):
+        """Return a copy with the first ``size`` entries."""
+        history = copy.copy(self)
+        history.truncate(size)
+        return history
+
+    def startswith(self, other):
+        """Return True if ``other`` is the beginning of this history."""
+        n = len(other)
+        if n > self._size:
+            return False
+        if isinstance(other, History) and other._words is self._words:
+            return all(np.array_equal(a, b) for a, b in zip(self._columns(n), other._columns(n)))
+        return self[:n] == list(other)
+
+    def due(self):
+        """Return True if a snapshot should be taken after the last entry."""
+        last = self._snapshots[-1][0] if self._snapshots else 0
+        return self._size - last >= self.interval
+
+    def snapshot(self, state):
+        """
+        Store a snapshot of the state after the last entry.
+
+        Parameters
+        ----------
+        state : object
+            State to restore the puzzle from, which is not modified afterwards
+        """
+        self._snapshots.append((self._size, state))
+
+    def restore_point(self, idx):
+        """
+        Return the nearest snapshot at or before the ``idx``-th entry.
+
+        Returns
+        -------
+        size : int
+            Number of entries the snapshot was taken after, 0 if there is none
+        state : object
+            State of the snapshot, None if there is none
+        """
+        n = bisect.bisect_right([size for size, _ in self._snapshots], idx)
+        return self._snapshots[n - 1] if n > 0 else (0, None)
@@ -1,6 +1,8 @@
 import numpy as np
 from scipy import ndimage
 
+from pyzzle.Exception import ZeroSizePuzzleException
+
 
 class ObjectiveFunction:
     flist = [
@@ -49,7 +51,7 @@ class ObjectiveFunction:
     @classmethod
     def cross_count(self, puzzle):
         """This method returns the number of crosses of a word."""
-        return int(np.sum(puzzle.cover == 2))
+        return int(puzzle.cross_count)
 
     @classmethod
     def cross_rate(self, puzzle):
@@ -59,7 +61,7 @@ class ObjectiveFunction:
     @classmethod
     def fill_count(self, puzzle):
         """This method returns the number of character cells in the puzzle."""
-        return int(np.sum(puzzle.cover >= 1))
+        return int(puzzle.fill_count)
 
     @classmethod
     def weight(self, puzzle):
@@ -69,28 +71,30 @@ class ObjectiveFunction:
     @classmethod
     def max_connected_empties(self, puzzle):
         """This method returns the maximum number of concatenations for unfilled squares."""
-        reverse_cover = puzzle.cover < 1
-        zero_label, n_label = ndimage.label(reverse_cover)
-        mask = zero_label > 0
-        sizes = ndimage.sum(mask, zero_label, range(n_label+1))
-        score = puzzle.width*puzzle.height - sizes.max()
-        return int(score)
+        def func():
+            reverse_cover = puzzle.cover < 1
+            zero_label, n_label = ndimage.label(reverse_cover)
+            mask = zero_label > 0
+            sizes = ndimage.sum(mask, zero_label, range(n_label+1))
+            score = puzzle.width*puzzle.height - sizes.max()
+            return int(score)
+        return puzzle._cached("max_connected_empties", func)
 
     @classmethod
     def difficulty(self, puzzle):
-        return float(puzzle.difficulty)
+        return float(puzzle._cached("difficulty", lambda: puzzle.difficulty))
 
     @classmethod
     def ease(self, puzzle):
-        return float(1 - puzzle.difficulty)
+        return float(1 - puzzle._cached("difficulty", lambda: puzzle.difficulty))
 
     @classmethod
     def circulation(self, puzzle):
-        return int(puzzle.circulation)
+        return int(puzzle._cached("circulation", lambda: puzzle.circulation))
 
     @classmethod
     def gravity(self, puzzle):
-        return float(puzzle.gravity[puzzle.cover != 0].sum())
+        return float(puzzle.gravity_sum)
 
     @classmethod
     def uniqueness(self, puzzle):
@@ -98,7 +102,11 @@ class ObjectiveFunction:
     
     @classmethod
     def area_rect(self, puzzle):
-        return int(puzzle.cell.size - puzzle.rect.size)
+        try:
+            r_min, r_max, c_min, c_max = puzzle._get_rect()
+        except ZeroSizePuzzleException:
+            return int(puzzle.size)
+        return int(puzzle.size - (r_max - r_min + 1)*(c_max - c_min + 1))
 
     @classmethod
     def nwords_r(self, puzzle):
@@ -156,23 +164,85 @@ class ObjectiveFunction:
 
     def register(self, func_names):
         """
-        This method registers an objective function in an instance
+        This method registers an objective function in an instance.
+
+        Parameters
+        ----------
+        func_names : list of str or callable
+            Names in ``ObjectiveFunction.flist`` or callables that take a Puzzle
+            and return a number. The callables are registered by their ``__name__``.
+            A custom score must only depend on the board,
+            since it is cached until the board changes.
         """
+        names = []
+        scorers = []
         for func_name in func_names:
+            if callable(func_name):
+                names.append(func_name.__name__)
+                scorers.append((func_name, 1))
+                continue
             if func_name not in ObjectiveFunction.flist:
                 raise RuntimeError(f"ObjectiveFunction class does not have '{func_name}' function")
-        self.registered_funcs = func_names
+            names.append(func_name)
+            # The reversed functions are the base functions with a negative sign
+            if func_name.endswith("_r"):
+                scorers.append((getattr(ObjectiveFunction, func_name[:-2]), -1))
+            else:
+                scorers.append((getattr(ObjectiveFunction, func_name), 1))
+        self.registered_funcs = names
+        self._scorers = tuple(scorers)
+
+    def _evaluate(self, puzzle):
+        """Return the scores as a tuple of Python numbers and as a read-only float vector."""
+        def evaluate():
+            values = []
+            for f, sign in self._scorers:
+                value = f(puzzle)
+                values.append(-value if sign < 0 else value)
+            vector = np.array(values, dtype=np.float64)
+            vector.flags.writeable = False
+            return tuple(values), vector
+        return puzzle._cached(("score", self._scorers), evaluate)
+
+    def score(self, puzzle):
+        """
+        This method returns the registered objective function values as a vector.
+
+        Returns
+        -------
+        score : numpy ndarray
+            float64 vector in the registration order. It is cached until the board changes.
+        """
+        return self._evaluate(puzzle)[1]
+
+    @staticmethod
+    def compare(score, other):
+        """
+        Compare two score vectors lexicographically.
+
+        Returns
+        -------
+        result : int
+            1 if ``score`` is better, -1 if ``other`` is better and 0 otherwise.
+        """
+        differ = np.flatnonzero((score < other) | (score > other))
+        if differ.size == 0:
+            return 0
+        return 1 if score[differ[0]] > other[differ[0]] else -1
 
     def get_score(self, puzzle, i=0, func=None, all=False):
         """
         This method returns any objective function value
         """
+        values = self._evaluate(puzzle)[0]
         if all:
-            scores = {}
-            # scores = np.zeros(len(self.registered_funcs), dtype="float")
-            for func_name in self.registered_funcs:
-                scores[func_name] = eval(f"self.{func_name}(puzzle)")
-            return scores
+            return dict(zip(self.registered_funcs, values))
         if func is None:
-            func = self.registered_funcs[i]
-        return eval(f"self.{func}(puzzle)")
+            return values[i]
+        if func in self.registered_funcs:
+            return values[self.registered_funcs.index(func)]
+        if callable(func):
+            return func(puzzle)
+        if func not in ObjectiveFunction.flist:
+            raise RuntimeError(f"ObjectiveFunction class does not have '{func}' function")
+        return getattr(self, func)(puzzle)
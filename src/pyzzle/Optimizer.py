@@ -1,10 +1,22 @@
 from abc import ABCMeta, abstractmethod
 import copy
 import logging
+import os
+import pickle
 import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from pyzzle.Backend import get_backend
+from pyzzle.ObjectiveFunction import ObjectiveFunction
 
 LOG = logging.getLogger(__name__)
 
+# Dictionary and Placeable attached by each worker of the MultiStart process pool
+_shared = {}
+
 
 class Optimizer(metaclass=ABCMeta):
     @abstractmethod
@@ -17,11 +29,23 @@ class Optimizer(metaclass=ABCMeta):
 
 
 class LocalSearch(Optimizer):
-    def __init__(self, show=True, shrink=False, move=False, use_f=False):
+    def __init__(self, show=True, shrink=False, move=False, use_f=False, backend=None):
+        """
+        Parameters
+        ----------
+        use_f : bool, default False
+            If True, add the words by the compiled ``Puzzle.add_to_limit_f``,
+            which falls back to the first available backend without the Fortran kernels.
+        backend : str or Backend, optional
+            Compute backend of the neighbors: "auto", "fortran", "numba", "numpy"
+            or a ``Backend``. See ``pyzzle.Backend.get_backend``.
+            If given, ``use_f`` is ignored.
+        """
         self.show = show
         self.shrink = shrink
         self.move = move
         self.use_f = use_f
+        self.backend = None if backend is None else get_backend(backend)
     
     def optimize(self, puzzle, epoch, time_limit=None, time_offset=0):
         """
@@ -50,27 +74,27 @@ class LocalSearch(Optimizer):
                 LOG.info(f"{round(performance_time + time_offset,3)} sec (< {round(time_limit,3)} sec)")
             _puzzle.epoch += 1
             LOG.info(f">>> Epoch {_puzzle.epoch}/{goal_epoch}")
-            # Get neighbor solution by drop->kick->add
-            new_puzzle = self.get_neighbor_solution(_puzzle)
+            prev_score = _puzzle.obj_func.score(_puzzle)
+            prev_scores = _puzzle.obj_func.get_score(_puzzle, all=True)
+            # Get neighbor solution by drop->kick->add in place, recording the undo log
+            _puzzle.checkpoint()
+            self.get_neighbor_solution(_puzzle, inplace=True)
 
             # Repeat if the score is high
-            for func_num in range(len(_puzzle.obj_func)):
-                prev_score = _puzzle.obj_func.get_score(_puzzle, func_num)
-                new_score = new_puzzle.obj_func.get_score(new_puzzle, func_num)
-                if new_score > prev_score:
-                    LOG.info(f"- Improved: {_puzzle.obj_func.get_score(_puzzle, all=True)}")
-                    LOG.info(f"        --> {new_puzzle.obj_func.get_score(new_puzzle, all=True)}")
-                    _puzzle = new_puzzle.copy(deep=True)
-                    _puzzle.logging()
-                    if self.show:
-                        _puzzle.show()
-                    break
-                if new_score < prev_score:
-                    _puzzle.logging()
-                    LOG.info(f"- Stayed: {_puzzle.obj_func.get_score(_puzzle, all=True)}")
-                    break
+            result = ObjectiveFunction.compare(_puzzle.obj_func.score(_puzzle), prev_score)
+            if result > 0:
+                LOG.info(f"- Improved: {prev_scores}")
+                LOG.info(f"        --> {_puzzle.obj_func.get_score(_puzzle, all=True)}")
+                _puzzle.commit()
+                _puzzle.logging()
+                if self.show:
+                    _puzzle.show()
+            elif result < 0:
+                _puzzle.rollback()
+                _puzzle.logging()
+                LOG.info(f"- Stayed: {_puzzle.obj_func.get_score(_puzzle, all=True)}")
             else:
-                _puzzle = new_puzzle.copy(deep=True)
+                _puzzle.commit()
                 _puzzle.logging()
                 LOG.info(f"- Replaced: {_puzzle.obj_func.get_score(_puzzle, all=True)}")
                 if self.show:
@@ -79,12 +103,22 @@ class LocalSearch(Optimizer):
                 _puzzle = _puzzle.shrink()
         return _puzzle
 
-    def get_neighbor_solution(self, puzzle):
+    def get_neighbor_solution(self, puzzle, inplace=False):
         """
         This method gets the neighborhood solution
+
+        Parameters
+        ----------
+        puzzle : Puzzle
+            Current solution
+        inplace : bool, default False
+            If True, modify ``puzzle`` itself instead of a copy of it.
         """
         # Copy the puzzle
-        _puzzle = puzzle.copy(deep=True)
+        _puzzle = puzzle if inplace else puzzle.copy(deep=True)
+        if self.backend is not None:
+            self.backend.neighbor(_puzzle)
+            return _puzzle
         if _puzzle.nwords >= 1:
             # Drop words until connectivity collapse
             _puzzle.collapse()
@@ -98,29 +132,123 @@ class LocalSearch(Optimizer):
         return _puzzle
 
 
+def _share(obj):
+    """
+    Pickle ``obj`` with its NumPy buffers out-of-band and copy the buffers into shared memory.
+
+    Returns
+    -------
+    shm : SharedMemory
+        Shared memory block holding the buffers. The caller must unlink it.
+    payload : bytes
+        Pickled ``obj`` without its buffers.
+    spans : list of tuple
+        (start, stop) of each buffer in ``shm``.
+    """
+    buffers = []
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    spans = []
+    start = 0
+    for raw in raws:
+        spans.append((start, start + raw.nbytes))
+        start += raw.nbytes
+    shm = SharedMemory(create=True, size=max(start, 1))
+    for raw, (start, stop) in zip(raws, spans):
+        shm.buf[start:stop] = raw
+    return shm, payload, spans
+
+
+def _attach(name, payload, spans):
+    """Pool initializer: rebuild the shared Dictionary and Placeable on views of the shared memory."""
+    shm = SharedMemory(name=name)
+    _shared["shm"] = shm
+    _shared["dic"], _shared["plc"] = pickle.loads(payload, buffers=[shm.buf[start:stop] for start, stop in spans])
+
+
+def _optimize_node(optimizer, puzzle, seed, epoch, time_limit, time_offset, start_time):
+    """Run one MultiStart node. In a pool worker, ``puzzle`` comes without its Dictionary and Placeable."""
+    if time_limit is not None:
+        time_offset = time.time() - start_time + time_offset
+        if time_offset >= time_limit:
+            return None
+    in_worker = puzzle._plc is None
+    if in_worker:
+        puzzle._dic, puzzle._plc = _shared["dic"], _shared["plc"]
+        puzzle._shared = True
+    np.random.seed(seed)
+    puzzle.seed = seed
+    puzzle = optimizer.optimize(puzzle, epoch, time_limit=time_limit, time_offset=time_offset)
+    if in_worker and puzzle._shared:
+        puzzle._dic = puzzle._plc = None
+    return puzzle
+
+
 class MultiStart(Optimizer):
-    def __init__(self, n, show=True, shrink=False, move=False, use_f=False):
+    def __init__(self, n, show=True, shrink=False, move=False, use_f=False, n_jobs=1, backend=None):
+        """
+        Parameters
+        ----------
+        n : int
+            Number of restarts (nodes).
+        n_jobs : int, default 1
+            Number of worker processes. -1 means all CPUs.
+            With 1, the nodes run one after another in this process.
+        backend : str or Backend, optional
+            Compute backend of the local search. See ``LocalSearch``.
+        """
         self.n = n
         self.show = show
         self.shrink = shrink
         self.move = move
         self.use_f = use_f
-        self.localsearch_optimizer = LocalSearch(show=show, shrink=shrink, move=move, use_f=use_f)
+        self.n_jobs = n_jobs
+        self.localsearch_optimizer = LocalSearch(show=show, shrink=shrink, move=move, use_f=use_f, backend=backend)
+        self.backend = self.localsearch_optimizer.backend
+
+    def get_seeds(self, seed):
+        """
+        Derive a distinct random seed for each node from the puzzle's seed.
+        The result of a node thus doesn't depend on ``n_jobs`` or the order of execution.
+        """
+        return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(self.n)]
 
     def optimize(self, puzzle, epoch, time_limit=None, time_offset=0):
-        puzzles = []
-        if time_limit is not None:
-            start_time = time.time()
-        for _n in range(self.n):
-            if time_limit is not None:
-                performance_time = time.time() - start_time
-                time_offset = performance_time + time_offset
-                if performance_time >= time_limit:
+        start_time = time.time()
+        seeds = self.get_seeds(puzzle.seed)
+        n_jobs = os.cpu_count() if self.n_jobs == -1 else self.n_jobs
+        n_jobs = min(n_jobs, self.n)
+        if n_jobs <= 1:
+            puzzles = []
+            for _n, seed in enumerate(seeds):
+                LOG.info(f"> Node: {_n+1}")
+                _puzzle = _optimize_node(self.localsearch_optimizer, puzzle.copy(deep=True), seed, epoch, time_limit, time_offset, start_time)
+                if _puzzle is None:
                     break
-            LOG.info(f"> Node: {_n+1}")
+                puzzles.append(_puzzle)
+            if not puzzles:
+                return puzzle.copy(deep=True)
+            return self.get_prime_puzzle(puzzles)
+
+        # The workers attach the Dictionary and the Placeable once, from shared memory
+        shm, payload, spans = _share((puzzle._dic, puzzle._plc))
+        try:
             _puzzle = puzzle.copy(deep=True)
-            _puzzle = self.localsearch_optimizer.optimize(_puzzle, epoch, time_limit=time_limit, time_offset=time_offset)
-            puzzles.append(_puzzle)
+            _puzzle._dic = _puzzle._plc = None
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_attach, initargs=(shm.name, payload, spans)) as executor:
+                futures = [executor.submit(_optimize_node, self.localsearch_optimizer, _puzzle, seed, epoch, time_limit, time_offset, start_time)
+                           for seed in seeds]
+                puzzles = [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+        puzzles = [_puzzle for _puzzle in puzzles if _puzzle is not None]
+        if not puzzles:
+            return puzzle.copy(deep=True)
+        for _puzzle in puzzles:
+            if _puzzle._plc is None:
+                _puzzle._dic, _puzzle._plc = puzzle._dic, puzzle._plc
+                _puzzle._shared = puzzle._shared = True
         return self.get_prime_puzzle(puzzles)
 
     def get_prime_puzzle(self, puzzles):
@@ -1,36 +1,238 @@
 import sys
 
 import numpy as np
-from collections import Counter
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+ORI_DTYPE = np.int8
+POS_DTYPE = np.int16
+K_DTYPE = np.int32
+MAX_CODEPOINT = 0x110000
+
+
+class PlaceableBlock:
+    """
+    Candidates of the words of one length in one direction.
+
+    The candidates are the cross product of the head positions and the words,
+    numbered in position-major order, so candidate ``c`` of the block is
+    the word ``ks[c % nwords]`` at the position ``c // nwords``.
+    """
+    def __init__(self, ori, w_len, i, j, ks, words, base, width, height):
+        self.ori = ori
+        self.w_len = w_len
+        self.i = i
+        self.j = j
+        self.ks = ks
+        self.words = words
+        self.base = base
+        self.width = width
+        self.height = height
+        self._lookup = None
+        self._letter_index = None
+
+    @property
+    def npos(self):
+        return self.i.size
+
+    @property
+    def nwords(self):
+        return self.ks.size
+
+    @property
+    def size(self):
+        return self.npos * self.nwords
+
+    def decode(self, local):
+        """Returns (ori, i, j, k) of the local candidate numbers."""
+        pos = local // self.nwords
+        return np.full(local.size, self.ori, dtype=ORI_DTYPE), self.i[pos], self.j[pos], self.ks[local % self.nwords]
+
+    def _build_index(self):
+        self._lookup = np.full([self.height, self.width], -1, dtype=np.int64)
+        self._lookup[self.i, self.j] = np.arange(self.npos)
+        codes = np.array([list(map(ord, self.words[k])) for k in self.ks], dtype=np.int64).reshape(self.nwords, self.w_len)
+        keys = (np.arange(self.w_len) * MAX_CODEPOINT + codes).ravel()
+        order = np.argsort(keys, kind="stable")
+        ukeys, starts = np.unique(keys[order], return_index=True)
+        self._letter_index = (ukeys, np.append(starts, keys.size), order // self.w_len)
+
+    def crossing(self, i, j, codes):
+        """Returns the candidate numbers of the block that put the letters on the cells."""
+        if self._lookup is None:
+            self._build_index()
+        p = np.arange(self.w_len)
+        hi = i[:, None] - p * (self.ori == 0)
+        hj = j[:, None] - p * (self.ori == 1)
+        valid = (hi >= 0) & (hj >= 0)
+        pos = np.full(hi.shape, -1, dtype=np.int64)
+        pos[valid] = self._lookup[hi[valid], hj[valid]]
+        cell_idx, p_idx = np.nonzero(pos >= 0)
+        if cell_idx.size == 0:
+            return []
+        ukeys, starts, w_ranks = self._letter_index
+        keys = p_idx * MAX_CODEPOINT + codes[cell_idx]
+        found = np.minimum(np.searchsorted(ukeys, keys), ukeys.size - 1)
+        hit = ukeys[found] == keys
+        return [self.base + pos[c, q] * self.nwords + w_ranks[starts[f]:starts[f+1]]
+                for c, q, f in zip(cell_idx[hit], p_idx[hit], found[hit])]
+
+
+class ArrayPermutation:
+    """Random permutation of the candidate numbers, held as an array."""
+    def __init__(self, size):
+        self.size = size
+        self._perm = np.arange(size)
+        np.random.shuffle(self._perm)
+        self._rank = np.empty_like(self._perm)
+        self._rank[self._perm] = np.arange(size)
+
+    def __getitem__(self, rank):
+        return self._perm[rank]
+
+    def rank(self, candidates):
+        return self._rank[candidates]
+
+
+class FeistelPermutation:
+    """
+    Random permutation of the candidate numbers without allocating them.
+
+    A balanced Feistel network is a bijection on ``[0, 4**half)``;
+    cycle-walking restricts it to ``[0, size)``.
+    Both directions are evaluated on demand.
+    """
+    ROUNDS = 4
+    MULTIPLIER = np.uint64(0x2545F4914F6CDD1D)
+
+    def __init__(self, size):
+        self.size = size
+        self.half = max(1, (int(size - 1).bit_length() + 1) // 2)
+        self.mask = np.uint64((1 << self.half) - 1)
+        self.keys = np.random.randint(0, 2**31, size=self.ROUNDS).astype(np.uint64)
+
+    def _f(self, x, key):
+        return ((x ^ key) * self.MULTIPLIER) >> np.uint64(64 - self.half)
+
+    def _encrypt(self, x):
+        left, right = x >> np.uint64(self.half), x & self.mask
+        for key in self.keys:
+            left, right = right, left ^ self._f(right, key)
+        return (left << np.uint64(self.half)) | right
+
+    def _decrypt(self, x):
+        left, right = x >> np.uint64(self.half), x & self.mask
+        for key in self.keys[::-1]:
+            left, right = right ^ self._f(left, key), left
+        return (left << np.uint64(self.half)) | right
+
+    def _walk(self, x, func):
+        scalar = np.ndim(x) == 0
+        x = func(np.atleast_1d(np.asarray(x, dtype=np.uint64)))
+        out = x >= self.size
+        while np.any(out):
+            x[out] = func(x[out])
+            out = x >= self.size
+        x = x.astype(np.int64)
+        return x[0] if scalar else x
+
+    def __getitem__(self, rank):
+        return self._walk(rank, self._encrypt)
+
+    def rank(self, candidates):
+        return self._walk(candidates, self._decrypt)
 
 
 class Placeable:
     """
     Placeable class stores the positions where words can be placed.
+
+    The candidates are stored as struct-of-arrays columns (``ori``, ``i``, ``j``, ``k``),
+    where ``k`` is the word number in the Dictionary and ``words[k]`` is the word itself.
+    With ``lazy=True`` the columns are not materialized: only the words and the head
+    positions of each (direction, length) block are kept, and a candidate is decoded
+    from its number on demand.
     """
-    def __init__(self, width, height, words=None, mask=None):
+    def __init__(self, width, height, words=None, mask=None, lazy=False, buckets=None):
         self.width = width
         self.height = height
-        self.ori = []
-        self.i = []
-        self.j = []
-        self.k = []
-        self.word = []
+        self.lazy = lazy
+        self.ori = None if lazy else np.empty(0, dtype=ORI_DTYPE)
+        self.i = None if lazy else np.empty(0, dtype=POS_DTYPE)
+        self.j = None if lazy else np.empty(0, dtype=POS_DTYPE)
+        self.k = None if lazy else np.empty(0, dtype=K_DTYPE)
+        self.words = []
+        self._blocks = []
+        self._size = 0
+        self._codes = None
+        self._k_of = None
+        self._fortran = None
         self.mask = mask
         if isinstance(mask, list):
             self.mask = np.array(mask)
-            if mask.shape != (self.height, self.width):
+            if self.mask.shape != (self.height, self.width):
                 raise ValueError("The shape of the mask must be the same as (height, width)")
 
         if words is not None:
-            self.add(words, mask=mask)
+            self.add(words, mask=mask, buckets=buckets)
 
     def __sizeof__(self):
-        size = sys.getsizeof(self.ori) + sys.getsizeof(self.i) + sys.getsizeof(self.j) + sys.getsizeof(self.k) + sys.getsizeof(self.word)
+        size = sys.getsizeof(self.words)
+        for block in self._blocks:
+            size += block.i.nbytes + block.j.nbytes + block.ks.nbytes
+        if not self.lazy:
+            size += self.ori.nbytes + self.i.nbytes + self.j.nbytes + self.k.nbytes
         size += sys.getsizeof(self.width) + sys.getsizeof(self.height) + sys.getsizeof(self.mask)
         return size
-    
-    def add(self, word, mask=None, base_k=0):
+
+    def get_positions(self, ori, w_len, mask=None):
+        """
+        Returns the head positions where a word of the specified length fits.
+
+        Parameters
+        ----------
+        ori : int
+            Direction of the word (0:Vertical, 1:Horizontal)
+        w_len : int
+            Length of the word
+        mask : ndarray, optional
+            Mask of the puzzle
+
+        Returns
+        -------
+        i, j : ndarray
+            Row and column numbers in row-major order
+        """
+        if ori == 0:
+            shape = (self.height - w_len + 1, self.width)
+        if ori == 1:
+            shape = (self.height, self.width - w_len + 1)
+        if shape[0] <= 0 or shape[1] <= 0:
+            return np.empty(0, dtype=POS_DTYPE), np.empty(0, dtype=POS_DTYPE)
+        if mask is None:
+            valid = np.ones(shape, dtype=bool)
+        else:
+            # Sliding-window test: the word must not overlap any masked cell
+            valid = ~sliding_window_view(mask.astype(bool), w_len, axis=ori).any(axis=-1)
+        i, j = np.nonzero(valid)
+        return i.astype(POS_DTYPE), j.astype(POS_DTYPE)
+
+    def add(self, word, mask=None, base_k=0, buckets=None):
+        """
+        Add the candidates of words.
+
+        Parameters
+        ----------
+        word : str or list of str
+            Words to add, numbered from ``base_k``
+        mask : ndarray, optional
+            Mask of the puzzle. ``self.mask`` is used by default.
+        base_k : int, default 0
+            Word number of the first word
+        buckets : dict, optional
+            Numbers of the words from 0 by length, in order of the first appearance of the lengths,
+            as ``Dictionary.buckets``. They are computed from the words if not given.
+        """
         if isinstance(word, str):
             word = [word]
         if mask is None:
@@ -39,41 +241,191 @@ class Placeable:
             mask = np.array(mask)
             if mask.shape != (self.height, self.width):
                 raise ValueError("The shape of the mask must be the same as (height, width)")
-        len_arr = np.vectorize(len)(word)
-        len_count = Counter(len_arr)
+        word = list(word)
+        if len(word) == 0:
+            return
+        # Register the words in the table indexed by k
+        if len(self.words) < base_k + len(word):
+            self.words += [None] * (base_k + len(word) - len(self.words))
+        self.words[base_k:base_k + len(word)] = word
+        self._codes = self._k_of = self._fortran = None
+
+        if buckets is None:
+            len_arr = np.fromiter(map(len, word), dtype=np.int64, count=len(word))
+            # Lengths in order of first appearance
+            lens, first = np.unique(len_arr, return_index=True)
+            buckets = {l: np.where(len_arr == l)[0] for l in lens[np.argsort(first)]}
+        blocks = []
         for ori in (0, 1):
-            for l, c in len_count.items():
-                if ori == 0:
-                    i_max = self.height - l + 1
-                    j_max = self.width
-                if ori == 1:
-                    i_max = self.height
-                    j_max = self.width - l + 1
-                for i in range(i_max):
-                    for j in range(j_max):
-                        if mask is not None:
-                            if ori == 0 and np.any(mask[i:i+l, j] == True):
-                                continue
-                            if ori == 1 and np.any(mask[i, j:j+l] == True):
-                                continue
-                        self.ori += [ori]*c
-                        self.i += [i]*c
-                        self.j += [j]*c
-                        self.k += (np.where(len_arr == l)[0] + base_k).tolist()
-                        self.word += np.array(word, dtype=object)[np.where(len_arr == l)[0]].tolist()
-    
+            for l, ks in buckets.items():
+                ks = (ks + base_k).astype(K_DTYPE)
+                i, j = self.get_positions(ori, l, mask=mask)
+                block = PlaceableBlock(ori, int(l), i, j, ks, self.words, self._size, self.width, self.height)
+                self._size += block.size
+                blocks.append(block)
+        self._blocks += blocks
+        if self.lazy:
+            return
+        # Broadcast (positions x words) in position-major order
+        self.ori = np.concatenate([self.ori] + [np.full(b.size, b.ori, dtype=ORI_DTYPE) for b in blocks])
+        self.i = np.concatenate([self.i] + [np.repeat(b.i, b.nwords) for b in blocks])
+        self.j = np.concatenate([self.j] + [np.repeat(b.j, b.nwords) for b in blocks])
+        self.k = np.concatenate([self.k] + [np.tile(b.ks, b.npos) for b in blocks])
+
+    def take(self, candidates):
+        """
+        Returns the columns of the specified candidates.
+
+        Parameters
+        ----------
+        candidates : array_like
+            Candidate numbers
+
+        Returns
+        -------
+        ori, i, j, k : ndarray
+        """
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if not self.lazy:
+            return self.ori[candidates], self.i[candidates], self.j[candidates], self.k[candidates]
+        ori = np.empty(candidates.size, dtype=ORI_DTYPE)
+        i = np.empty(candidates.size, dtype=POS_DTYPE)
+        j = np.empty(candidates.size, dtype=POS_DTYPE)
+        k = np.empty(candidates.size, dtype=K_DTYPE)
+        bases = np.array([block.base for block in self._blocks])
+        block_idx = np.searchsorted(bases, candidates, side="right") - 1
+        for b in np.unique(block_idx):
+            where = block_idx == b
+            block = self._blocks[b]
+            ori[where], i[where], j[where], k[where] = block.decode(candidates[where] - block.base)
+        return ori, i, j, k
+
+    def columns(self):
+        """
+        Returns all the columns (materialized on every call in the lazy mode).
+
+        Returns
+        -------
+        ori, i, j, k : ndarray
+        """
+        if not self.lazy:
+            return self.ori, self.i, self.j, self.k
+        return self.take(np.arange(self.size))
+
+    def permutation(self):
+        """
+        Returns a random permutation of the candidate numbers.
+
+        ``perm[r]`` is the candidate visited at rank ``r`` and ``perm.rank(c)`` is its inverse.
+        The lazy mode does not allocate the whole permutation.
+        """
+        if self.lazy:
+            return FeistelPermutation(self.size)
+        return ArrayPermutation(self.size)
+
+    def codes(self):
+        """
+        Returns the words encoded as a codepoint table, built once per word table.
+
+        Returns
+        -------
+        codes : ndarray
+            (number of words, maximum length) int32 array padded with 0
+        w_len : ndarray
+            Lengths of the words
+        """
+        if self._codes is None:
+            table = np.array(self.words, dtype=str).reshape(len(self.words))
+            w_len = np.char.str_len(table)
+            codes = table.view(np.int32).reshape(len(self.words), table.itemsize // 4)
+            self._codes = (codes, w_len)
+        return self._codes
+
+    def fortran_arrays(self):
+        """
+        Returns the inputs of ``futils.add_to_limit``, built once per Placeable.
+
+        The lazy mode materializes the columns here.
+
+        Returns
+        -------
+        ori, i, j, k : ndarray
+            int32 columns of all candidates, with 1-based positions
+        codes : ndarray
+            Fortran-ordered int32 codepoint table with one word per column
+        w_len : ndarray
+            int32 lengths of the words
+        """
+        if self._fortran is None:
+            ori, i, j, k = self.columns()
+            codes, w_len = self.codes()
+            self._fortran = (ori.astype(np.int32), i.astype(np.int32) + 1, j.astype(np.int32) + 1, k.astype(np.int32),
+                             np.asfortranarray(codes.T), w_len.astype(np.int32))
+        return self._fortran
+
+    def index(self, words):
+        """
+        Returns the word numbers ``k`` of the specified words, -1 for unknown words.
+        """
+        if self._k_of is None:
+            self._k_of = {word: k for k, word in enumerate(self.words)}
+        return np.fromiter((self._k_of.get(word, -1) for word in words), dtype=np.int64)
+
+    @property
+    def word(self):
+        """Words of all candidates (an object array is built on every access)."""
+        return np.array(self.words, dtype=object)[self.columns()[3]]
+
+    def crossing(self, i, j, letters):
+        """
+        Returns the candidate numbers that pass through the given cells with the given letters.
+
+        The index is implicit: for each (direction, length) block the cell is
+        mapped back to the head positions by the offsets of the letter in the words.
+
+        Parameters
+        ----------
+        i : array_like
+            Row numbers of the cells
+        j : array_like
+            Column numbers of the cells
+        letters : str or array_like
+            Letters or codepoints in the cells
+
+        Returns
+        -------
+        candidates : ndarray
+            Candidate numbers (may contain duplicates)
+        """
+        i = np.asarray(i, dtype=np.int64)
+        j = np.asarray(j, dtype=np.int64)
+        if isinstance(letters, str):
+            letters = list(letters)
+        letters = np.asarray(letters)
+        if letters.dtype.kind == "U":
+            letters = letters.astype("U1").view(np.int32)
+        codes = letters.astype(np.int64)
+        found = []
+        for block in self._blocks:
+            if block.size > 0:
+                found += block.crossing(i, j, codes)
+        if len(found) == 0:
+            return np.array([], dtype=np.int64)
+        return np.concatenate(found)
+
     @property
     def size(self):
-        return len(self.word)
+        return self._size
 
     def __len__(self):
         return self.size
 
     def __getitem__(self, key):
-        if type(key) in (int, np.int):
-            return {"ori": self.ori[key], "i": self.i[key], "j": self.j[key], "word": self.word[key]}
+        if isinstance(key, (int, np.integer)):
+            ori, i, j, k = self.take([key])
+            return {"ori": ori[0], "i": i[0], "j": j[0], "word": self.words[k[0]]}
         if type(key) is str:
-            return eval(f"self.{key}")
+            return getattr(self, key)
 
     def __str__(self):
         return f"ori:{self.ori}, i:{self.i}, j:{self.j}, word:{self.word}"
@@ -3,6 +3,7 @@ import json
 import pickle
 import datetime
 import logging
+import heapq
 
 import numpy as np
 import pandas as pd
@@ -15,7 +16,9 @@ from pyzzle.Dictionary import Dictionary
 from pyzzle.Optimizer import Optimizer
 from pyzzle.ObjectiveFunction import ObjectiveFunction
 from pyzzle.Judgement import Judgement
-from pyzzle.History import HistoryItem, HistoryItemMove, HistoryCode
+from pyzzle.History import History, HistoryItem, HistoryItemMove, HistoryCode
+from pyzzle.ScoreLog import ScoreLog
+from pyzzle.Backend import get_backend
 from pyzzle import utils
 from pyzzle.Exception import ZeroSizePuzzleException
 
@@ -27,6 +30,41 @@ LOG = logging.getLogger(__name__)
 BLANK = Word("", weight=0)
 USED_DTYPE = np.uint16
 EMPTY = np.iinfo(USED_DTYPE).max
+# The board holds codepoints (0 for blank), which read as one-letter strings through CELL_DTYPE
+BOARD_DTYPE = np.int32
+CELL_DTYPE = np.dtype("U1")
+
+
+def _import_futils():
+    """Import the Fortran kernels, which are built only with a Fortran compiler."""
+    try:
+        from pyzzle import futils
+    except ImportError as err:
+        LOG.info(str(err))
+        raise ImportError("The Fortran kernels of pyzzle are not installed.\n"
+                          "After installing GCC and GFortran, you need to reinstall pyzzle.")
+    return futils
+
+
+# Backend serving the compiled methods without ``futils``, chosen on first use
+_fallback = {}
+
+
+def _fallback_backend(err):
+    """Return the first available backend, warning once that ``futils`` is missing."""
+    if "backend" not in _fallback:
+        _fallback["backend"] = get_backend("auto")
+        LOG.warning(f"{err}\nFalling back to the {_fallback['backend'].name} backend.")
+    return _fallback["backend"]
+
+
+def _is_integral(value):
+    return float(value).is_integer()
+
+
+def _encode(word):
+    """Returns the codepoints of a word."""
+    return np.array([word]).view(BOARD_DTYPE)
 
 
 class Puzzle:
@@ -105,6 +143,14 @@ class Puzzle:
         seed : int
             Random Seed
         """
+        self._version = 0
+        self._stale = True
+        self._graph = None
+        self._n_components = None
+        self._word_slots = None
+        self._pos_slots = None
+        self._cache = {}
+        self._cache_version = None
         self.name = name
         self.nwords = 0
         self.epoch = 0
@@ -127,12 +173,15 @@ class Puzzle:
         self.ui = np.full_like(self.uori, EMPTY, dtype=USED_DTYPE)
         self.uj = np.full_like(self.uori, EMPTY, dtype=USED_DTYPE)
         self.uwords = np.full_like(self.uori, BLANK, dtype=object)
-        self.log = None
-        self.history = []
-        self.base_history = []
+        self._log = None
+        self.history = History()
+        self.base_history = History()
         self.obj_func = ObjectiveFunction(["nwords", "weight"])
         self._dic = Dictionary()
         self._plc = Placeable(width=self.width, height=self.height)
+        self._shared = False
+        self._journal = None
+        self._checkpoint = None
 
     def __str__(self):
         """Return the puzzle's name."""
@@ -149,24 +198,14 @@ class Puzzle:
             raise TypeError(f"'<' not supported between instances of 'Puzzle' and '{type(other)}'")
         if self.obj_func.registered_funcs != other.obj_func.registered_funcs:
             raise ValueError("Puzzles with different registered objective functions cannot be compared with each other")
-        for func_num in range(len(self.obj_func)):
-            self_score = self.obj_func.get_score(self, func_num)
-            other_score = other.obj_func.get_score(other, func_num)
-            if self_score < other_score:
-                return True
-        return False
+        return ObjectiveFunction.compare(self.obj_func.score(self), other.obj_func.score(other)) < 0
     
     def __eq__(self, other):
         if not isinstance(other, Puzzle):
             raise TypeError(f"'==' not supported between instances of 'Puzzle' and '{type(other)}'")
         if self.obj_func.registered_funcs != other.obj_func.registered_funcs:
             raise ValueError("Puzzles with different registered objective functions cannot be compared with each other")
-        for func_num in range(len(self.obj_func)):
-            self_score = self.obj_func.get_score(self, func_num)
-            other_score = other.obj_func.get_score(other, func_num)
-            if self_score != other_score:
-                return False
-        return True
+        return ObjectiveFunction.compare(self.obj_func.score(self), other.obj_func.score(other)) == 0
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -184,13 +223,424 @@ class Puzzle:
     def size(self):
         return self.width * self.height
     
+    @property
+    def cell(self):
+        """The board as letters, a view of the codepoint board."""
+        return self._board.view(CELL_DTYPE)
+
+    @cell.setter
+    def cell(self, cell):
+        self._board = np.array(cell, dtype=CELL_DTYPE).view(BOARD_DTYPE)
+        self._invalidate()
+
+    @property
+    def cover(self):
+        return self._cover
+
+    @cover.setter
+    def cover(self, cover):
+        self._cover = cover
+        self._invalidate()
+
+    @property
+    def uwords(self):
+        return self._uwords
+
+    @uwords.setter
+    def uwords(self, uwords):
+        self._uwords = uwords
+        # The words given at once are taken as placed in the order of the slots
+        self._useq = np.arange(len(uwords))
+        self._nseq = len(uwords)
+        self._invalidate()
+
+    @property
+    def gravity(self):
+        return self._gravity
+
+    @gravity.setter
+    def gravity(self, gravity):
+        self._gravity = np.array(gravity)
+        self._gravity_exact = bool(np.all(np.mod(self._gravity, 1) == 0))
+        self._invalidate()
+
     @property
     def weight(self):
+        self._refresh()
+        if self._inexact_weights == 0:
+            return self._weight_sum
         weight = 0
         for uw in self.uwords[self.uwords!=BLANK]:
             weight += uw.weight
         return weight
 
+    @property
+    def cross_count(self):
+        """Number of cells shared by two words."""
+        self._refresh()
+        return self._cross_count
+
+    @property
+    def fill_count(self):
+        """Number of cells with a letter."""
+        self._refresh()
+        return self._fill_count
+
+    def _invalidate(self):
+        """
+        Mark the running counters as stale.
+        Called when a board array is replaced as a whole rather than updated by ``_add``/``_drop``/``move``.
+        """
+        self._version += 1
+        self._stale = True
+        self._graph = None
+        self._word_slots = self._pos_slots = None
+
+    def _refresh(self):
+        """Recount the running counters from the board if they are stale."""
+        if not self._stale:
+            return
+        filled = self.cover != 0
+        self._fill_count = int(np.count_nonzero(filled))
+        self._cross_count = int(np.count_nonzero(self.cover == 2))
+        self._row_fill = filled.sum(axis=1)
+        self._col_fill = filled.sum(axis=0)
+        self._gravity_sum = self.gravity[filled].sum()
+        self._weight_sum = 0
+        self._inexact_weights = 0
+        for uw in self.uwords[self.uwords!=BLANK]:
+            if _is_integral(uw.weight):
+                self._weight_sum += uw.weight
+            else:
+                self._inexact_weights += 1
+        self._stale = False
+
+    def _count(self, ori, i, j, w_len, weight, sign):
+        """
+        Update the running counters after the cover of a word slot was changed by ``sign``.
+
+        Integral weights and gravities are summed exactly in any order, so the counters
+        agree bit for bit with a full recount. Non-integral ones make ``weight`` and
+        ``gravity`` fall back to the full sum.
+        """
+        self._version += 1
+        if self._stale:
+            return
+        if ori == 0:
+            seg = self.cover[i:i + w_len, j]
+            grav = self.gravity[i:i + w_len, j]
+        if ori == 1:
+            seg = self.cover[i, j:j + w_len]
+            grav = self.gravity[i, j:j + w_len]
+        # Cells that switched between empty and filled, and between single and crossed
+        changed = seg == (1 if sign > 0 else 0)
+        n_changed = int(np.count_nonzero(changed))
+        self._fill_count += sign * n_changed
+        self._cross_count += sign * int(np.count_nonzero(seg == (2 if sign > 0 else 1)))
+        self._gravity_sum += sign * grav[changed].sum()
+        if ori == 0:
+            self._row_fill[i:i + w_len] += sign * changed
+            self._col_fill[j] += sign * n_changed
+        if ori == 1:
+            self._row_fill[i] += sign * n_changed
+            self._col_fill[j:j + w_len] += sign * changed
+        if _is_integral(weight):
+            self._weight_sum += sign * weight
+        else:
+            self._inexact_weights += sign
+
+    def _get_rect(self):
+        """Return the bounding rectangle of the filled cells from the running counters."""
+        self._refresh()
+        rows = np.flatnonzero(self._row_fill)
+        cols = np.flatnonzero(self._col_fill)
+        if rows.size == 0:
+            raise ZeroSizePuzzleException("The puzzle has no contents.")
+        return rows[0], rows[-1], cols[0], cols[-1]
+
+    def _refresh_slots(self):
+        """Rebuild the slot indices of the words and of their positions if they are stale."""
+        if self._word_slots is not None:
+            return
+        n = self.nwords
+        self._word_slots = dict(zip(self.uwords[:n], range(n)))
+        self._pos_slots = dict(zip(zip(self.uori[:n].tolist(), self.ui[:n].tolist(), self.uj[:n].tolist()), range(n)))
+
+    def _slot_of(self, word=None, ori_i_j=None):
+        """Return the slot of a word on the board, by the word or by its ``(ori, i, j)``."""
+        self._refresh_slots()
+        if word is not None:
+            return self._word_slots[word]
+        return self._pos_slots[tuple(ori_i_j)]
+
+    def _put_slot(self, idx, ori, i, j, word, seq):
+        """Write a word to the slot ``idx``."""
+        self.uori[idx], self.ui[idx], self.uj[idx], self._uwords[idx], self._useq[idx] = ori, i, j, word, seq
+        if self._word_slots is not None:
+            self._word_slots[word] = idx
+            self._pos_slots[(int(ori), int(i), int(j))] = idx
+
+    def _pop_slot(self, idx):
+        """Empty the slot ``idx`` and return its ori, i, j, word and placement number."""
+        slot = (self.uori[idx], self.ui[idx], self.uj[idx], self._uwords[idx], self._useq[idx])
+        if self._word_slots is not None:
+            del self._word_slots[slot[3]]
+            del self._pos_slots[(int(slot[0]), int(slot[1]), int(slot[2]))]
+        self.uori[idx] = self.ui[idx] = self.uj[idx] = EMPTY
+        self._uwords[idx] = BLANK
+        self._useq[idx] = -1
+        return slot
+
+    def _placement_order(self):
+        """Return the slots of the words on the board in the order of placement."""
+        return np.argsort(self._useq[:self.nwords], kind="stable")
+
+    def _touching_words(self, ori, i, j, w_len, exclude=None):
+        """
+        Return the words over or next to the cells of a word slot, except ``exclude``.
+
+        These are the words whose cells are connected to the slot on the board,
+        by a crossing or by a side, as ``ndi.label`` of the cover array connects them.
+        """
+        if ori == 0:
+            rows = np.r_[i - 1:i + w_len + 1, i:i + w_len, i:i + w_len]
+            cols = np.r_[np.full(w_len + 2, j), np.full(w_len, j - 1), np.full(w_len, j + 1)]
+        if ori == 1:
+            rows = np.r_[np.full(w_len + 2, i), np.full(w_len, i - 1), np.full(w_len, i + 1)]
+            cols = np.r_[j - 1:j + w_len + 1, j:j + w_len, j:j + w_len]
+        inside = (rows >= 0) & (rows < self.height) & (cols >= 0) & (cols < self.width)
+        rows, cols = rows[inside], cols[inside]
+        filled = self.cover[rows, cols] > 0
+        n = self.nwords
+        uori, ui, uj, uwords = self.uori[:n], self.ui[:n], self.uj[:n], self.uwords[:n]
+        lens = np.fromiter(map(len, uwords), dtype=int, count=n)
+        words = {}
+        for r, c in zip(rows[filled].tolist(), cols[filled].tolist()):
+            over = (((uori == 0) & (uj == c) & (ui <= r) & (ui + lens > r))
+                    | ((uori == 1) & (ui == r) & (uj <= c) & (uj + lens > c)))
+            for idx in np.flatnonzero(over).tolist():
+                words[uwords[idx]] = None
+        words.pop(exclude, None)
+        return list(words)
+
+    def _refresh_graph(self):
+        """
+        Rebuild the word-crossing graph from the board if it is stale.
+
+        The nodes of the graph are the words on the board and the edges join the words
+        that cross or touch each other, so that its components are the ones of ``component``.
+        ``_add`` and ``_drop`` keep it up to date afterwards.
+        """
+        if self._graph is not None:
+            return
+        n = self.nwords
+        graph = {}
+        for ori, i, j, word in zip(self.uori[:n].tolist(), self.ui[:n].tolist(), self.uj[:n].tolist(), self.uwords[:n]):
+            graph[word] = set(self._touching_words(ori, i, j, len(word), exclude=word))
+        self._graph = graph
+        self._n_components = len(self._components())
+        if self._journal is not None and not self._journal:
+            # Nothing has changed since the checkpoint, so rollback can restore the graph by the journal
+            self._checkpoint = self._checkpoint[:-2] + (graph, self._n_components)
+
+    def _link(self, word, crosses):
+        """Add a word crossing or touching ``crosses`` to the word-crossing graph."""
+        self._graph[word] = set(crosses)
+        for other in crosses:
+            self._graph[other].add(word)
+        if self._n_components is not None:
+            if len(crosses) == 0:
+                self._n_components += 1
+            elif len(crosses) >= 2 and self._n_components >= 2:
+                # The crossed words may join several components, counted again when needed
+                self._n_components = None
+        if self._journal is not None:
+            self._journal.append(("link", word))
+
+    def _unlink(self, word):
+        """Remove a word from the word-crossing graph."""
+        crosses = self._graph.pop(word)
+        for other in crosses:
+            self._graph[other].discard(word)
+        if self._n_components is not None:
+            if len(crosses) == 0:
+                self._n_components -= 1
+            elif len(crosses) >= 2:
+                self._n_components += self._count_groups(crosses) - 1
+        if self._journal is not None:
+            self._journal.append(("unlink", word, crosses))
+
+    def _count_groups(self, words):
+        """Return the number of the components that ``words`` belong to, searching until all are reached."""
+        rest = set(words)
+        n_groups = 0
+        while rest:
+            n_groups += 1
+            start = rest.pop()
+            seen = {start}
+            stack = [start]
+            while stack and rest:
+                for other in self._graph[stack.pop()]:
+                    if other not in seen:
+                        seen.add(other)
+                        rest.discard(other)
+                        stack.append(other)
+        return n_groups
+
+    def _components(self):
+        """Return the connected components of the word-crossing graph as sets of words."""
+        self._refresh_graph()
+        components = []
+        seen = set()
+        for start in self._graph:
+            if start in seen:
+                continue
+            seen.add(start)
+            component = {start}
+            stack = [start]
+            while stack:
+                for other in self._graph[stack.pop()]:
+                    if other not in seen:
+                        seen.add(other)
+                        component.add(other)
+                        stack.append(other)
+            components.append(component)
+        self._n_components = len(components)
+        return components
+
+    def _get_n_components(self):
+        """Return the number of connected components from the word-crossing graph."""
+        self._refresh_graph()
+        if self._n_components is None:
+            self._components()
+        return self._n_components
+
+    def checkpoint(self):
+        """
+        Start recording the board operations so that they can be undone by ``rollback``.
+
+        Only the operations made by ``_add``, ``_drop`` and ``move`` are recorded,
+        so the cost of a rollback depends on the touched cells, not on the run length.
+
+        See Also
+        --------
+        rollback
+        commit
+        """
+        self._refresh()
+        counters = (self._fill_count, self._cross_count, self._gravity_sum, self._weight_sum,
+                    self._inexact_weights, self._row_fill.copy(), self._col_fill.copy())
+        self._checkpoint = (len(self.history), self._version, self._cache_version, self._cache, counters,
+                            self._graph, self._n_components)
+        self._journal = []
+
+    def commit(self):
+        """Stop recording and keep the operations made since ``checkpoint``."""
+        self._journal = None
+
+    def rollback(self):
+        """Undo the operations made since ``checkpoint`` and stop recording."""
+        if self._journal is None:
+            raise RuntimeError("'checkpoint' must be called before 'rollback'")
+        n_history, version, cache_version, cache, counters, graph, n_components = self._checkpoint
+        # The graph can be restored by the journal only if it was kept up to date since the checkpoint
+        relink = graph is not None and graph is self._graph
+        for entry in reversed(self._journal):
+            kind = entry[0]
+            if kind == "board":
+                _, index, cell, cover, enable = entry
+                self._board[index] = cell
+                self._cover[index] = cover
+                self.enable[index] = enable
+            elif kind == "add":
+                _, idx, ori, i, j, word, seq, nwords = entry
+                if isinstance(idx, slice):
+                    self._word_slots = self._pos_slots = None
+                else:
+                    self._pop_slot(idx)
+                self.uori[idx], self.ui[idx], self.uj[idx], self._uwords[idx], self._useq[idx] = ori, i, j, word, seq
+                self.nwords = nwords
+            elif kind == "drop":
+                _, idx, ori, i, j, word, seq, nwords = entry
+                # Move back the last word swapped into the slot
+                if idx != nwords - 1:
+                    self._put_slot(nwords - 1, *self._pop_slot(idx))
+                self._put_slot(idx, ori, i, j, word, seq)
+                self.nwords = nwords
+            elif kind == "move":
+                _, self._board, self._cover, self.enable, self.ui, self.uj = entry
+                self._word_slots = self._pos_slots = None
+            elif kind == "link" and relink:
+                word = entry[1]
+                for other in self._graph.pop(word):
+                    self._graph[other].discard(word)
+            elif kind == "unlink" and relink:
+                _, word, crosses = entry
+                self._graph[word] = crosses
+                for other in crosses:
+                    self._graph[other].add(word)
+        if relink:
+            self._n_components = n_components
+        else:
+            self._graph = None
+        self.history.truncate(n_history)
+        (self._fill_count, self._cross_count, self._gravity_sum, self._weight_sum,
+         self._inexact_weights, self._row_fill, self._col_fill) = counters
+        self._stale = False
+        # The board is back to the checkpoint, so are the scores cached at that time
+        self._version += 1
+        if cache_version == version:
+            self._cache = cache
+            self._cache_version = self._version
+        self._journal = None
+
+    def _snapshot(self):
+        """Store a snapshot of the board in the history if ``history.interval`` entries have passed since the last one."""
+        if not self.history.due():
+            return
+        n = self.nwords
+        self.history.snapshot((self._board.copy(), self.cover.copy(), self.enable.copy(), self.uori[:n].copy(),
+                               self.ui[:n].copy(), self.uj[:n].copy(), self.uwords[:n].copy(), self._useq[:n].copy(),
+                               self._nseq))
+
+    def _restore(self, state):
+        """Restore the board from a snapshot taken by ``_snapshot``."""
+        board, cover, enable, uori, ui, uj, uwords, useq, nseq = state
+        n = len(uwords)
+        self._board[...] = board
+        self._cover[...] = cover
+        self.enable[...] = enable
+        self.uori[:n], self.ui[:n], self.uj[:n], self._uwords[:n], self._useq[:n] = uori, ui, uj, uwords, useq
+        self._nseq = nseq
+        self.nwords = n
+        self._invalidate()
+
+    def _record_slot(self, ori, i, j, w_len):
+        """Save the cells of a word slot and of both of its ends to the journal."""
+        i, j = int(i), int(j)
+        if ori == 0:
+            index = (slice(max(i - 1, 0), i + w_len + 1), j)
+        if ori == 1:
+            index = (i, slice(max(j - 1, 0), j + w_len + 1))
+        self._journal.append(("board", index, self._board[index].copy(), self.cover[index].copy(), self.enable[index].copy()))
+
+    def _cached(self, key, func):
+        """Return ``func()``, memoized until the board changes."""
+        if self._cache_version != self._version:
+            self._cache = {}
+            self._cache_version = self._version
+        if key not in self._cache:
+            self._cache[key] = func()
+        return self._cache[key]
+
+    @property
+    def gravity_sum(self):
+        """Sum of the gravity over the filled cells."""
+        self._refresh()
+        if self._gravity_exact:
+            return self._gravity_sum
+        return self._cached("gravity_sum", lambda: self.gravity[self.cover != 0].sum())
+
     @property
     def dic(self):
         return self._dic
@@ -199,45 +649,53 @@ class Puzzle:
     def is_unique(self):
         """
         This method deter_mines whether it is the unique solution
+
+        See Also
+        --------
+        replaceable_pairs
         """
         if self.nwords == 0:
             return False
-        rtn_bool = True
+        return len(self.replaceable_pairs) == 0
+
+    @property
+    def replaceable_pairs(self):
+        """
+        Pairs of the words that can replace each other, having the same length
+        and the same letters at the crossings of both words.
+        """
+        return self._cached("replaceable_pairs", self._find_replaceable_pairs)
+
+    def _find_replaceable_pairs(self):
         nw = self.nwords
-        # Get 1st word
-        for s, (ori1, i1, j1, word1) in enumerate(zip(self.uori[:nw], self.ui[:nw], self.uj[:nw], self.uwords[:nw])):
-            if ori1 == 0:
-                cross_idx1 = np.where(self.cover[i1:i1 + len(word1), j1] == 2)[0]
-            elif ori1 == 1:
-                cross_idx1 = np.where(self.cover[i1, j1:j1 + len(word1)] == 2)[0]
-            # Get 2nd word
-            for ori2, i2, j2, word2 in zip(self.uori[s+1:nw], self.ui[s+1:nw], self.uj[s+1:nw], self.uwords[s+1:nw]):
-                # If word1 and word2 have different lengths, they can not be replaced
-                if len(word1) != len(word2):
-                    continue
-                if ori2 == 0:
-                    cross_idx2 = np.where(
-                        self.cover[i2:i2 + len(word2), j2] == 2)[0]
-                if ori2 == 1:
-                    cross_idx2 = np.where(
-                        self.cover[i2, j2:j2 + len(word2)] == 2)[0]
-                replaceable = True
-                # Check cross part from word1
-                for w1idx in cross_idx1:
-                    if word1[w1idx] != word2[w1idx]:
-                        replaceable = False
-                        break
-                # Check cross part from word2
-                if replaceable:
-                    for w2idx in cross_idx2:
-                        if word2[w2idx] != word1[w2idx]:
-                            replaceable = False
-                            break
-                # If word1 and word2 are replaceable, this puzzle doesn't have a simple solution -> return False
-                if replaceable:
-                    LOG.info(f" - Words '{word1}' and '{word2}' are replaceable")
-                    rtn_bool = False
-        return rtn_bool
+        # Words by length, with the offsets of their crossings
+        groups = {}
+        for s, (ori, i, j, word) in enumerate(zip(self.uori[:nw], self.ui[:nw], self.uj[:nw], self.uwords[:nw])):
+            if ori == 0:
+                seg = self.cover[i:i + len(word), j]
+            if ori == 1:
+                seg = self.cover[i, j:j + len(word)]
+            groups.setdefault(len(word), []).append((s, word, tuple(np.flatnonzero(seg == 2).tolist())))
+        pairs = set()
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            for cross in {cross1 for _, _, cross1 in group}:
+                # The words with the same letters at these crossings fall in the same bucket
+                buckets = {}
+                for entry in group:
+                    buckets.setdefault(tuple(entry[1][c] for c in cross), []).append(entry)
+                for s1, word1, cross1 in group:
+                    if cross1 != cross:
+                        continue
+                    for s2, word2, cross2 in buckets[tuple(word1[c] for c in cross)]:
+                        # Check cross part from word2
+                        if s2 != s1 and all(word1[c] == word2[c] for c in cross2):
+                            pairs.add((min(s1, s2), max(s1, s2)))
+        pairs = [(self.uwords[s1], self.uwords[s2]) for s1, s2 in sorted(pairs)]
+        for word1, word2 in pairs:
+            LOG.debug(f" - Words '{word1}' and '{word2}' are replaceable")
+        return pairs
 
     @property
     def difficulty(self):
@@ -320,16 +778,26 @@ class Puzzle:
     @property
     def stability(self):
         """Number of epochs since the solution was no longer improved."""
-        if self.log is None:
-            return 0
-        _filter = np.all(self.log.values == self.log.tail(1).values, axis=1)
-        improved_indices = np.where(_filter)[0]
-        if len(improved_indices) == 0:
+        if self._log is None:
             return 0
-        stability = int(improved_indices[-1] - improved_indices[0])
-        return stability
+        return self._log.stability
+
+    @property
+    def log(self):
+        """The logged scores as a DataFrame indexed by the epoch, or None before logging."""
+        if self._log is None:
+            return None
+        return self._log.to_frame()
+
+    @log.setter
+    def log(self, log):
+        if isinstance(log, pd.DataFrame):
+            log = ScoreLog.from_frame(log)
+        if log is not None and not isinstance(log, ScoreLog):
+            raise TypeError(f"log must be ScoreLog, DataFrame or None, not {type(log)}")
+        self._log = log
     
-    def import_dict(self, dic):
+    def import_dict(self, dic, lazy=None):
         """
         Import the Dictionary, and generate the Placeable internally.
 
@@ -337,12 +805,22 @@ class Puzzle:
         ----------
         dic : Dictionary
             Dictionary object imported to Puzzle
+        lazy : bool, optional
+            If True, the Placeable decodes candidates on demand instead of
+            materializing every (word, position) pair.
+            By default the current mode of the Placeable is kept.
         """
+        if lazy is None:
+            lazy = self._plc.lazy
         self._dic += dic
-        self._plc = Placeable(self.width, self.height, self._dic.words, self.mask)
+        self._plc = Placeable(self.width, self.height, self._dic.words, self.mask, lazy=lazy,
+                              buckets=self._dic.buckets)
+        self._shared = False
+        # Merging may reweight words already on the board
+        self._invalidate()
         LOG.info(f"Dictionary imported")
 
-    def replace_dict(self, dic):
+    def replace_dict(self, dic, lazy=None):
         """
         Replace the imported Dictionary, and generate the Placeable internally.
 
@@ -350,12 +828,21 @@ class Puzzle:
         ----------
         dic : Dictionary
             Dictionary object replaced in Puzzle
+        lazy : bool, optional
+            If True, the Placeable decodes candidates on demand instead of
+            materializing every (word, position) pair.
+            By default the current mode of the Placeable is kept.
         """
+        if lazy is None:
+            lazy = self._plc.lazy
         self._dic = dic
-        self._plc = Placeable(self.width, self.height, self._dic.words, self.mask)
+        self._plc = Placeable(self.width, self.height, self._dic.words, self.mask, lazy=lazy,
+                              buckets=self._dic.buckets)
+        # A view of a Dictionary shared with others, as given by ``Dictionary.dataset``, is copied before a change
+        self._shared = dic._shared
         LOG.info(f"Dictionary replaced")
 
-    def is_placeable(self, ori, i, j, word, w_len):
+    def is_placeable(self, ori, i, j, word, w_len, codes=None):
         """
         Returns the word placeability.
 
@@ -371,6 +858,8 @@ class Puzzle:
             The word to be checked whether it can be added
         w_len : int
             length of the word
+        codes : ndarray, optional
+            Codepoints of the word, if already encoded
 
         Returns
         -------
@@ -395,34 +884,30 @@ class Puzzle:
 
         # If the preceding and succeeding cells are already filled
         if ori == 0:
-            if i > 0 and self.cell[i - 1, j] != BLANK:
+            if i > 0 and self._board[i - 1, j] != 0:
                 return Judgement.THE_PRECEDING_AND_SUCCEEDING_CELLS_ARE_ALREADY_FILLED
-            if i + w_len < self.height and self.cell[i + w_len, j] != BLANK:
+            if i + w_len < self.height and self._board[i + w_len, j] != 0:
                 return Judgement.THE_PRECEDING_AND_SUCCEEDING_CELLS_ARE_ALREADY_FILLED
         if ori == 1:
-            if j > 0 and self.cell[i, j - 1] != BLANK:
+            if j > 0 and self._board[i, j - 1] != 0:
                 return Judgement.THE_PRECEDING_AND_SUCCEEDING_CELLS_ARE_ALREADY_FILLED
-            if j + w_len < self.width and self.cell[i, j + w_len] != BLANK:
+            if j + w_len < self.width and self._board[i, j + w_len] != 0:
                 return Judgement.THE_PRECEDING_AND_SUCCEEDING_CELLS_ARE_ALREADY_FILLED
 
         # At least one place must cross other words
         if ori == 0:
-            empties = self.cell[i:i + w_len, j] == BLANK
+            segment = self._board[i:i + w_len, j]
         if ori == 1:
-            empties = self.cell[i, j:j + w_len] == BLANK
+            segment = self._board[i, j:j + w_len]
+        empties = segment == 0
         if np.all(empties == True):
             return Judgement.AT_LEAST_ONE_PLACE_MUST_CROSS_OTHER_WORDS
 
         # Judge whether correct intersection
-        where = np.where(empties == False)[0]
-        if ori == 0:
-            j_all = np.full(where.size, j, dtype="int")
-            if np.any(self.cell[where + i, j_all] != np.array(list(word))[where]):
-                return Judgement.NOT_A_CORRECT_INTERSECTION
-        if ori == 1:
-            i_all = np.full(where.size, i, dtype="int")
-            if np.any(self.cell[i_all, where + j] != np.array(list(word))[where]):
-                return Judgement.NOT_A_CORRECT_INTERSECTION
+        if codes is None:
+            codes = _encode(word)
+        if np.any(segment[~empties] != codes[~empties]):
+            return Judgement.NOT_A_CORRECT_INTERSECTION
 
         # If the same word is in use, return False
         if word in self.uwords:
@@ -433,18 +918,18 @@ class Puzzle:
         if ori == 0:
             j_all = np.full(where.size, j, dtype="int")
             # Left side
-            if j > 0 and np.any(self.cell[where + i, j_all - 1] != BLANK):
+            if j > 0 and np.any(self._board[where + i, j_all - 1] != 0):
                 return Judgement.THE_NEIGHBOR_CELLS_ARE_FILLED_EXCEPT_AT_THE_INTERSECTION
             # Right side
-            if j < self.width - 1 and np.any(self.cell[where + i, j_all + 1] != BLANK):
+            if j < self.width - 1 and np.any(self._board[where + i, j_all + 1] != 0):
                 return Judgement.THE_NEIGHBOR_CELLS_ARE_FILLED_EXCEPT_AT_THE_INTERSECTION
         if ori == 1:
             i_all = np.full(where.size, i, dtype="int")
             # Upper
-            if i > 0 and np.any(self.cell[i_all - 1, where + j] != BLANK):
+            if i > 0 and np.any(self._board[i_all - 1, where + j] != 0):
                 return Judgement.THE_NEIGHBOR_CELLS_ARE_FILLED_EXCEPT_AT_THE_INTERSECTION
             # Lower
-            if i < self.height - 1 and np.any(self.cell[i_all + 1, where + j] != BLANK):
+            if i < self.height - 1 and np.any(self._board[i_all + 1, where + j] != 0):
                 return Judgement.THE_NEIGHBOR_CELLS_ARE_FILLED_EXCEPT_AT_THE_INTERSECTION
 
         # US/USA, DOMINICA/DOMINICAN problem
@@ -458,7 +943,74 @@ class Puzzle:
         # Returns True if no conditions are encountered.
         return Judgement.THE_WORD_CAN_BE_PLACED
 
-    def _add(self, ori, i, j, word):
+    def is_placeable_batch(self, candidates):
+        """
+        Returns the word placeability of many Placeable candidates at once.
+
+        The judgment is made on a board coded with codepoints and padded with
+        a blank frame, so that the boundary checks of ``is_placeable`` become
+        plain lookups.
+
+        Parameters
+        ----------
+        candidates : array_like
+            Candidate numbers in the Placeable
+
+        Returns
+        -------
+        result : ndarray
+            int8 numbers of the judgment results, same as ``is_placeable``
+
+        See Also
+        --------
+        is_placeable
+        """
+        candidates = np.asarray(candidates, dtype=np.int64)
+        result = np.zeros(candidates.size, dtype=np.int8)
+        if candidates.size == 0 or self.nwords == 0:
+            return result
+        ori, i, j, k = self._plc.take(candidates)
+        codes, lens = self._plc.codes()
+        word = codes[k]
+        w_len = lens[k][:, None]
+
+        # Padded board: the frame is blank and enabled
+        width = self.width + 2
+        board = np.zeros([self.height + 2, width], dtype=BOARD_DTYPE)
+        board[1:-1, 1:-1] = self._board
+        board = board.ravel()
+        enable = np.ones([self.height + 2, width], dtype=bool)
+        enable[1:-1, 1:-1] = self.enable
+        enable = enable.ravel()
+
+        # Flat indices of the letters; the positions past the word end repeat the last letter
+        step = np.where(ori == 0, width, 1)[:, None]
+        side = np.where(ori == 0, 1, width)[:, None]
+        head = (i.astype(np.int64)[:, None] + 1) * width + j.astype(np.int64)[:, None] + 1
+        inside = np.arange(word.shape[1]) < w_len
+        flat = head + step * np.minimum(np.arange(word.shape[1]), w_len - 1)
+        seg = board[flat]
+        filled = (seg != 0) & inside
+        empties = (seg == 0) & inside
+
+        def judge(failed, code):
+            result[(result == 0) & failed] = code.value
+
+        judge((board[head - step] != 0)[:, 0] | (board[head + step * w_len] != 0)[:, 0],
+              Judgement.THE_PRECEDING_AND_SUCCEEDING_CELLS_ARE_ALREADY_FILLED)
+        judge(~filled.any(axis=1), Judgement.AT_LEAST_ONE_PLACE_MUST_CROSS_OTHER_WORDS)
+        judge((filled & (seg != word)).any(axis=1), Judgement.NOT_A_CORRECT_INTERSECTION)
+        used = np.zeros(codes.shape[0], dtype=bool)
+        used_k = self._plc.index(self.uwords[:self.nwords])
+        used[used_k[used_k >= 0]] = True
+        judge(used[k], Judgement.THE_SAME_WORD_IS_IN_USE)
+        judge((empties & ((board[flat - side] != 0) | (board[flat + side] != 0))).any(axis=1),
+              Judgement.THE_NEIGHBOR_CELLS_ARE_FILLED_EXCEPT_AT_THE_INTERSECTION)
+        judge((inside & ~enable[flat]).any(axis=1) | ~empties.any(axis=1),
+              Judgement.US_USA_DOMINICA_DOMINICAN_PROBLEM)
+        return result
+
+    def _add(self, ori, i, j, word, codes=None):
         """
         This internal method places a word at arbitrary positions.
         If it is impossible to place, do nothing.
@@ -473,19 +1025,28 @@ class Puzzle:
             Column number of the word
         word : Word or str
             The word registered in Placeable
+        codes : ndarray, optional
+            Codepoints of the word, if already encoded
         """
         w_len = len(word)
+        if codes is None:
+            codes = _encode(word)
 
         # Judge whether adding is enabled
-        code = self.is_placeable(ori, i, j, word, w_len)
+        code = self.is_placeable(ori, i, j, word, w_len, codes=codes)
         if code is not Judgement.THE_WORD_CAN_BE_PLACED:
             return code
 
+        if self._journal is not None:
+            self._record_slot(ori, i, j, w_len)
+            n = self.nwords
+            self._journal.append(("add", n, self.uori[n], self.ui[n], self.uj[n], self.uwords[n], self._useq[n], n))
+
         # Put the word to puzzle
         if ori == 0:
-            self.cell[i:i + w_len, j] = list(word)
+            self._board[i:i + w_len, j] = codes
         if ori == 1:
-            self.cell[i, j:j + w_len] = list(word)
+            self._board[i, j:j + w_len] = codes
 
         # Set the prohibited cell before and after placed word
         if ori == 0:
@@ -499,24 +1060,78 @@ class Puzzle:
             if j + w_len < self.width:
                 self.enable[i, j + w_len] = False
 
+        if not isinstance(word, Word):
+            word = Word(word)
+        if self._graph is not None:
+            self._link(word, self._touching_words(ori, i, j, w_len))
+
         # Update cover array
         if ori == 0:
             self.cover[i:i + w_len, j] += 1
         if ori == 1:
             self.cover[i, j:j + w_len] += 1
-        
-        if not isinstance(word, Word):
-            word = Word(word)
+        self._count(ori, i, j, w_len, word.weight, 1)
 
         # Update properties
-        self.uori[self.nwords] = ori
-        self.ui[self.nwords] = i
-        self.uj[self.nwords] = j
-        self.uwords[self.nwords] = word
+        self._put_slot(self.nwords, ori, i, j, word, self._nseq)
+        self._nseq += 1
         self.nwords += 1
         self.history.append(HistoryItem(HistoryCode.ADD, ori, i, j, word))
+        self._snapshot()
         return code
 
+    def _add_bulk(self, ori, i, j, words, board, cover, enable):
+        """
+        This internal method places words that were already judged and put on copies of the board.
+
+        Parameters
+        ----------
+        ori, i, j : ndarray
+            Directions and positions of the words in the order of placement
+        words : list of Word
+            The words registered in Placeable
+        board, cover, enable : ndarray
+            The board arrays after placing the words
+        """
+        n, m = self.nwords, len(words)
+        if m == 0:
+            return
+        idx = slice(n, n + m)
+        if self._journal is not None:
+            self._journal.append(("board", (slice(None), slice(None)), self._board.copy(), self.cover.copy(), self.enable.copy()))
+            self._journal.append(("add", idx, self.uori[idx].copy(), self.ui[idx].copy(), self.uj[idx].copy(), self.uwords[idx].copy(),
+                                  self._useq[idx].copy(), n))
+
+        # Update the running counters by the cells that got filled and crossed
+        self._version += 1
+        self._graph = None
+        self._word_slots = self._pos_slots = None
+        if not self._stale:
+            filled = (cover != 0) & (self.cover == 0)
+            self._fill_count += int(np.count_nonzero(filled))
+            self._cross_count += int(np.count_nonzero(cover == 2)) - int(np.count_nonzero(self.cover == 2))
+            self._gravity_sum += self.gravity[filled].sum()
+            self._row_fill += filled.sum(axis=1)
+            self._col_fill += filled.sum(axis=0)
+            for word in words:
+                if _is_integral(word.weight):
+                    self._weight_sum += word.weight
+                else:
+                    self._inexact_weights += 1
+
+        self._board[...] = board
+        self._cover[...] = cover
+        self.enable[...] = enable
+        self.uori[idx] = ori
+        self.ui[idx] = i
+        self.uj[idx] = j
+        self.uwords[idx] = words
+        self._useq[idx] = np.arange(self._nseq, self._nseq + m)
+        self._nseq += m
+        self.nwords += m
+        self.history.extend(map(HistoryItem, [HistoryCode.ADD] * m, ori.tolist(), i.tolist(), j.tolist(), words))
+        self._snapshot()
+
     def add(self, ori, i, j, word, weight=0):
         """
         Places a word at arbitrary positions.
@@ -537,75 +1152,249 @@ class Puzzle:
         """
         if not isinstance(word, str):
             raise TypeError("word must be Word or str")
+        self._unshare()
+        is_new_word = not self._dic.include(word)
         self._dic.add(word, weight)
-        self._plc.add([Word(word, weight)], mask=self.mask, base_k=self._dic.size - 1)
+        if is_new_word:
+            self._plc.add([Word(word, weight)], mask=self.mask, base_k=self._dic.size - 1)
+        else:
+            self._invalidate()
         return self._add(ori, i, j, Word(word, weight))
 
     def add_to_limit(self):
         """
         Adds the words as much as possible.
+
+        Notes
+        -----
+        The candidates are visited in the order of a random permutation of the Placeable,
+        sweep after sweep, until no word can be added.
+        Only the candidates that pass through a filled cell with the matching letter
+        are judged, since every other candidate fails with
+        ``AT_LEAST_ONE_PLACE_MUST_CROSS_OTHER_WORDS``.
+        The frontier of filled cells grows as words are placed, and the candidates
+        it exposes are visited later in the current sweep or in the next sweep,
+        just as a full scan would do.
+        Every other judgement is final at the visit while words are only added,
+        so each candidate is judged at most once, and the candidates that already
+        fail in ``is_placeable_batch`` when they are exposed are never queued,
+        except for ``THE_NEIGHBOR_CELLS_ARE_FILLED_EXCEPT_AT_THE_INTERSECTION``,
+        which a word crossing the neighbor may clear before the visit.
         """
         # Make a random index of plc
-        random = np.arange(self._plc.size)
-        np.random.shuffle(random)
+        random = self._plc.permutation()
+        if random.size == 0:
+            return
+        judged = set()
+        table, w_lens = self._plc.codes()
+
+        # The first word can be placed anywhere
+        if self.nwords == 0:
+            ori, i, j, k = self._plc.take([random[0]])
+            self._add(ori[0], i[0], j[0], self._plc.words[k[0]], codes=table[k[0], :w_lens[k[0]]])
+            judged.add(int(random[0]))
+
+        def get_queue_items(i, j, sweep, rank=-1):
+            """Candidates crossing the cells, keyed by (sweep, rank)"""
+            candidates = np.unique(self._plc.crossing(i, j, self._board[i, j]))
+            candidates = candidates[[c not in judged for c in candidates.tolist()]]
+            # Pre-filter with the batch judgment: the failed ones will never be placeable
+            codes = self.is_placeable_batch(candidates)
+            dead = ~np.isin(codes, [Judgement.THE_WORD_CAN_BE_PLACED.value,
+                                    Judgement.AT_LEAST_ONE_PLACE_MUST_CROSS_OTHER_WORDS.value,
+                                    Judgement.THE_NEIGHBOR_CELLS_ARE_FILLED_EXCEPT_AT_THE_INTERSECTION.value])
+            judged.update(candidates[dead].tolist())
+            candidates = candidates[~dead]
+            ranks = random.rank(candidates)
+            sweeps = np.where(ranks > rank, sweep, sweep + 1)
+            return list(zip(sweeps.tolist(), ranks.tolist(), candidates.tolist(), *map(np.ndarray.tolist, self._plc.take(candidates))))
+
+        # Candidates crossing the frontier of filled cells
+        queue = get_queue_items(*np.nonzero(self.cover), sweep=0)
+        heapq.heapify(queue)
 
         # Add as much as possible
-        nwords_tmp = None
-        while self.nwords != nwords_tmp:
-            nwords_tmp = self.nwords
-            drop_idx = []
-            for i, r in enumerate(random):
-                code = self._add(self._plc.ori[r], self._plc.i[r], self._plc.j[r], self._plc.word[r])
-                if code is not Judgement.AT_LEAST_ONE_PLACE_MUST_CROSS_OTHER_WORDS:
-                    drop_idx.append(i)
-            random = np.delete(random, drop_idx)
+        while queue:
+            sweep, rank, c, ori, i, j, k = heapq.heappop(queue)
+            if c in judged:
+                continue
+            judged.add(c)
+            word = self._plc.words[k]
+            code = self._add(ori, i, j, word, codes=table[k, :w_lens[k]])
+            if code is not Judgement.THE_WORD_CAN_BE_PLACED:
+                continue
+            # Extend the frontier by the newly filled cells
+            if ori == 0:
+                new = np.where(self.cover[i:i + len(word), j] == 1)[0]
+                new_i, new_j = i + new, np.full(new.size, j)
+            if ori == 1:
+                new = np.where(self.cover[i, j:j + len(word)] == 1)[0]
+                new_i, new_j = np.full(new.size, i), j + new
+            for item in get_queue_items(new_i, new_j, sweep, rank):
+                heapq.heappush(queue, item)
         return
 
     def add_to_limit_f(self, blank="*"):
         """
-        Adds the words as much as possible.
+        Adds the words as much as possible by the compiled kernel.
+        Without the Fortran kernels, the first available backend adds them instead.
+
+        Parameters
+        ----------
+        blank : str, default "*"
+            Not used. The blank cells of the codepoint board are 0.
         """
+        try:
+            futils = _import_futils()
+        except ImportError as err:
+            _fallback_backend(err).add_to_limit(self)
+            return
+        k_s = self._plc.fortran_arrays()[3]
+        used = self._used_mask()
         # Make a random index of plc
-        not_uwords_idx = np.ones(len(self._plc), dtype=bool)
-        plc_words = np.array(self._plc.word, dtype=object)
-        for uword in self.uwords[:self.nwords]:
-            not_uwords_idx[plc_words == uword] = False
-        random = np.arange(self._plc.size - np.count_nonzero(~not_uwords_idx))
+        candidates = np.flatnonzero(used[k_s] == 0)
+        random = np.arange(candidates.size)
         np.random.shuffle(random)
+        perm = (candidates[random] + 1).astype(np.int32)
+        self._add_to_limit_kernel(futils, perm)
 
-        # Add as much as possible
-        n = random.size
-        w_len_max = max(self._dic.w_len)
-
-        cell = np.where(self.cell == BLANK, blank, self.cell)
-        cell = np.array(list(map(lambda x: ord(x), cell.ravel()))).reshape(cell.shape)
-        cell = np.asfortranarray(cell.astype(np.int32))
-
-        ori_s = np.array(self._plc.ori)[not_uwords_idx][random]
-        i_s = np.array(self._plc.i)[not_uwords_idx][random] + 1
-        j_s = np.array(self._plc.j)[not_uwords_idx][random] + 1
-        k_s = np.array(self._plc.k)[not_uwords_idx][random]
-        plc_words = plc_words[not_uwords_idx][random]
-        w_lens = np.array(self._dic.w_len)[k_s]
-        # convert str to int
-        str2int = lambda plc_word: list(map(ord, plc_word))
-        words_int = list(map(str2int, plc_words))
-        # 0 padding
-        padding = lambda x: x + [0] * (w_len_max - len(x))
-        words_int = np.asfortranarray(np.array(list(map(padding, words_int)), dtype=np.int32))
-        enable = np.asfortranarray(self.enable.astype(np.int32))
+    def neighbor_f(self):
+        """
+        Drops words until the connectivity collapses, kicks the words out of the largest component
+        and adds the words as much as possible, in one call of the compiled kernel.
 
+        Notes
+        -----
+        The random numbers are drawn as in ``collapse`` and ``add_to_limit``,
+        so the result is the same as ``collapse``, ``kick`` and ``add_to_limit`` in a row.
+        """
         try:
-            from pyzzle import futils
-            uidx = futils.add_to_limit(self.height, self.width, n, w_len_max, ord(blank),
-                                    ori_s, i_s, j_s, k_s, words_int, w_lens, cell, enable)
-        except(ImportError) as err:
-            LOG.info(str(err))
-            raise ImportError("Puzzle.add_to_limit is not installed.\nAfter installing GCC and GFortran, you need to reinstall pyzzle.")
-
-        for p in uidx[uidx != -1]-1:
-            self._add(ori_s[p], i_s[p] - 1, j_s[p] - 1, Word(plc_words[p], plc_words[p].weight))
-        return
+            futils = _import_futils()
+        except ImportError as err:
+            _fallback_backend(err).neighbor(self)
+            return
+        self._neighbor_kernel(futils)
+
+    def _used_mask(self):
+        """int32 mask of the words in use, indexed by the word number ``k`` of the Placeable."""
+        used = np.zeros(len(self._plc.words), dtype=np.int32)
+        used_k = self._plc.index(self.uwords[:self.nwords])
+        used[used_k[used_k >= 0]] = 1
+        return used
+
+    def _visiting_order(self):
+        """1-based candidate numbers in the random order of ``add_to_limit``."""
+        random = self._plc.permutation()
+        return (random[np.arange(random.size)] + 1).astype(np.int32)
+
+    def _judge_kernel(self, kernels, candidates):
+        """
+        ``is_placeable_batch`` by a kernel module with the interface of ``futils``.
+        """
+        ori_s, i_s, j_s, k_s, words_int, w_lens = self._plc.fortran_arrays()
+        candidates = (np.asarray(candidates) + 1).astype(np.int32)
+        cell = np.array(self._board, order="F")
+        enable = np.asfortranarray(self.enable.astype(np.int32))
+        codes = kernels.judge(self.height, self.width, 0, ori_s, i_s, j_s, k_s, words_int, w_lens,
+                              candidates, self._used_mask(), cell, enable)
+        return codes.astype(np.int8)
+
+    def _add_to_limit_kernel(self, kernels, perm):
+        """
+        ``add_to_limit`` by a kernel module with the interface of ``futils``.
+
+        Parameters
+        ----------
+        kernels : module
+            ``futils`` or ``nbutils``
+        perm : ndarray
+            1-based candidate numbers in the order to visit
+        """
+        ori_s, i_s, j_s, k_s, words_int, w_lens = self._plc.fortran_arrays()
+        cell = np.array(self._board, order="F")
+        enable = np.asfortranarray(self.enable.astype(np.int32))
+        cover = np.asfortranarray(self.cover.astype(np.int32))
+        placed, n_placed = kernels.add_to_limit(self.height, self.width, 0, ori_s, i_s, j_s, k_s, words_int, w_lens,
+                                                perm, self._used_mask(), cell, enable, cover)
+
+        # Apply the board of the kernel without judging the words again
+        placed = placed[:n_placed] - 1
+        self._add_bulk(ori_s[placed], i_s[placed] - 1, j_s[placed] - 1, [self._plc.words[k] for k in k_s[placed].tolist()],
+                       cell, cover, enable)
+
+    def _neighbor_kernel(self, kernels):
+        """
+        ``collapse``, ``kick`` and ``add_to_limit`` by a kernel module with the interface of ``futils``.
+        """
+        nwords = self.nwords
+        if nwords == 0:
+            self._add_to_limit_kernel(kernels, self._visiting_order())
+            return
+        ori_s, i_s, j_s, k_s, words_int, w_lens = self._plc.fortran_arrays()
+        # The kernel takes the words in the order of placement, in which kick visits them
+        placement = self._placement_order()
+        uk = self._plc.index(self.uwords[:nwords][placement])
+        if np.any(uk < 0):
+            # Words out of the Placeable can only be dropped by the Python methods
+            self.collapse()
+            self.kick()
+            self._add_to_limit_kernel(kernels, self._visiting_order())
+            return
+        # Random orders of the words to drop, as placement positions like collapse, and of the candidates to add
+        order = np.arange(nwords)
+        np.random.shuffle(order)
+        perm = self._visiting_order()
+
+        cell = np.array(self._board, order="F")
+        enable = np.asfortranarray(self.enable.astype(np.int32))
+        cover = np.asfortranarray(self.cover.astype(np.int32))
+        dropped, n_collapse, n_dropped, placed, n_placed = kernels.epoch(
+            self.height, self.width, 0, self.uori[:nwords][placement].astype(np.int32),
+            self.ui[:nwords][placement].astype(np.int32) + 1, self.uj[:nwords][placement].astype(np.int32) + 1,
+            uk.astype(np.int32), (order + 1).astype(np.int32),
+            ori_s, i_s, j_s, k_s, words_int, w_lens, perm, cell, enable, cover)
+
+        if self._journal is not None:
+            self._journal.append(("board", (slice(None), slice(None)), self._board.copy(), self.cover.copy(), self.enable.copy()))
+            self._journal.append(("add", slice(None), self.uori.copy(), self.ui.copy(), self.uj.copy(), self.uwords.copy(),
+                                  self._useq.copy(), nwords))
+
+        # Pull out the dropped words, moving the last word into each emptied slot as _drop does
+        dropped = placement[dropped[:n_dropped] - 1]
+        codes = [HistoryCode.DROP] * n_collapse + [HistoryCode.DROP_KICK] * (n_dropped - n_collapse)
+        self.history.extend(map(HistoryItem, codes, self.uori[dropped].tolist(), self.ui[dropped].tolist(),
+                                self.uj[dropped].tolist(), self.uwords[dropped]))
+        slots = np.arange(nwords)
+        where = np.arange(nwords)
+        for last, idx in enumerate(dropped.tolist()):
+            last = nwords - 1 - last
+            moved = slots[last]
+            slots[where[idx]] = moved
+            where[moved] = where[idx]
+        n_kept = nwords - n_dropped
+        slots = slots[:n_kept]
+        for u, empty in ((self.uori, EMPTY), (self.ui, EMPTY), (self.uj, EMPTY), (self.uwords, BLANK), (self._useq, -1)):
+            u[:n_kept] = u[:nwords][slots]
+            u[n_kept:nwords] = empty
+
+        # Put the added words in order
+        placed = placed[:n_placed] - 1
+        idx = slice(n_kept, n_kept + n_placed)
+        self.uori[idx] = ori_s[placed]
+        self.ui[idx] = i_s[placed] - 1
+        self.uj[idx] = j_s[placed] - 1
+        self.uwords[idx] = [self._plc.words[k] for k in k_s[placed].tolist()]
+        self._useq[idx] = np.arange(self._nseq, self._nseq + n_placed)
+        self._nseq += n_placed
+        self.nwords = n_kept + n_placed
+        self.history.extend(map(HistoryItem, [HistoryCode.ADD] * n_placed, self.uori[idx].tolist(),
+                                self.ui[idx].tolist(), self.uj[idx].tolist(), self.uwords[idx]))
+
+        self._board[...] = cell
+        self._cover[...] = cover
+        self.enable[...] = enable
+        self._invalidate()
+        self._snapshot()
 
     def show(self):
         """
@@ -620,11 +1409,11 @@ class Puzzle:
         if self.obj_func is None:
             raise RuntimeError(
                 "Logging method must be executed after compilation method")
-        if self.log is None:
-            self.log = pd.DataFrame(columns=self.obj_func.get_funcs())
-            self.log.index.name = "epoch"
-        tmp_series = pd.Series(self.obj_func.get_score(self, all=True), index=self.obj_func.get_funcs())
-        self.log = pd.concat([self.log, tmp_series], ignore_index=True)
+        funcs = self.obj_func.get_funcs()
+        # The scores of other objective functions start a new log
+        if self._log is None or self._log.columns != list(funcs):
+            self._log = ScoreLog(funcs)
+        self._log.append(self.obj_func.get_score(self, all=True), epoch=self.epoch)
 
     def _drop(self, ori, i, j, word, is_kick=False):
         """
@@ -651,29 +1440,33 @@ class Puzzle:
         or cause LAOS / US / USA problems.
         """
         # Get p_idx
-        drop_idx = np.where(self.uwords == word)[0][0]
+        drop_idx = self._slot_of(word)
         w_len = len(word)
 
+        if self._journal is not None:
+            self._record_slot(ori, i, j, w_len)
+            self._journal.append(("drop", drop_idx, self.uori[drop_idx], self.ui[drop_idx], self.uj[drop_idx],
+                                  self.uwords[drop_idx], self._useq[drop_idx], self.nwords))
+        if self._graph is not None:
+            self._unlink(self.uwords[drop_idx])
+
         # Pull out a word
         if ori == 0:
             self.cover[i:i + w_len, j] -= 1
             where = np.where(self.cover[i:i + w_len, j] == 0)[0]
             j_all = np.full(where.size, j, dtype="int")
-            self.cell[i + where, j_all] = BLANK
+            self._board[i + where, j_all] = 0
         if ori == 1:
             self.cover[i, j:j + w_len] -= 1
             where = np.where(self.cover[i, j:j + w_len] == 0)[0]
             i_all = np.full(where.size, i, dtype="int")
-            self.cell[i_all, j + where] = BLANK
-        # Update        
-        self.uori[drop_idx:-1] = self.uori[drop_idx+1:]
-        self.uori[-1] = EMPTY
-        self.ui[drop_idx:-1] = self.ui[drop_idx+1:]
-        self.ui[-1] = EMPTY
-        self.uj[drop_idx:-1] = self.uj[drop_idx+1:]
-        self.uj[-1] = EMPTY
-        self.uwords[drop_idx:-1] = self.uwords[drop_idx+1:]
-        self.uwords[-1] = BLANK
+            self._board[i_all, j + where] = 0
+        self._count(ori, i, j, w_len, self.uwords[drop_idx].weight, -1)
+        # Update the slots, moving the last word into the emptied one
+        last = self.nwords - 1
+        self._pop_slot(drop_idx)
+        if drop_idx != last:
+            self._put_slot(drop_idx, *self._pop_slot(last))
         self.nwords -= 1
         # Insert data to history
         code = HistoryCode.DROP_KICK if is_kick else HistoryCode.DROP
@@ -682,42 +1475,43 @@ class Puzzle:
         remove_flag = True
         if ori == 0:
             if i > 0:
-                if i > 2 and np.all(self.cell[[i - 3, i - 2], [j, j]] != BLANK):
+                if i > 2 and np.all(self._board[[i - 3, i - 2], [j, j]] != 0):
                     remove_flag = False
-                if j > 2 and np.all(self.cell[[i - 1, i - 1], [j - 2, j - 1]] != BLANK):
+                if j > 1 and np.all(self._board[[i - 1, i - 1], [j - 2, j - 1]] != 0):
                     remove_flag = False
-                if j < self.width - 2 and np.all(self.cell[[i - 1, i - 1], [j + 1, j + 2]] != BLANK):
+                if j < self.width - 2 and np.all(self._board[[i - 1, i - 1], [j + 1, j + 2]] != 0):
                     remove_flag = False
                 if remove_flag:
                     self.enable[i - 1, j] = True
             if i + w_len < self.height:
-                if i + w_len < self.height - 2 and np.all(self.cell[[i + w_len + 1, i + w_len + 2], [j, j]] != BLANK):
+                if i + w_len < self.height - 2 and np.all(self._board[[i + w_len + 1, i + w_len + 2], [j, j]] != 0):
                     remove_flag = False
-                if j > 2 and np.all(self.cell[[i + w_len, i + w_len], [j - 2, j - 1]] != BLANK):
+                if j > 1 and np.all(self._board[[i + w_len, i + w_len], [j - 2, j - 1]] != 0):
                     remove_flag = False
-                if j < self.width - 2 and np.all(self.cell[[i + w_len, i + w_len], [j + 1, j + 2]] != BLANK):
+                if j < self.width - 2 and np.all(self._board[[i + w_len, i + w_len], [j + 1, j + 2]] != 0):
                     remove_flag = False
                 if remove_flag:
                     self.enable[i + w_len, j] = True
         if ori == 1:
             if j > 0:
-                if j > 2 and np.all(self.cell[[i, i], [j - 3, j - 2]] != BLANK):
+                if j > 2 and np.all(self._board[[i, i], [j - 3, j - 2]] != 0):
                     remove_flag = False
-                if i > 2 and np.all(self.cell[[i - 2, i - 1], [j - 1, j - 1]] != BLANK):
+                if i > 1 and np.all(self._board[[i - 2, i - 1], [j - 1, j - 1]] != 0):
                     remove_flag = False
-                if i < self.height - 2 and np.all(self.cell[[i + 1, i + 2], [j - 1, j - 1]] != BLANK):
+                if i < self.height - 2 and np.all(self._board[[i + 1, i + 2], [j - 1, j - 1]] != 0):
                     remove_flag = False
                 if remove_flag:
                     self.enable[i, j - 1] = True
             if j + w_len < self.width:
-                if j + w_len < self.width - 2 and np.all(self.cell[[i, i], [j + w_len + 1, j + w_len + 2]] != BLANK):
+                if j + w_len < self.width - 2 and np.all(self._board[[i, i], [j + w_len + 1, j + w_len + 2]] != 0):
                     remove_flag = False
-                if i > 2 and np.all(self.cell[[i - 2, i - 1], [j + w_len, j + w_len]] != BLANK):
+                if i > 1 and np.all(self._board[[i - 2, i - 1], [j + w_len, j + w_len]] != 0):
                     remove_flag = False
-                if i < self.height - 2 and np.all(self.cell[[i + 1, i + 2], [j + w_len, j + w_len]] != BLANK):
+                if i < self.height - 2 and np.all(self._board[[i + 1, i + 2], [j + w_len, j + w_len]] != 0):
                     remove_flag = False
                 if remove_flag:
                     self.enable[i, j + w_len] = True
+        self._snapshot()
         return
 
     def drop(self, word=None, ori_i_j=None):
@@ -746,7 +1540,7 @@ class Puzzle:
             if not isinstance(word, str):
                 raise TypeError("'word' must be Word or str")
             word = Word(word)
-            drop_idx = np.where(self.uwords == word)[0][0]
+            drop_idx = self._slot_of(word)
             ori = self.uori[drop_idx]
             i = self.ui[drop_idx]
             j = self.uj[drop_idx]
@@ -757,10 +1551,7 @@ class Puzzle:
                 raise ValueError(
                     f"Length of 'ori_i_j' must be 3, not {len(ori_i_j)}")
             ori, i, j = ori_i_j
-            for _ori, _i, _j, _word in zip(self.uori, self.ui, self.uj, self.uwords):
-                if _ori == ori and _i == i and _j == j:
-                    word = _word
-                    break
+            word = self.uwords[self._slot_of(ori_i_j=ori_i_j)]
         self._drop(ori, i, j, word)
 
     def collapse(self):
@@ -770,15 +1561,16 @@ class Puzzle:
         # If nwords = 0, return
         if self.nwords == 0:
             return
-        # Make a random index of nwords
-        random = np.arange(self.nwords)
+        # Make a random index of nwords, shuffling the slots in the order of placement
+        random = self._placement_order()
         np.random.shuffle(random)
+        self._refresh_graph()
         # Drop words until connectivity collapses
-        uori_random = copy.deepcopy(self.uori[:self.nwords][random])
-        ui_random = copy.deepcopy(self.ui[:self.nwords][random])
-        uj_random = copy.deepcopy(self.uj[:self.nwords][random])
-        uword_random = copy.deepcopy(self.uwords[:self.nwords][random])
-        w_lens = np.vectorize(len)(uword_random)
+        uori_random = self.uori[:self.nwords][random]
+        ui_random = self.ui[:self.nwords][random]
+        uj_random = self.uj[:self.nwords][random]
+        uword_random = self.uwords[:self.nwords][random]
+        w_lens = [len(word) for word in uword_random]
         for ori, i, j, word, w_len in zip(uori_random, ui_random, uj_random, uword_random, w_lens):
             # If '2' is aligned in the cover array, the word can not be dropped
             if ori == 0:
@@ -787,7 +1579,7 @@ class Puzzle:
             if ori == 1:
                 if not np.any(np.diff(np.where(self.cover[i, j:j + w_len] == 2)[0]) == 1):
                     self._drop(ori, i, j, word)
-            if self.component >= 2:
+            if self._get_n_components() >= 2:
                 break
         return
     
@@ -809,7 +1601,8 @@ class Puzzle:
         """
         import pyzzle
         words = []
-        for ori, i, j, word in zip(self.uori[:self.nwords], self.ui[:self.nwords], self.uj[:self.nwords], self.uwords[:self.nwords]):
+        order = self._placement_order()
+        for ori, i, j, word in zip(self.uori[order], self.ui[order], self.uj[order], self.uwords[order]):
             words.append({"ori": int(ori), "i": int(i), "j": int(j), "word": word})
         mask = self.mask
         if mask is None:
@@ -875,29 +1668,67 @@ class Puzzle:
         return puzzle
     
     def copy(self, deep=True):
-        if deep:
-            return copy.deepcopy(self)
-        return copy.copy(self)
+        """
+        Return a copy of the puzzle.
+
+        Parameters
+        ----------
+        deep : bool, default True
+            If True, the board is copied. The Dictionary and the Placeable are shared
+            with the copy until one of them adds a new word, the log until one of them logs,
+            and the history until one of them records an operation.
+        """
+        if not deep:
+            return copy.copy(self)
+        memo = {id(self._dic): self._dic, id(self._plc): self._plc, id(self._log): copy.copy(self._log),
+                id(self.history): copy.copy(self.history), id(self.base_history): copy.copy(self.base_history),
+                id(self._journal): None}
+        for word in self.uwords[:self.nwords]:
+            memo[id(word)] = word
+        self._shared = True
+        return copy.deepcopy(self, memo)
+
+    def _unshare(self):
+        """Take private copies of the Dictionary and the Placeable shared with other copies."""
+        if not self._shared:
+            return
+        memo = {}
+        self._dic = copy.deepcopy(self._dic, memo)
+        self._plc = copy.deepcopy(self._plc, memo)
+        # Keep the words on the board identical to the ones in the copied Dictionary
+        for idx, word in enumerate(self.uwords):
+            self.uwords[idx] = memo.get(id(word), word)
+        self._shared = False
 
     def kick(self):
         """
         Remove words other than the largest component from puzzle
         """
         # If nwords = 0, return
-        if self.nwords == 0:
+        if self.nwords == 0 or self._get_n_components() == 1:
             return
-        mask = self.cover > 0
-        label, nlabel = ndi.label(mask)
-        sizes = ndi.sum(mask, label, range(nlabel + 1))
-        largest_ccl = sizes.argmax()
-        # Erase elements except largest component.
-        # In self._drop ux will shrink, so pass prev_ux in reverse order.
-        prev_uori = self.uori[:self.nwords][::-1]
-        prev_ui = self.ui[:self.nwords][::-1]
-        prev_uj = self.uj[:self.nwords][::-1]
-        prev_uwords = self.uwords[:self.nwords][::-1]
+        components = self._components()
+        # The largest component in cells, the first one in the row-major order among the ties
+        n = self.nwords
+        heads = dict(zip(self.uwords[:n], (self.ui[:n] * self.width + self.uj[:n]).tolist()))
+        # Cells shared with a crossing word, which is in the same component
+        shared = {}
+        for ori, i, j, word in zip(self.uori[:n].tolist(), self.ui[:n].tolist(), self.uj[:n].tolist(), self.uwords[:n]):
+            cover = self.cover[i:i + len(word), j] if ori == 0 else self.cover[i, j:j + len(word)]
+            shared[word] = int(np.count_nonzero(cover == 2))
+
+        def rank(component):
+            n_cells = sum(len(word) for word in component) - sum(shared[word] for word in component) // 2
+            return n_cells, -min(heads[word] for word in component)
+        largest = max(components, key=rank)
+        # Erase elements except largest component, the last placed first.
+        order = self._placement_order()[::-1]
+        prev_uori = self.uori[order]
+        prev_ui = self.ui[order]
+        prev_uj = self.uj[order]
+        prev_uwords = self.uwords[order]
         for ori, i, j, word in zip(prev_uori, prev_ui, prev_uj, prev_uwords):
-            if label[i, j] != largest_ccl:
+            if word not in largest:
                 self._drop(ori, i, j, word, is_kick=True)
         return
 
@@ -954,14 +1785,14 @@ class Puzzle:
         --------
         Pandas.DataFrame.plot
         """
-        if self.log is None:
+        if self._log is None:
             raise RuntimeError("Puzzle has no log")
         if figsize is None:
             if len(self.obj_func) <= 5:
                 figsize = [5, 5]
             else:
                 figsize = [len(self.obj_func), len(self.obj_func)]
-        return self.log.plot(subplots=True, title=name, grid=grid, figsize=figsize, **kwargs)
+        return self._log.to_frame().plot(subplots=True, title=name, grid=grid, figsize=figsize, **kwargs)
 
     def save_problem_image(self, fname, list_label="word list", dpi=300):
         """
@@ -999,10 +1830,20 @@ class Puzzle:
         utils.save_image(fname, self.cell, word_list, mask=self.mask,
                          title=self.name, label=list_label, dpi=dpi)
 
+    def _timeline(self):
+        """Return the history that ``jump`` moves along: ``base_history`` if the puzzle is on it, else ``history``."""
+        if self.base_history.startswith(self.history):
+            return self.base_history
+        return self.history
+
     def jump(self, idx):
         """
         Jump to the specified log state.
 
+        The board is restored from the nearest snapshot in the history
+        and the operations after it are replayed.
+        The Dictionary and the Placeable are shared with the jumped puzzle.
+
         Parameters
         ----------
         idx : int
@@ -1013,19 +1854,21 @@ class Puzzle:
         jumped_puzzle : Puzzle
             Jumped Puzzle
         """
-        jumped_puzzle = self.__class__(self.width, self.height, self.mask, self.name)
-        jumped_puzzle._dic = copy.deepcopy(self._dic)
-        jumped_puzzle._plc = Placeable(self.width, self.height, jumped_puzzle._dic, self.mask)
+        base_history = self._timeline()
+        if base_history is self.history and idx > len(self.history):
+            raise RuntimeError('This puzzle is up to date')
+        idx = min(idx, len(base_history))
+        jumped_puzzle = self.__class__(self.width, self.height, mask=self.mask, gravity=self.gravity, name=self.name)
+        jumped_puzzle._dic = self._dic
+        jumped_puzzle._plc = self._plc
+        jumped_puzzle._shared = self._shared = True
         jumped_puzzle.obj_func = copy.deepcopy(self.obj_func)
-        jumped_puzzle.base_history = copy.deepcopy(self.base_history)
-
-        if not set(self.history).issubset(self.base_history):
-            if idx <= len(self.history):
-                jumped_puzzle.base_history = copy.deepcopy(self.history)
-            else:
-                raise RuntimeError('This puzzle is up to date')
+        jumped_puzzle.base_history = copy.copy(base_history)
 
-        for hist in jumped_puzzle.base_history[:idx]:
+        size, state = base_history.restore_point(idx)
+        if state is not None:
+            jumped_puzzle._restore(state)
+        for hist in base_history[size:idx]:
             if hist.code == HistoryCode.ADD:
                 jumped_puzzle._add(hist.ori, hist.i, hist.j, hist.word)
             elif hist.code == HistoryCode.DROP:
@@ -1034,6 +1877,8 @@ class Puzzle:
                 jumped_puzzle._drop(hist.ori, hist.i, hist.j, hist.word, is_kick=True)
             elif hist.code == HistoryCode.MOVE:
                 jumped_puzzle.move(direction=hist.direction, n=hist.n)
+        # The replayed entries are those of the base history, which keeps the snapshots
+        jumped_puzzle.history = base_history.head(idx)
         return jumped_puzzle
 
     def get_prev(self, n=1):
@@ -1069,7 +1914,7 @@ class Puzzle:
         next_puzzle : Puzzle
             Next Puzzle
         """
-        if len(self.history) + n > len(self.base_history):
+        if len(self.history) + n > len(self._timeline()):
             return self.get_latest()
         next_puzzle = self.jump(len(self.history) + n)
         return next_puzzle
@@ -1083,7 +1928,7 @@ class Puzzle:
         latest_puzzle : Puzzle
             Latest puzzle
         """
-        return self.jump(len(self.base_history))
+        return self.jump(len(self._timeline()))
 
     def to_pickle(self, name=None):
         """
@@ -1097,7 +1942,7 @@ class Puzzle:
     @property
     def rect(self):
         try:
-            r_min, r_max, c_min, c_max = utils.get_rect(self.cover)
+            r_min, r_max, c_min, c_max = self._get_rect()
         except ZeroSizePuzzleException:
             return np.array([[],[]])
         return self.cell[r_min:r_max+1, c_min:c_max+1]
@@ -1110,7 +1955,7 @@ class Puzzle:
         new_puzzle.mask = self.mask
         new_puzzle.epoch = self.epoch
         new_puzzle.seed = self.seed
-        new_puzzle.log = self.log
+        new_puzzle.log = copy.copy(self._log)
         new_puzzle.obj_func = self.obj_func
         return new_puzzle
 
@@ -1132,7 +1977,7 @@ class Puzzle:
         limit : bool, default False
             If True, move as much as possible in the specified direction.
         """
-        r_min, r_max, c_min, c_max = utils.get_rect(self.cover)
+        r_min, r_max, c_min, c_max = self._get_rect()
         if r_min == -1:
             return
         str2int = {'U': 1, 'D': 2, 'R': 3, 'L': 4}
@@ -1147,6 +1992,9 @@ class Puzzle:
 
         n2limit = {1: r_min, 2: self.height - (r_max + 1), 3: self.width - (c_max + 1), 4: c_min}
 
+        if self._journal is not None:
+            self._journal.append(("move", self._board.copy(), self.cover.copy(), self.enable.copy(), self.ui.copy(), self.uj.copy()))
+
         if limit:
             n = n2limit[direction]
 
@@ -1175,12 +2023,20 @@ class Puzzle:
             if self.mask is not None:
                 if np.any(np.roll(self.cover, sum(di_dj), axis=axis)[self.mask == True] >= 1):
                     break
-            self.cell = np.roll(self.cell, sum(di_dj), axis=axis)
-            self.cover = np.roll(self.cover, sum(di_dj), axis=axis)
+            self._board = np.roll(self._board, sum(di_dj), axis=axis)
+            self._cover = np.roll(self.cover, sum(di_dj), axis=axis)
+            self._row_fill = np.roll(self._row_fill, di_dj[0])
+            self._col_fill = np.roll(self._col_fill, di_dj[1])
             self.ui += di_dj[0]
             self.uj += di_dj[1]
             self.history.append(HistoryItemMove(HistoryCode.MOVE, direction, 1))
+        # Only the gravity depends on the absolute position of the letters
+        self._gravity_sum = self.gravity[self.cover != 0].sum()
+        self._pos_slots = None
+        self._word_slots = None
+        self._version += 1
         self.enable = self.get_enable(self.cell)
+        self._snapshot()
         return
 
     @classmethod
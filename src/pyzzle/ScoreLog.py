@@ -0,0 +1,159 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _key(scores):
+    """Return the hashable key of a score vector, with -0.0 taken as 0.0."""
+    return (scores + 0.0).tobytes()
+
+
+class _Rows:
+    """Preallocated rows of a ScoreLog, shared by its copies."""
+    def __init__(self, n_columns, capacity):
+        self.values = np.empty((capacity, n_columns))
+        self.epochs = np.empty(capacity, dtype=np.int64)
+        self.times = np.empty(capacity)
+        self.size = 0
+        # The first row number of each score vector, for the stability
+        self.first = {}
+
+    def take(self, size, capacity):
+        """Return new rows with the first ``size`` rows of these."""
+        rows = _Rows(self.values.shape[1], capacity)
+        rows.values[:size] = self.values[:size]
+        rows.epochs[:size] = self.epochs[:size]
+        rows.times[:size] = self.times[:size]
+        rows.size = size
+        if size == self.size:
+            rows.first = dict(self.first)
+        else:
+            for n in range(size):
+                rows.first.setdefault(_key(rows.values[n]), n)
+        return rows
+
+
+class ScoreLog:
+    """
+    Log of the objective function scores, one row per call of ``Puzzle.logging``.
+
+    The scores are kept in a float64 matrix that doubles its capacity when it is full,
+    together with the epoch and the wall-clock time of each row.
+    Copies share the matrix until one of them appends a row, so that a neighbor
+    solution does not copy the log of the whole run.
+    """
+    def __init__(self, columns, capacity=64):
+        """
+        Parameters
+        ----------
+        columns : list of str
+            Names of the objective functions
+        capacity : int, default 64
+            Number of rows allocated first
+        """
+        self.columns = list(columns)
+        self._rows = _Rows(len(self.columns), max(capacity, 1))
+        self._size = 0
+        self._stability = 0
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Return a ScoreLog of the scores of a DataFrame, such as the one of ``to_frame``.
+
+        Parameters
+        ----------
+        frame : pandas.DataFrame
+            Scores with a column per objective function. An integer index is taken as the epochs,
+            and a "time" column as the wall-clock times.
+        """
+        columns = [column for column in frame.columns if column != "time"]
+        log = cls(columns, capacity=len(frame))
+        if pd.api.types.is_integer_dtype(frame.index.dtype):
+            epochs = frame.index.to_numpy()
+        else:
+            epochs = np.arange(len(frame))
+        times = frame["time"].to_numpy(dtype=float) if "time" in frame.columns else np.full(len(frame), time.time())
+        for scores, epoch, wall_time in zip(frame[columns].to_numpy(dtype=float), epochs, times):
+            log.append(dict(zip(columns, scores)), epoch=int(epoch), wall_time=float(wall_time))
+        return log
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return f"ScoreLog(columns={self.columns}, size={self._size})"
+
+    def __copy__(self):
+        log = self.__class__.__new__(self.__class__)
+        log.__dict__.update(self.__dict__)
+        return log
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def __getstate__(self):
+        # Pickle the rows in use only
+        state = self.__dict__.copy()
+        state["_rows"] = self._rows.take(self._size, max(self._size, 1))
+        return state
+
+    def append(self, scores, epoch=0, wall_time=None):
+        """
+        Append a row of scores.
+
+        Parameters
+        ----------
+        scores : dict
+            Scores by the names of the objective functions
+        epoch : int, default 0
+            Epoch of the scores
+        wall_time : float, optional
+            Wall-clock time of the scores. The current time is used by default.
+        """
+        rows = self._rows
+        capacity = len(rows.epochs)
+        if rows.size != self._size or self._size == capacity:
+            # Another copy has appended to the shared rows, or they are full
+            new_capacity = capacity * 2 if self._size == capacity else capacity
+            rows = self._rows = rows.take(self._size, new_capacity)
+        n = self._size
+        rows.values[n] = [scores[column] for column in self.columns]
+        rows.epochs[n] = epoch
+        rows.times[n] = time.time() if wall_time is None else wall_time
+        first = rows.first.setdefault(_key(rows.values[n]), n)
+        rows.size = self._size = n + 1
+        self._stability = n - first
+
+    @property
+    def values(self):
+        """Scores as a (rows, columns) view."""
+        return self._rows.values[:self._size]
+
+    @property
+    def epochs(self):
+        return self._rows.epochs[:self._size]
+
+    @property
+    def times(self):
+        return self._rows.times[:self._size]
+
+    @property
+    def stability(self):
+        """Number of rows since the last scores were first logged."""
+        return self._stability
+
+    def to_frame(self, wall_time=False):
+        """
+        Return the scores as a DataFrame indexed by the epoch, without copying them.
+
+        Parameters
+        ----------
+        wall_time : bool, default False
+            If True, add a "time" column of the wall-clock time.
+        """
+        frame = pd.DataFrame(self.values, columns=self.columns, index=pd.Index(self.epochs, name="epoch"), copy=False)
+        if wall_time:
+            frame["time"] = self.times
+        return frame
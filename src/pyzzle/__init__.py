@@ -1,14 +1,19 @@
 __version__ = "0.1.0"
 
 from pyzzle.Puzzle import Puzzle
-from pyzzle import futils
+try:
+    from pyzzle import futils
+except ImportError:
+    pass
 from pyzzle.Word import Word
 from pyzzle.Dictionary import Dictionary
 from pyzzle.Placeable import Placeable
 from pyzzle.ObjectiveFunction import ObjectiveFunction
 from pyzzle.Judgement import Judgement
-from pyzzle.History import HistoryItem, HistoryItemMove, HistoryCode
+from pyzzle.History import History, HistoryItem, HistoryItemMove, HistoryCode
+from pyzzle.ScoreLog import ScoreLog
 from pyzzle.Mask import Mask
+from pyzzle.Backend import Backend, get_backend, available_backends, register_backend
 
 from pyzzle.PyzzleAPI import PyzzleAPI
 from pyzzle.Gravity import Gravity
@@ -1,91 +1,135 @@
 !! -*- coding: utf-8 -*-
-subroutine add_to_limit(height, width, n, w_len_max, blank, oris, is, js, ks, words, w_lens, puzzle, enable, used_index)
+subroutine add_to_limit(height, width, n, blank, oris, is, js, ks, words, w_lens, perm, used, &
+                        puzzle, enable, cover, placed_ids, n_placed)
     implicit none
     integer, intent(in) :: height, width
-    integer, intent(in) :: n, w_len_max, blank
-    integer, dimension(:), intent(in) :: oris, is, js, ks, w_lens
+    integer, intent(in) :: n, blank
+    ! Columns of all the Placeable candidates (1-based positions, 0-based word numbers k)
+    integer, dimension(:), intent(in) :: oris, is, js, ks
+    ! Words (one per column) and their lengths indexed by k+1
     integer, dimension(:,:), intent(in) :: words
+    integer, dimension(:), intent(in) :: w_lens
+    ! Candidate numbers (1-based) in the order to visit, and the words in use indexed by k+1
+    integer, dimension(n), intent(in) :: perm
+    integer, dimension(:), intent(in) :: used
     integer, dimension(:,:), intent(inout) :: puzzle
     integer, dimension(:,:), intent(inout) :: enable
-    integer, dimension(n), intent(out) :: used_index
+    integer, dimension(:,:), intent(inout) :: cover
+    ! Candidate numbers (1-based) of the placed words in the order of placement
+    integer, dimension(n), intent(out) :: placed_ids
+    integer, intent(out) :: n_placed
 
-    integer :: w_len, a, b, i, j, k, ori, placeability
+    integer :: w_len, a, b, c, i, j, k, m, q, ori, n_live, n_next, m_end
     integer :: is_placeable
-    integer :: word(w_len_max)
     logical :: placed
+    ! The candidates are judged in blocks against the same board, in parallel if OpenMP is enabled.
+    ! A block shrinks after a placement, whose judgments after it are wasted, and grows otherwise.
+    integer, parameter :: min_block_size = 64, max_block_size = 4096
+    integer :: block_size
+    integer :: placeability(max_block_size)
+    integer :: filled
+    ! Words in use indexed by k+1
+    logical :: in_use(size(w_lens))
+    ! Positions in perm of the candidates still to be visited, in order.
+    ! The ones that can never be placed while words are only added are removed after each sweep.
+    integer :: live(n)
 
-    logical :: is_already_used
-    integer :: c, place_count
-
-    place_count = 0
-    used_index = -1
-
-    ! do i = 1, height
-    !     write(*,*) puzzle(i, 1:width)
-    ! end do
+    n_placed = 0
+    placed_ids = 0
+    in_use = used /= 0
+    live = [(a, a = 1, n)]
+    n_live = n
+    ! Number of the filled cells, updated as the words are placed
+    filled = count(puzzle /= blank)
+    block_size = min_block_size
 
     do while (.true.)
         placed = .false.
-        do a = 1, n
-            w_len = w_lens(a)
-            word = 0
-            word(1:w_len) = words(a, 1:w_len)
-            i = is(a)
-            j = js(a)
-            k = ks(a)
-            ori = oris(a)
-            is_already_used = .false.
-
-            if (place_count >= 1) then
-                do c = 1, place_count
-                    if (k == ks(used_index(c))) then
-                        is_already_used = .true.
-                        exit
-                    end if
-                end do
-            end if
-            if (is_already_used .eqv. .true.) then
-                cycle
-            end if
-            if (used_index(a) == 0) then
-                cycle
-            end if
+        n_next = 0
+        m = 1
+        do while (m <= n_live)
+            m_end = min(m + block_size - 1, n_live)
+            !$omp parallel do private(c, k) schedule(static)
+            do q = m, m_end
+                c = perm(live(q))
+                k = ks(c)
+                if (in_use(k+1)) then
+                    placeability(q-m+1) = 4 ! The same word is in use
+                else
+                    placeability(q-m+1) = is_placeable(puzzle, enable, height, width, oris(c), is(c), js(c), &
+                                                       words(1:w_lens(k+1), k+1), w_lens(k+1), blank, filled)
+                end if
+            end do
+            !$omp end parallel do
 
-            placeability = is_placeable(puzzle, enable, height, width, ori, i, j, word, w_len, blank)    
-            ! write(6,*) a, placeability
-            if (placeability /= 0) then
+            ! Visit the judged candidates in order up to the first one that can be placed
+            q = m
+            do while (q <= m_end)
+                if (placeability(q-m+1) == 0) then
+                    exit
+                end if
+                ! Only the crossing condition can change by adding words
+                if (placeability(q-m+1) == 2) then
+                    n_next = n_next + 1
+                    live(n_next) = live(q)
+                end if
+                q = q + 1
+            end do
+            if (q > m_end) then
+                m = m_end + 1
+                block_size = min(2 * block_size, max_block_size)
                 cycle
             end if
+            ! The judgments after it are made again on the new board
+            m = q + 1
+            block_size = min_block_size
+
+            a = live(q)
+            c = perm(a)
+            k = ks(c)
+            w_len = w_lens(k+1)
+            i = is(c)
+            j = js(c)
+            ori = oris(c)
             placed = .true.
-            place_count = place_count + 1
-            used_index(place_count) = a
-            ! used_k(place_count) = k
-            if (oris(a) == 0) then
+            in_use(k+1) = .true.
+            n_placed = n_placed + 1
+            placed_ids(n_placed) = c
+            if (ori == 0) then
                 do b = 1, w_len
-                    puzzle(is(a)+b-1, js(a)) = word(b) ! place character
+                    if (puzzle(i+b-1, j) == blank) then
+                        filled = filled + 1
+                    end if
+                    puzzle(i+b-1, j) = words(b, k+1) ! place character
+                    cover(i+b-1, j) = cover(i+b-1, j) + 1
                 end do
                 ! update enable
-                if (is(a)-1 >= 1) then
-                    enable(is(a)-1, js(a)) = 0
+                if (i-1 >= 1) then
+                    enable(i-1, j) = 0
                 end if
-                if (is(a)+w_len <= height) then
-                    enable(is(a)+w_len, js(a)) = 0
+                if (i+w_len <= height) then
+                    enable(i+w_len, j) = 0
                 end if
             end if
-            if (oris(a) == 1) then
+            if (ori == 1) then
                 do b = 1, w_len
-                    puzzle(is(a), js(a)+b-1) = word(b) ! place character
+                    if (puzzle(i, j+b-1) == blank) then
+                        filled = filled + 1
+                    end if
+                    puzzle(i, j+b-1) = words(b, k+1) ! place character
+                    cover(i, j+b-1) = cover(i, j+b-1) + 1
                 end do
                 ! update enable
-                if (js(a)-1 >= 1) then
-                    enable(is(a), js(a)-1) = 0
+                if (j-1 >= 1) then
+                    enable(i, j-1) = 0
                 end if
-                if (js(a)+w_len <= width) then
-                    enable(is(a), js(a)+w_len) = 0
+                if (j+w_len <= width) then
+                    enable(i, j+w_len) = 0
                 end if
             end if
         end do
 
+        n_live = n_next
         if (placed .eqv. .false.) then
             exit
         end if
@@ -93,17 +137,55 @@ subroutine add_to_limit(height, width, n, w_len_max, blank, oris, is, js, ks, wo
 end subroutine
 
 
-integer function is_placeable(puzzle, enable, height, width, ori, i, j, word, w_len, blank)
-    
+subroutine judge(height, width, n, blank, oris, is, js, ks, words, w_lens, candidates, used, puzzle, enable, codes)
+    ! Judge the candidates on the puzzle, numbered as Puzzle.is_placeable does
+    implicit none
+    integer, intent(in) :: height, width
+    integer, intent(in) :: n, blank
+    ! Columns of all the Placeable candidates (1-based positions, 0-based word numbers k)
+    integer, dimension(:), intent(in) :: oris, is, js, ks
+    ! Words (one per column) and their lengths indexed by k+1
+    integer, dimension(:,:), intent(in) :: words
+    integer, dimension(:), intent(in) :: w_lens
+    ! Candidate numbers (1-based) to judge, and the words in use indexed by k+1
+    integer, dimension(n), intent(in) :: candidates
+    integer, dimension(:), intent(in) :: used
+    integer, dimension(:,:), intent(in) :: puzzle
+    integer, dimension(:,:), intent(in) :: enable
+    integer, dimension(n), intent(out) :: codes
+
+    integer :: a, c, k, filled
+    integer :: is_placeable
+
+    filled = count(puzzle /= blank)
+    !$omp parallel do private(c, k) schedule(static)
+    do a = 1, n
+        c = candidates(a)
+        k = ks(c)
+        codes(a) = is_placeable(puzzle, enable, height, width, oris(c), is(c), js(c), &
+                                words(1:w_lens(k+1), k+1), w_lens(k+1), blank, filled)
+        ! The same word is in use, judged after the intersections
+        if (used(k+1) /= 0 .and. (codes(a) == 0 .or. codes(a) >= 5)) then
+            codes(a) = 4
+        end if
+    end do
+    !$omp end parallel do
+end subroutine
+
+
+integer function is_placeable(puzzle, enable, height, width, ori, i, j, word, w_len, blank, filled)
+
     integer, intent(in) :: ori, i, j, w_len, width, height
     integer, intent(in) :: word(w_len)
     integer, intent(in) :: puzzle(height, width)
     integer, intent(in) :: enable(height, width)
     integer, intent(in) :: blank
-    
-    integer :: check, cf, ce
-    integer :: a, b
-    logical :: is_cross_at_a, at_least_1_cross
+    ! Number of the filled cells of the puzzle
+    integer, intent(in) :: filled
+
+    integer :: cf, ce
+    integer :: a
+    logical :: is_cross_at_a, at_least_1_cross, at_least_1_blank, neighbor_filled
     
     ! ori=0:vertical, ori=1:lateral
     ! i:number of row
@@ -123,13 +205,7 @@ integer function is_placeable(puzzle, enable, height, width, ori, i, j, word, w_
     ! 6. US/USA, DOMINICA/DOMINICAN problem
     
     !---1. check if all blanks------------------------------------------------
-    check = 0
-    do a = 1, width
-        do b = 1, height
-            if (puzzle(b, a) /= blank) check = 1
-        end do
-    end do
-    if (check == 0) then
+    if (filled == 0) then
         is_placeable = 0 !The word can be placed (only succeeded)
         return
     end if
@@ -170,8 +246,11 @@ integer function is_placeable(puzzle, enable, height, width, ori, i, j, word, w_
     end if
     
     !---3.cross other words and crosses match and US/USA problem--------------------
+    ! The judgments are made in the order of the numbers, as Puzzle.is_placeable does
     if (ori == 0) then ! vertical
         at_least_1_cross = .false. !If there is a cross,  at_least_1_cross = .true.
+        at_least_1_blank = .false. !If there is a blank,  at_least_1_blank = .true.
+        neighbor_filled = .false. !If a neighbor of a blank is filled,  neighbor_filled = .true.
         do a = 1-1, w_len-1
             is_cross_at_a = .false. !If there is a cross,  is_cross_at_a = .true.
             if (puzzle(i+a, j) /= blank) then
@@ -184,13 +263,12 @@ integer function is_placeable(puzzle, enable, height, width, ori, i, j, word, w_
                     return
                 end if
             else !other than cross
-                if (j > 1 .and. puzzle(i+a, j-1) /= blank) then
-                    is_placeable = 5 !The Neighbor cells are filled except at the intersection
-                    return
+                at_least_1_blank = .true.
+                if (j > 1) then
+                    if (puzzle(i+a, j-1) /= blank) neighbor_filled = .true.
                 end if
-                if (j < width .and. puzzle(i+a, j+1) /= blank) then
-                    is_placeable = 5 !The Neighbor cells are filled except at the intersection
-                    return
+                if (j < width) then
+                    if (puzzle(i+a, j+1) /= blank) neighbor_filled = .true.
                 end if
             end if
         end do
@@ -198,6 +276,14 @@ integer function is_placeable(puzzle, enable, height, width, ori, i, j, word, w_
             is_placeable = 2 !At least one place must cross other words
             return
         end if
+        if (neighbor_filled) then
+            is_placeable = 5 !The Neighbor cells are filled except at the intersection
+            return
+        end if
+        if (at_least_1_blank .eqv. .false.) then
+            is_placeable = 6 ! US/USA, DOMINICA/DOMINICAN problem (all the cells are already filled)
+            return
+        end if
         do a = 1-1, w_len-1
             if (enable(i+a, j) == 0) then
                 is_placeable = 6 ! US/USA, DOMINICA/DOMINICAN problem
@@ -206,6 +292,8 @@ integer function is_placeable(puzzle, enable, height, width, ori, i, j, word, w_
         end do
     else if (ori == 1) then !lateral
         at_least_1_cross = .false. !If there is a cross,  at_least_1_cross = .true.
+        at_least_1_blank = .false. !If there is a blank,  at_least_1_blank = .true.
+        neighbor_filled = .false. !If a neighbor of a blank is filled,  neighbor_filled = .true.
         do a = 1-1, w_len-1
             is_cross_at_a = .false.
             if (puzzle(i, j+a) /= blank) then
@@ -218,13 +306,12 @@ integer function is_placeable(puzzle, enable, height, width, ori, i, j, word, w_
                     return
                 end if
             else !other than cross
-                if (i > 1 .and. puzzle(i-1, j+a) /= blank) then
-                    is_placeable = 5 !The Neighbor cells are filled except at the intersection
-                    return
+                at_least_1_blank = .true.
+                if (i > 1) then
+                    if (puzzle(i-1, j+a) /= blank) neighbor_filled = .true.
                 end if
-                if (i < height .and. puzzle(i+1, j+a) /= blank) then
-                    is_placeable = 5 !The Neighbor cells are filled except at the intersection
-                    return
+                if (i < height) then
+                    if (puzzle(i+1, j+a) /= blank) neighbor_filled = .true.
                 end if
             end if
         end do
@@ -232,6 +319,14 @@ integer function is_placeable(puzzle, enable, height, width, ori, i, j, word, w_
             is_placeable = 2 !At least one place must cross other words
             return
         end if
+        if (neighbor_filled) then
+            is_placeable = 5 !The Neighbor cells are filled except at the intersection
+            return
+        end if
+        if (at_least_1_blank .eqv. .false.) then
+            is_placeable = 6 ! US/USA, DOMINICA/DOMINICAN problem (all the cells are already filled)
+            return
+        end if
         do a = 1-1, w_len-1
             if (enable(i, j+a) == 0) then
                 is_placeable = 6 !US/USA, DOMINICA/DOMINICAN problem
@@ -0,0 +1,294 @@
+!! -*- coding: utf-8 -*-
+subroutine epoch(height, width, nwords, n, blank, uoris, uis, ujs, uks, order, oris, is, js, ks, words, w_lens, perm, &
+                 puzzle, enable, cover, dropped, n_collapse, n_dropped, placed_ids, n_placed)
+    ! One neighbor of the local search: collapse, kick and add_to_limit in a row
+    implicit none
+    integer, intent(in) :: height, width
+    integer, intent(in) :: nwords, n, blank
+    ! Words on the puzzle (1-based positions, 0-based word numbers k)
+    integer, dimension(nwords), intent(in) :: uoris, uis, ujs, uks
+    ! Numbers (1-based) of the words on the puzzle in the order to try dropping them
+    integer, dimension(nwords), intent(in) :: order
+    ! Columns of all the Placeable candidates (1-based positions, 0-based word numbers k)
+    integer, dimension(:), intent(in) :: oris, is, js, ks
+    ! Words (one per column) and their lengths indexed by k+1
+    integer, dimension(:,:), intent(in) :: words
+    integer, dimension(:), intent(in) :: w_lens
+    ! Candidate numbers (1-based) in the order to visit
+    integer, dimension(n), intent(in) :: perm
+    integer, dimension(:,:), intent(inout) :: puzzle
+    integer, dimension(:,:), intent(inout) :: enable
+    integer, dimension(:,:), intent(inout) :: cover
+    ! Numbers of the dropped words in the order of dropping, the first n_collapse of them by collapse
+    integer, dimension(nwords), intent(out) :: dropped
+    integer, intent(out) :: n_collapse, n_dropped
+    ! Candidate numbers (1-based) of the placed words in the order of placement
+    integer, dimension(n), intent(out) :: placed_ids
+    integer, intent(out) :: n_placed
+
+    interface
+        subroutine add_to_limit(height, width, n, blank, oris, is, js, ks, words, w_lens, perm, used, &
+                                puzzle, enable, cover, placed_ids, n_placed)
+            integer, intent(in) :: height, width
+            integer, intent(in) :: n, blank
+            integer, dimension(:), intent(in) :: oris, is, js, ks
+            integer, dimension(:,:), intent(in) :: words
+            integer, dimension(:), intent(in) :: w_lens
+            integer, dimension(n), intent(in) :: perm
+            integer, dimension(:), intent(in) :: used
+            integer, dimension(:,:), intent(inout) :: puzzle
+            integer, dimension(:,:), intent(inout) :: enable
+            integer, dimension(:,:), intent(inout) :: cover
+            integer, dimension(n), intent(out) :: placed_ids
+            integer, intent(out) :: n_placed
+        end subroutine
+    end interface
+
+    integer :: a, b, w, i, j, w_len, n_label, largest
+    logical :: alive(nwords), changed, locked
+    integer :: label(height, width)
+    integer :: sizes(0:height*width)
+    integer :: used(size(w_lens))
+
+    alive = .true.
+    dropped = 0
+    n_dropped = 0
+    n_label = 0
+
+    !---collapse: drop words at random until the connectivity breaks down-----------
+    do a = 1, nwords
+        w = order(a)
+        i = uis(w)
+        j = ujs(w)
+        w_len = w_lens(uks(w)+1)
+        ! If '2' is aligned in the cover array, the word can not be dropped
+        locked = .false.
+        do b = 1, w_len-1
+            if (uoris(w) == 0) then
+                locked = cover(i+b-1, j) == 2 .and. cover(i+b, j) == 2
+            else
+                locked = cover(i, j+b-1) == 2 .and. cover(i, j+b) == 2
+            end if
+            if (locked) then
+                exit
+            end if
+        end do
+        changed = .not. locked
+        if (changed) then
+            call drop_word(height, width, blank, puzzle, enable, cover, uoris(w), i, j, w_len)
+            alive(w) = .false.
+            n_dropped = n_dropped + 1
+            dropped(n_dropped) = w
+        end if
+        if (changed .or. a == 1) then
+            call label_components(height, width, cover, label, n_label)
+        end if
+        if (n_label >= 2) then
+            exit
+        end if
+    end do
+    n_collapse = n_dropped
+
+    !---kick: remove the words other than the largest component---------------------
+    if (nwords - n_dropped >= 1) then
+        call label_components(height, width, cover, label, n_label)
+        sizes(0:n_label) = 0
+        do j = 1, width
+            do i = 1, height
+                if (label(i, j) /= 0) then
+                    sizes(label(i, j)) = sizes(label(i, j)) + 1
+                end if
+            end do
+        end do
+        ! The first of the largest ones in the order of labeling
+        largest = 0
+        do a = 1, n_label
+            if (sizes(a) > sizes(largest)) then
+                largest = a
+            end if
+        end do
+        do w = nwords, 1, -1
+            if (alive(w) .and. label(uis(w), ujs(w)) /= largest) then
+                call drop_word(height, width, blank, puzzle, enable, cover, uoris(w), uis(w), ujs(w), w_lens(uks(w)+1))
+                alive(w) = .false.
+                n_dropped = n_dropped + 1
+                dropped(n_dropped) = w
+            end if
+        end do
+    end if
+
+    !---add as much as possible-----------------------------------------------------
+    used = 0
+    do w = 1, nwords
+        if (alive(w)) then
+            used(uks(w)+1) = 1
+        end if
+    end do
+    call add_to_limit(height, width, n, blank, oris, is, js, ks, words, w_lens, perm, used, &
+                      puzzle, enable, cover, placed_ids, n_placed)
+end subroutine
+
+
+subroutine drop_word(height, width, blank, puzzle, enable, cover, ori, i, j, w_len)
+    ! Pull out a word and release the prohibited cells before and after it, as Puzzle._drop does
+    implicit none
+    integer, intent(in) :: height, width, blank, ori, i, j, w_len
+    integer, intent(inout) :: puzzle(height, width)
+    integer, intent(inout) :: enable(height, width)
+    integer, intent(inout) :: cover(height, width)
+
+    integer :: b, e
+    logical :: remove_flag
+
+    remove_flag = .true.
+    if (ori == 0) then ! vertical
+        do b = i, i+w_len-1
+            cover(b, j) = cover(b, j) - 1
+            if (cover(b, j) == 0) then
+                puzzle(b, j) = blank
+            end if
+        end do
+        if (i > 1) then
+            if (i > 3) then
+                if (puzzle(i-3, j) /= blank .and. puzzle(i-2, j) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (j > 2) then
+                if (puzzle(i-1, j-2) /= blank .and. puzzle(i-1, j-1) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (j < width-1) then
+                if (puzzle(i-1, j+1) /= blank .and. puzzle(i-1, j+2) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (remove_flag) then
+                enable(i-1, j) = 1
+            end if
+        end if
+        e = i + w_len
+        if (e <= height) then
+            if (e < height-1) then
+                if (puzzle(e+1, j) /= blank .and. puzzle(e+2, j) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (j > 2) then
+                if (puzzle(e, j-2) /= blank .and. puzzle(e, j-1) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (j < width-1) then
+                if (puzzle(e, j+1) /= blank .and. puzzle(e, j+2) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (remove_flag) then
+                enable(e, j) = 1
+            end if
+        end if
+    else if (ori == 1) then ! lateral
+        do b = j, j+w_len-1
+            cover(i, b) = cover(i, b) - 1
+            if (cover(i, b) == 0) then
+                puzzle(i, b) = blank
+            end if
+        end do
+        if (j > 1) then
+            if (j > 3) then
+                if (puzzle(i, j-3) /= blank .and. puzzle(i, j-2) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (i > 2) then
+                if (puzzle(i-2, j-1) /= blank .and. puzzle(i-1, j-1) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (i < height-1) then
+                if (puzzle(i+1, j-1) /= blank .and. puzzle(i+2, j-1) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (remove_flag) then
+                enable(i, j-1) = 1
+            end if
+        end if
+        e = j + w_len
+        if (e <= width) then
+            if (e < width-1) then
+                if (puzzle(i, e+1) /= blank .and. puzzle(i, e+2) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (i > 2) then
+                if (puzzle(i-2, e) /= blank .and. puzzle(i-1, e) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (i < height-1) then
+                if (puzzle(i+1, e) /= blank .and. puzzle(i+2, e) /= blank) then
+                    remove_flag = .false.
+                end if
+            end if
+            if (remove_flag) then
+                enable(i, e) = 1
+            end if
+        end if
+    end if
+end subroutine
+
+
+subroutine label_components(height, width, cover, label, n_label)
+    ! Label the 4-connected components of the covered cells in the row-major order, as ndimage.label does
+    implicit none
+    integer, intent(in) :: height, width
+    integer, intent(in) :: cover(height, width)
+    integer, intent(out) :: label(height, width)
+    integer, intent(out) :: n_label
+
+    integer :: i, j, ci, cj, top
+    integer :: stack_i(height*width), stack_j(height*width)
+
+    label = 0
+    n_label = 0
+    do i = 1, height
+        do j = 1, width
+            if (cover(i, j) == 0 .or. label(i, j) /= 0) then
+                cycle
+            end if
+            n_label = n_label + 1
+            label(i, j) = n_label
+            top = 1
+            stack_i(1) = i
+            stack_j(1) = j
+            do while (top >= 1)
+                ci = stack_i(top)
+                cj = stack_j(top)
+                top = top - 1
+                call visit(ci-1, cj)
+                call visit(ci+1, cj)
+                call visit(ci, cj-1)
+                call visit(ci, cj+1)
+            end do
+        end do
+    end do
+
+contains
+
+    subroutine visit(ii, jj)
+        integer, intent(in) :: ii, jj
+        if (ii < 1 .or. ii > height .or. jj < 1 .or. jj > width) then
+            return
+        end if
+        if (cover(ii, jj) == 0 .or. label(ii, jj) /= 0) then
+            return
+        end if
+        label(ii, jj) = n_label
+        top = top + 1
+        stack_i(top) = ii
+        stack_j(top) = jj
+    end subroutine
+end subroutine
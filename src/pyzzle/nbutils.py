@@ -0,0 +1,349 @@
+"""
+Numba counterparts of the ``futils`` kernels.
+
+The functions take and return the same arrays as the f2py wrappers of ``futils``
+(1-based positions and candidate numbers, words in the columns of a table),
+so that ``Puzzle`` drives both in the same way.
+Without Numba, the functions run as plain Python.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Number of candidates judged on the same board before visiting them
+_MIN_BLOCK_SIZE = 64
+_MAX_BLOCK_SIZE = 4096
+
+
+@njit(cache=True)
+def is_placeable(puzzle, enable, ori, i, j, word, blank, filled):
+    """
+    Returns the judgment of ``Puzzle.is_placeable`` except for
+    4 (the same word is in use), for a word at the 1-based (i, j).
+    """
+    height, width = puzzle.shape
+    w_len = word.size
+    # All blanks
+    if filled == 0:
+        return 0
+    # Characters before and after
+    if ori == 0:
+        if i > 1 and puzzle[i - 2, j - 1] != blank:
+            return 1
+        if i + w_len - 1 < height and puzzle[i + w_len - 1, j - 1] != blank:
+            return 1
+    else:
+        if j > 1 and puzzle[i - 1, j - 2] != blank:
+            return 1
+        if j + w_len - 1 < width and puzzle[i - 1, j + w_len - 1] != blank:
+            return 1
+    # Crosses, in the order of the judgment numbers
+    cross = False
+    empty = False
+    neighbor = False
+    for a in range(w_len):
+        if ori == 0:
+            r, c = i - 1 + a, j - 1
+        else:
+            r, c = i - 1, j - 1 + a
+        if puzzle[r, c] != blank:
+            cross = True
+            if puzzle[r, c] != word[a]:
+                return 3
+        else:
+            empty = True
+            if ori == 0:
+                if c > 0 and puzzle[r, c - 1] != blank:
+                    neighbor = True
+                if c < width - 1 and puzzle[r, c + 1] != blank:
+                    neighbor = True
+            else:
+                if r > 0 and puzzle[r - 1, c] != blank:
+                    neighbor = True
+                if r < height - 1 and puzzle[r + 1, c] != blank:
+                    neighbor = True
+    if not cross:
+        return 2
+    if neighbor:
+        return 5
+    if not empty:
+        return 6
+    for a in range(w_len):
+        if ori == 0:
+            if enable[i - 1 + a, j - 1] == 0:
+                return 6
+        else:
+            if enable[i - 1, j - 1 + a] == 0:
+                return 6
+    return 0
+
+
+@njit(cache=True)
+def judge(height, width, blank, oris, is_, js, ks, words, w_lens, candidates, used, puzzle, enable):
+    """Judge the candidates on the puzzle, numbered as ``Puzzle.is_placeable`` does."""
+    filled = np.count_nonzero(puzzle != blank)
+    codes = np.empty(candidates.size, dtype=np.int32)
+    for a in range(candidates.size):
+        c = candidates[a] - 1
+        k = ks[c]
+        code = is_placeable(puzzle, enable, oris[c], is_[c], js[c], words[:w_lens[k], k], blank, filled)
+        # The same word is in use, judged after the intersections
+        if used[k] != 0 and (code == 0 or code >= 5):
+            code = 4
+        codes[a] = code
+    return codes
+
+
+@njit(cache=True)
+def add_to_limit(height, width, blank, oris, is_, js, ks, words, w_lens, perm, used, puzzle, enable, cover):
+    """
+    Adds the words as much as possible, visiting the candidates in the order of ``perm``.
+
+    Returns
+    -------
+    placed_ids : ndarray
+        Candidate numbers (1-based) of the placed words in the order of placement
+    n_placed : int
+        Number of the placed words
+    """
+    n = perm.size
+    placed_ids = np.zeros(n, dtype=np.int32)
+    n_placed = 0
+    in_use = used != 0
+    live = np.arange(n)
+    n_live = n
+    filled = np.count_nonzero(puzzle != blank)
+    block_size = _MIN_BLOCK_SIZE
+    placeability = np.empty(_MAX_BLOCK_SIZE, dtype=np.int32)
+    while True:
+        placed = False
+        n_next = 0
+        m = 0
+        while m < n_live:
+            m_end = min(m + block_size, n_live)
+            for q in range(m, m_end):
+                c = perm[live[q]] - 1
+                k = ks[c]
+                if in_use[k]:
+                    placeability[q - m] = 4
+                else:
+                    placeability[q - m] = is_placeable(puzzle, enable, oris[c], is_[c], js[c], words[:w_lens[k], k],
+                                                       blank, filled)
+            # Visit the judged candidates in order up to the first one that can be placed
+            q = m
+            while q < m_end and placeability[q - m] != 0:
+                # Only the crossing condition can change by adding words
+                if placeability[q - m] == 2:
+                    live[n_next] = live[q]
+                    n_next += 1
+                q += 1
+            if q == m_end:
+                m = m_end
+                block_size = min(2 * block_size, _MAX_BLOCK_SIZE)
+                continue
+            # The judgments after it are made again on the new board
+            m = q + 1
+            block_size = _MIN_BLOCK_SIZE
+
+            c = perm[live[q]] - 1
+            k = ks[c]
+            w_len = w_lens[k]
+            i = is_[c] - 1
+            j = js[c] - 1
+            placed = True
+            in_use[k] = True
+            placed_ids[n_placed] = c + 1
+            n_placed += 1
+            if oris[c] == 0:
+                for b in range(w_len):
+                    if puzzle[i + b, j] == blank:
+                        filled += 1
+                    puzzle[i + b, j] = words[b, k]
+                    cover[i + b, j] += 1
+                if i - 1 >= 0:
+                    enable[i - 1, j] = 0
+                if i + w_len < height:
+                    enable[i + w_len, j] = 0
+            else:
+                for b in range(w_len):
+                    if puzzle[i, j + b] == blank:
+                        filled += 1
+                    puzzle[i, j + b] = words[b, k]
+                    cover[i, j + b] += 1
+                if j - 1 >= 0:
+                    enable[i, j - 1] = 0
+                if j + w_len < width:
+                    enable[i, j + w_len] = 0
+        n_live = n_next
+        if not placed:
+            break
+    return placed_ids, n_placed
+
+
+@njit(cache=True)
+def _filled2(puzzle, blank, i1, j1, i2, j2):
+    return puzzle[i1, j1] != blank and puzzle[i2, j2] != blank
+
+
+@njit(cache=True)
+def drop_word(height, width, blank, puzzle, enable, cover, ori, i, j, w_len):
+    """Pull out a word at the 1-based (i, j) and release the prohibited cells as ``Puzzle._drop`` does."""
+    i, j = i - 1, j - 1
+    remove_flag = True
+    if ori == 0:
+        for b in range(i, i + w_len):
+            cover[b, j] -= 1
+            if cover[b, j] == 0:
+                puzzle[b, j] = blank
+        if i > 0:
+            if i > 2 and _filled2(puzzle, blank, i - 3, j, i - 2, j):
+                remove_flag = False
+            if j > 1 and _filled2(puzzle, blank, i - 1, j - 2, i - 1, j - 1):
+                remove_flag = False
+            if j < width - 2 and _filled2(puzzle, blank, i - 1, j + 1, i - 1, j + 2):
+                remove_flag = False
+            if remove_flag:
+                enable[i - 1, j] = 1
+        e = i + w_len
+        if e < height:
+            if e < height - 2 and _filled2(puzzle, blank, e + 1, j, e + 2, j):
+                remove_flag = False
+            if j > 1 and _filled2(puzzle, blank, e, j - 2, e, j - 1):
+                remove_flag = False
+            if j < width - 2 and _filled2(puzzle, blank, e, j + 1, e, j + 2):
+                remove_flag = False
+            if remove_flag:
+                enable[e, j] = 1
+    else:
+        for b in range(j, j + w_len):
+            cover[i, b] -= 1
+            if cover[i, b] == 0:
+                puzzle[i, b] = blank
+        if j > 0:
+            if j > 2 and _filled2(puzzle, blank, i, j - 3, i, j - 2):
+                remove_flag = False
+            if i > 1 and _filled2(puzzle, blank, i - 2, j - 1, i - 1, j - 1):
+                remove_flag = False
+            if i < height - 2 and _filled2(puzzle, blank, i + 1, j - 1, i + 2, j - 1):
+                remove_flag = False
+            if remove_flag:
+                enable[i, j - 1] = 1
+        e = j + w_len
+        if e < width:
+            if e < width - 2 and _filled2(puzzle, blank, i, e + 1, i, e + 2):
+                remove_flag = False
+            if i > 1 and _filled2(puzzle, blank, i - 2, e, i - 1, e):
+                remove_flag = False
+            if i < height - 2 and _filled2(puzzle, blank, i + 1, e, i + 2, e):
+                remove_flag = False
+            if remove_flag:
+                enable[i, e] = 1
+
+
+@njit(cache=True)
+def label_components(cover):
+    """Label the 4-connected components of the covered cells in the row-major order, as ndimage.label does."""
+    height, width = cover.shape
+    label = np.zeros((height, width), dtype=np.int32)
+    stack = np.empty((height * width, 2), dtype=np.int64)
+    n_label = 0
+    for i in range(height):
+        for j in range(width):
+            if cover[i, j] == 0 or label[i, j] != 0:
+                continue
+            n_label += 1
+            label[i, j] = n_label
+            stack[0, 0], stack[0, 1] = i, j
+            top = 1
+            while top > 0:
+                top -= 1
+                ci, cj = stack[top, 0], stack[top, 1]
+                for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                    ii, jj = ci + di, cj + dj
+                    if ii < 0 or ii >= height or jj < 0 or jj >= width:
+                        continue
+                    if cover[ii, jj] == 0 or label[ii, jj] != 0:
+                        continue
+                    label[ii, jj] = n_label
+                    stack[top, 0], stack[top, 1] = ii, jj
+                    top += 1
+    return label, n_label
+
+
+@njit(cache=True)
+def epoch(height, width, blank, uoris, uis, ujs, uks, order, oris, is_, js, ks, words, w_lens, perm, puzzle, enable, cover):
+    """
+    One neighbor of the local search: collapse, kick and add_to_limit in a row.
+
+    Returns
+    -------
+    dropped : ndarray
+        Numbers (1-based) of the dropped words in the order of dropping
+    n_collapse, n_dropped : int
+        Numbers of the words dropped by collapse and in total
+    placed_ids : ndarray
+        Candidate numbers (1-based) of the placed words in the order of placement
+    n_placed : int
+        Number of the placed words
+    """
+    nwords = uoris.size
+    alive = np.ones(nwords, dtype=np.bool_)
+    dropped = np.zeros(nwords, dtype=np.int32)
+    n_dropped = 0
+    n_label = 0
+
+    # Collapse: drop words at random until the connectivity breaks down
+    for a in range(nwords):
+        w = order[a] - 1
+        i, j = uis[w], ujs[w]
+        w_len = w_lens[uks[w]]
+        # If '2' is aligned in the cover array, the word can not be dropped
+        locked = False
+        for b in range(w_len - 1):
+            if uoris[w] == 0:
+                locked = cover[i + b - 1, j - 1] == 2 and cover[i + b, j - 1] == 2
+            else:
+                locked = cover[i - 1, j + b - 1] == 2 and cover[i - 1, j + b] == 2
+            if locked:
+                break
+        if not locked:
+            drop_word(height, width, blank, puzzle, enable, cover, uoris[w], i, j, w_len)
+            alive[w] = False
+            dropped[n_dropped] = w + 1
+            n_dropped += 1
+        if not locked or a == 0:
+            n_label = label_components(cover)[1]
+        if n_label >= 2:
+            break
+    n_collapse = n_dropped
+
+    # Kick: remove the words other than the largest component
+    if nwords - n_dropped >= 1:
+        label, n_label = label_components(cover)
+        sizes = np.zeros(n_label + 1, dtype=np.int64)
+        for i in range(height):
+            for j in range(width):
+                if label[i, j] != 0:
+                    sizes[label[i, j]] += 1
+        largest = np.argmax(sizes)
+        for w in range(nwords - 1, -1, -1):
+            if alive[w] and label[uis[w] - 1, ujs[w] - 1] != largest:
+                drop_word(height, width, blank, puzzle, enable, cover, uoris[w], uis[w], ujs[w], w_lens[uks[w]])
+                alive[w] = False
+                dropped[n_dropped] = w + 1
+                n_dropped += 1
+
+    # Add as much as possible
+    used = np.zeros(w_lens.size, dtype=np.int32)
+    for w in range(nwords):
+        if alive[w]:
+            used[uks[w]] = 1
+    placed_ids, n_placed = add_to_limit(height, width, blank, oris, is_, js, ks, words, w_lens, perm, used,
+                                        puzzle, enable, cover)
+    return dropped, n_collapse, n_dropped, placed_ids, n_placed
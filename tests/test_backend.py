@@ -0,0 +1,134 @@
+import os
+import sys
+import unittest
+import importlib.util
+from unittest import mock
+
+import numpy as np
+
+import pyzzle
+from pyzzle import Puzzle, Dictionary
+from pyzzle.Optimizer import LocalSearch
+from pyzzle.Backend import Backend, NumpyBackend, BACKENDS, available_backends, get_backend, register_backend
+
+
+class TestBackend(unittest.TestCase):
+    """Test that all the available backends agree with the NumPy one."""
+    def setUp(self):
+        self.dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        self.backends = [get_backend(name) for name in available_backends()]
+
+    def make_puzzle(self, seed):
+        puzzle = Puzzle(10, 10, seed=seed)
+        puzzle.import_dict(self.dic)
+        return puzzle
+
+    def test_get_backend(self):
+        self.assertIn("numpy", available_backends())
+        self.assertEqual(get_backend("auto").name, available_backends()[0])
+        backend = NumpyBackend()
+        self.assertIs(get_backend(backend), backend)
+        with self.assertRaises(ValueError):
+            get_backend("cuda")
+
+    def test_register_backend(self):
+        class NoBackend(NumpyBackend):
+            name = "none"
+
+            @classmethod
+            def is_available(cls):
+                return False
+
+        register_backend(NoBackend)
+        try:
+            self.assertNotIn("none", available_backends())
+            with self.assertRaises(ImportError):
+                get_backend("none")
+        finally:
+            del BACKENDS["none"]
+        with self.assertRaises(TypeError):
+            register_backend(Backend)
+
+    def test_is_placeable(self):
+        puzzle = self.make_puzzle(0)
+        puzzle.add_to_limit()
+        puzzle.collapse()
+        candidates = np.arange(puzzle._plc.size)
+        expected = puzzle.is_placeable_batch(candidates)
+        for backend in self.backends:
+            with self.subTest(backend=backend.name):
+                self.assertEqual(backend.is_placeable(puzzle, candidates).tolist(), expected.tolist())
+
+    def test_add_to_limit(self):
+        for seed in range(3):
+            results = {}
+            for backend in self.backends:
+                puzzle = self.make_puzzle(seed)
+                backend.add_to_limit(puzzle)
+                results[backend.name] = (puzzle.cell.tolist(), list(puzzle.uwords), puzzle.history)
+            for name, result in results.items():
+                with self.subTest(seed=seed, backend=name):
+                    self.assertEqual(result, results["numpy"])
+
+    def test_neighbor(self):
+        results = {}
+        for backend in self.backends:
+            puzzle = self.make_puzzle(1)
+            for _ in range(10):
+                backend.neighbor(puzzle)
+            results[backend.name] = (puzzle.cell.tolist(), puzzle.cover.tolist(), puzzle.enable.tolist(),
+                                     list(puzzle.uwords), puzzle.history, puzzle.fill_count)
+        for name, result in results.items():
+            with self.subTest(backend=name):
+                self.assertEqual(result, results["numpy"])
+
+    def test_abstract_backend(self):
+        with self.assertRaises(TypeError):
+            Backend()
+
+    def test_futils_fallback(self):
+        """Run the compiled methods of Puzzle with futils made unimportable."""
+        module = sys.modules["pyzzle.Puzzle"]
+        package = dict(vars(pyzzle))
+        package.pop("futils", None)
+        with mock.patch.dict(sys.modules, {"pyzzle.futils": None}), \
+                mock.patch.dict(vars(pyzzle), package, clear=True), mock.patch.dict(module._fallback, clear=True):
+            self.assertNotIn("fortran", available_backends())
+            backend = get_backend(available_backends()[0])
+            puzzle = self.make_puzzle(0)
+            with self.assertLogs("pyzzle.Puzzle", "WARNING"):
+                puzzle.add_to_limit_f()
+            puzzle.neighbor_f()
+            solved = self.make_puzzle(0).solve(epoch=2, optimizer=LocalSearch(show=False, use_f=True), of=["nwords"])
+        self.assertGreater(solved.nwords, 0)
+        expected = self.make_puzzle(0)
+        backend.add_to_limit(expected)
+        backend.neighbor(expected)
+        self.assertEqual(puzzle.cell.tolist(), expected.cell.tolist())
+
+    @unittest.skipUnless(importlib.util.find_spec("numba"), "Numba is not installed")
+    def test_numba_jit(self):
+        """Run the nbutils kernels compiled by Numba, not as the plain Python fallback."""
+        from numba.core.registry import CPUDispatcher
+        from pyzzle import nbutils
+        self.assertIn("numba", available_backends())
+        for name in ("is_placeable", "judge", "add_to_limit", "drop_word", "label_components", "epoch"):
+            with self.subTest(kernel=name):
+                self.assertIsInstance(getattr(nbutils, name), CPUDispatcher)
+        expected = self.make_puzzle(2)
+        for _ in range(5):
+            get_backend("numpy").neighbor(expected)
+        puzzle = self.make_puzzle(2)
+        for _ in range(5):
+            get_backend("numba").neighbor(puzzle)
+        self.assertTrue(nbutils.epoch.signatures)
+        self.assertEqual(puzzle.cell.tolist(), expected.cell.tolist())
+        self.assertEqual(puzzle.history, expected.history)
+        candidates = np.arange(puzzle._plc.size)
+        result = get_backend("numba").is_placeable(puzzle, candidates)
+        self.assertTrue(nbutils.judge.signatures)
+        self.assertEqual(result.tolist(), puzzle.is_placeable_batch(candidates).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
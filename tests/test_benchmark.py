@@ -5,6 +5,7 @@ import pytest
 
 from pyzzle import Puzzle, Dictionary, Mask, Gravity
 from pyzzle import utils
+from pyzzle.Backend import available_backends, get_backend
 
 
 def init(width=15, height=15, dictionary="pokemon"):
@@ -39,4 +40,22 @@ def test_solve_local_search_5x5_pokemon_ep10_benchmark(benchmark):
 def test_solve_local_search_10x10_pokemon_ep3_benchmark(benchmark):
     puzzle = benchmark.pedantic(solve_local_search, kwargs=dict(width=10, height=10, dictionary="pokemon", epoch=3),
                              rounds=2, iterations=1)
-    assert True
\ No newline at end of file
+    assert True
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_neighbor_30x30_pokemon_benchmark(benchmark, backend):
+    puzzle = init(width=30, height=30, dictionary="pokemon")
+    backend = get_backend(backend)
+    benchmark.pedantic(backend.neighbor, args=(puzzle,), rounds=10, iterations=1)
+    assert puzzle.nwords > 0
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("dictionary", ["r10000", "akita", "elements"])
+def test_neighbor_30x30_bundled_benchmark(benchmark, backend, dictionary):
+    puzzle = Puzzle(width=30, height=30, seed=0)
+    puzzle.import_dict(Dictionary.dataset[dictionary])
+    backend = get_backend(backend)
+    benchmark.pedantic(backend.neighbor, args=(puzzle,), rounds=10, iterations=1)
+    assert puzzle.nwords > 0
@@ -1,6 +1,13 @@
+import os
+import shutil
+import sys
+import tempfile
 import unittest
+from unittest import mock
 from pathlib import PurePath
 
+import numpy as np
+
 from pyzzle import Dictionary
 
 
@@ -12,60 +19,84 @@ class TestDictionary(unittest.TestCase):
         d += "word1"
         d += ["word2", 1]
         self.assertEqual(["word1", "word2"], d.words)
-        self.assertEqual([0, 1], d.weight)
+        self.assertEqual([0, 1], d.weight.tolist())
 
     def test_add_with_dictionary(self):
         d = Dictionary(words="word1")
         d += Dictionary(words="word2", weight=1)
         self.assertEqual(["word1", "word2"], d.words)
-        self.assertEqual([0, 1], d.weight)
+        self.assertEqual([0, 1], d.weight.tolist())
 
     def test_add_word(self):
         d = Dictionary()
         d.add("word1")
         d.add("word2", 1)
         self.assertEqual(["word1", "word2"], d.words)
-        self.assertEqual([0, 1], d.weight)
+        self.assertEqual([0, 1], d.weight.tolist())
 
     def test_add_multiple_words(self):
         d = Dictionary()
         d.add(["word1", "word2", "word3"], [0, 1, 2])
         self.assertEqual(["word1", "word2", "word3"], d.words)
-        self.assertEqual([0, 1, 2], d.weight)
+        self.assertEqual([0, 1, 2], d.weight.tolist())
 
     def test_add_duplicated_word(self):
         d = Dictionary()
         d.add("word1", 0)
         d.add("word1", 1)
         self.assertEqual(["word1"], d.words)
-        self.assertEqual([1], d.weight)
+        self.assertEqual([1], d.weight.tolist())
 
     def test_sub(self):
         d = Dictionary()
         d.add(["word1", "word2"])
         d -= "word1"
         self.assertEqual(["word2"], d.words)
-        self.assertEqual([0], d.weight)
+        self.assertEqual([0], d.weight.tolist())
 
     def test_sub_with_dictionary(self):
         d = Dictionary(words=["word1", "word2", "word3"])
         d -= Dictionary(words=["word1", "word2"])
         self.assertEqual(["word3"], d.words)
-        self.assertEqual([0], d.weight)
+        self.assertEqual([0], d.weight.tolist())
 
     def test_remove_word(self):
         d = Dictionary()
         d.add(["word1", "word2"])
         d.remove("word1")
         self.assertEqual(["word2"], d.words)
-        self.assertEqual([0], d.weight)
+        self.assertEqual([0], d.weight.tolist())
 
     def test_remove_multiple_words(self):
         d = Dictionary()
         d.add(["word1", "word2", "word3"])
         d.remove(["word1", "word2"])
         self.assertEqual(["word3"], d.words)
-        self.assertEqual([0], d.weight)
+        self.assertEqual([0], d.weight.tolist())
+
+    def test_get_k(self):
+        d = Dictionary(words=["word1", "word2", "word3"])
+        d.add("word2", 3)
+        self.assertEqual(1, d.get_k("word2"))
+        self.assertTrue(d.include("word2"))
+        self.assertEqual([0, 3, 0], d._weights[:d.size].tolist())
+        d.remove("word1")
+        self.assertEqual(["word2", "word3"], d.words)
+        self.assertEqual([0, 1], [d.get_k("word2"), d.get_k("word3")])
+        self.assertEqual([3, 0], d._weights[:d.size].tolist())
+        self.assertFalse(d.include("word1"))
+
+    def test_remove_keeps_order(self):
+        d = Dictionary(words=["a", "bb", "ccc", "dd", "e", "ff"], weight=[1, 2, 3, 4, 5, 6])
+        d.remove(["dd", "bb", "zz", "bb"])
+        self.assertEqual(["a", "ccc", "e", "ff"], d.words)
+        self.assertEqual([0, 1, 2, 3], [d.get_k(word) for word in ["a", "ccc", "e", "ff"]])
+        self.assertEqual([1, 3, 5, 6], d.weight.tolist())
+        self.assertEqual([1, 3, 1, 2], d.w_len.tolist())
+        d.remove("ff")
+        d.add("gg", 7)
+        self.assertEqual(["a", "ccc", "e", "gg"], d.words)
+        self.assertEqual([1, 3, 5, 7], d.weight.tolist())
 
     def test_iter(self):
         d = Dictionary()
@@ -84,7 +115,118 @@ class TestDictionary(unittest.TestCase):
 
     def test_w_len_property(self):
         d = Dictionary(words="word1")
-        self.assertEqual([5], d.w_len)
+        self.assertEqual([5], d.w_len.tolist())
+
+    def test_buckets_property(self):
+        d = Dictionary(words=["abc", "de", "fgh", "ij", "k"])
+        buckets = d.buckets
+        self.assertEqual([3, 2, 1], list(buckets))
+        self.assertEqual([[0, 2], [1, 3], [4]], [ks.tolist() for ks in buckets.values()])
+        self.assertIs(buckets, d.buckets)
+        d.remove("abc")
+        self.assertEqual({2: [0, 2], 3: [1], 1: [3]}, {l: ks.tolist() for l, ks in d.buckets.items()})
+        with self.assertRaises(ValueError):
+            d.w_len[0] = 1
+
+    def test_compile(self):
+        dict_dir = str(PurePath(__file__).parent / PurePath("data"))
+        expected = Dictionary(f"{dict_dir}/pokemon.txt")
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Dictionary.load_compiled(Dictionary.compile(f"{dict_dir}/pokemon.txt", f"{tmp}/pokemon.pyzd"))
+            self.assertEqual(expected.words, d.words)
+            self.assertEqual(expected.weight.tolist(), d.weight.tolist())
+            self.assertEqual(list(expected.buckets), list(d.buckets))
+            self.assertEqual(expected.letter_counts, d.letter_counts)
+            self.assertIsInstance(d.w_len, np.memmap)
+            d.add(d.words[0], 3)
+            self.assertEqual(3, d.words[0].weight)
+            self.assertEqual(0, Dictionary(f"{tmp}/pokemon.pyzd").words[0].weight)
+
+    def test_compiled_cache(self):
+        dict_dir = str(PurePath(__file__).parent / PurePath("data"))
+        with tempfile.TemporaryDirectory() as tmp:
+            fname = f"{tmp}/dict.txt"
+            shutil.copy(f"{dict_dir}/dict_with_bom.txt", fname)
+            # Reading writes nothing unless the cache is enabled
+            Dictionary(fname)
+            self.assertEqual(["dict.txt"], os.listdir(tmp))
+            with mock.patch.multiple(Dictionary, cache_compiled=True, cache_dir=f"{tmp}/cache"):
+                Dictionary(fname)
+                cache = Dictionary._cache_path(fname)
+                self.assertEqual([os.path.basename(cache)], os.listdir(f"{tmp}/cache"))
+                umask = os.umask(0)
+                os.umask(umask)
+                self.assertEqual(0o666 & ~umask, os.stat(cache).st_mode & 0o777)
+                d = Dictionary(fname)
+                self.assertIsInstance(d._weights, np.memmap)
+                self.assertEqual(["word1", "word2"], d.words)
+            # A file compiled next to the text file is loaded without enabling the cache
+            Dictionary.compile(fname)
+            d = Dictionary(fname)
+            self.assertIsInstance(d._weights, np.memmap)
+            self.assertEqual(["word1", "word2"], d.words)
+            with open(fname, "a", encoding="utf-8") as f:
+                f.write("\nword3 2")
+            d = Dictionary(fname)
+            self.assertEqual(["word1", "word2", "word3"], d.words)
+            self.assertEqual(["word1", "word2", "word3"], Dictionary(fname).words)
+
+            # A failed write leaves no temporary file behind
+            with mock.patch("numpy.ascontiguousarray", side_effect=OSError):
+                with self.assertRaises(OSError):
+                    Dictionary.compile(fname, f"{tmp}/failed.pyzd")
+            self.assertEqual(sorted(["cache", "dict.txt", "dict.txt.pyzd"]), sorted(os.listdir(tmp)))
+
+    def test_dataset(self):
+        dataset = Dictionary.Dataset()
+        self.assertIsNone(dataset._dict_list)
+        self.assertIn("aichi", dataset.dict_list)
+        d = dataset.aichi
+        cached = dataset["aichi"]
+        self.assertIs(d.words, cached.words)
+        d.add(d.words[0], 5)
+        d.add("word1")
+        self.assertIsNot(d.words, cached.words)
+        self.assertEqual(0, dataset.aichi.words[0].weight)
+        self.assertFalse(dataset.aichi.include("word1"))
+        with self.assertRaises(AttributeError):
+            dataset.foo
+
+        dataset = Dictionary.Dataset(max_bytes=sys.getsizeof(cached) + 1)
+        dataset.aichi
+        dataset.akita
+        self.assertEqual(["akita"], list(dataset._cache))
+
+    def test_match(self):
+        d = Dictionary(words=["APPLE", "ANGLE", "AMPLE", "EAGLE", "APE", "ANT"])
+        self.assertEqual([0, 1, 2], d.match("A??LE").tolist())
+        self.assertEqual([0, 2], d.match("A?PLE").tolist())
+        self.assertEqual([4, 5], d.match(["A", "", ""]).tolist())
+        self.assertEqual([0, 1, 2, 3], d.match("?????").tolist())
+        self.assertEqual([], d.match("Z????").tolist())
+        self.assertEqual([], d.match("A?????").tolist())
+        self.assertEqual([[3], [4], [3]], [ks.tolist() for ks in d.match_batch(["E????", "A?E", "E????"])])
+        d.remove("APPLE")
+        self.assertEqual([0, 1], d.match("A??LE").tolist())
+
+    def test_match_is_read_only(self):
+        d = Dictionary(words=["APE", "ANT", "EAR"])
+        for pattern in ["???", "A??", "A?T", "Z??"]:
+            with self.subTest(pattern=pattern):
+                with self.assertRaises(ValueError):
+                    d.match(pattern)[:] = 99
+        with self.assertRaises(ValueError):
+            d.buckets[3][0] = 99
+        self.assertEqual({3: [0, 1, 2]}, {l: ks.tolist() for l, ks in d.buckets.items()})
+        self.assertEqual([0, 1], d.match("A??").tolist())
+        self.assertEqual([1], d.match("??T").tolist())
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(f"{tmp}/dict.txt", "w", encoding="utf-8") as f:
+                f.write("APE\nANT\nEAR\n")
+            d = Dictionary.load_compiled(Dictionary.compile(f"{tmp}/dict.txt"))
+            with self.assertRaises(ValueError):
+                d.match("???")[0] = 99
+            self.assertEqual([0, 1, 2], d.match("???").tolist())
 
     def test_delete_bom(self):
         dict_dir = str(PurePath(__file__).parent / PurePath("data"))
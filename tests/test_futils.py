@@ -1,8 +1,11 @@
+import os
 import unittest
 from unittest import mock
 
 import numpy as np
 
+from pyzzle import Puzzle, Dictionary
+
 
 class TestFortranUtils(unittest.TestCase):
     """Test the Puzzle class."""
@@ -10,5 +13,87 @@ class TestFortranUtils(unittest.TestCase):
         from pyzzle.futils import add_to_limit
         assert 'add_to_limit' in dir()
 
+    def test_add_to_limit_same_as_python(self):
+        from pyzzle import futils
+        dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        for seed in range(5):
+            puzzle = Puzzle(8, 8, seed=seed)
+            puzzle.import_dict(dic)
+            if seed % 2 == 1:
+                # Start from a puzzle with some words
+                puzzle.add_to_limit()
+                puzzle.collapse()
+            random = puzzle._plc.permutation()
+            ori_s, i_s, j_s, k_s, words_int, w_lens = puzzle._plc.fortran_arrays()
+            used = np.zeros(w_lens.size, dtype=np.int32)
+            used[puzzle._plc.index(puzzle.uwords[:puzzle.nwords])] = 1
+            order = random[np.arange(random.size)]
+            perm = (order[used[k_s[order]] == 0] + 1).astype(np.int32)
+            cell = np.array(puzzle._board, order="F")
+            enable = np.asfortranarray(puzzle.enable.astype(np.int32))
+            cover = np.asfortranarray(puzzle.cover.astype(np.int32))
+            ids, n_placed = futils.add_to_limit(puzzle.height, puzzle.width, 0, ori_s, i_s, j_s, k_s, words_int, w_lens,
+                                                perm, used, cell, enable, cover)
+            placed = [puzzle._plc.words[k] for k in k_s[ids[:n_placed] - 1]]
+
+            nwords = puzzle.nwords
+            with mock.patch.object(puzzle._plc, "permutation", return_value=random):
+                puzzle.add_to_limit()
+            self.assertEqual(cell.tolist(), puzzle._board.tolist())
+            self.assertEqual(enable.astype(bool).tolist(), puzzle.enable.tolist())
+            self.assertEqual(cover.tolist(), puzzle.cover.tolist())
+            self.assertEqual(placed, list(puzzle.uwords[nwords:puzzle.nwords]))
+            self.assertGreater(len(placed), 0)
+
+    def test_add_to_limit_f(self):
+        dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        puzzle = Puzzle(8, 8, seed=0)
+        puzzle.import_dict(dic)
+        puzzle.add_to_limit_f()
+        self.assertEqual([h.word for h in puzzle.history], list(puzzle.uwords[:puzzle.nwords]))
+        puzzle.collapse()
+        cell, nwords = puzzle.cell.copy(), puzzle.nwords
+        puzzle.checkpoint()
+        puzzle.add_to_limit_f()
+        self.assertGreater(puzzle.nwords, nwords)
+        puzzle.rollback()
+        self.assertEqual(puzzle.cell.tolist(), cell.tolist())
+        self.assertEqual(puzzle.nwords, nwords)
+
+        # The running counters agree with a full recount
+        puzzle.add_to_limit_f()
+        counters = (puzzle.fill_count, puzzle.cross_count, puzzle.weight, puzzle._get_rect())
+        puzzle._invalidate()
+        self.assertEqual((puzzle.fill_count, puzzle.cross_count, puzzle.weight, puzzle._get_rect()), counters)
+
+    def test_neighbor_f(self):
+        dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        puzzle = Puzzle(12, 12, seed=1)
+        puzzle.import_dict(dic)
+        puzzle.add_to_limit()
+        for _ in range(10):
+            state = np.random.get_state()
+            expected = puzzle.copy(deep=True)
+            expected.collapse()
+            expected.kick()
+            expected.add_to_limit()
+            np.random.set_state(state)
+            n_history = len(puzzle.history)
+            puzzle.neighbor_f()
+            self.assertEqual(puzzle.cell.tolist(), expected.cell.tolist())
+            self.assertEqual(puzzle.cover.tolist(), expected.cover.tolist())
+            self.assertEqual(puzzle.enable.tolist(), expected.enable.tolist())
+            self.assertEqual(list(puzzle.uwords), list(expected.uwords))
+            self.assertEqual(puzzle.history[n_history:], expected.history[n_history:])
+            self.assertEqual(puzzle.fill_count, expected.fill_count)
+
+        cell, nwords = puzzle.cell.copy(), puzzle.nwords
+        puzzle.checkpoint()
+        puzzle.neighbor_f()
+        puzzle.rollback()
+        self.assertEqual(puzzle.cell.tolist(), cell.tolist())
+        self.assertEqual(puzzle.nwords, nwords)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,52 @@
+import copy
+import pickle
+import unittest
+
+from pyzzle import History, HistoryItem, HistoryItemMove, HistoryCode, Word
+
+
+class TestHistory(unittest.TestCase):
+    """Test the History class."""
+    def test_append(self):
+        items = [HistoryItem(HistoryCode.ADD, 0, 1, 2, Word("TEST", 1)),
+                 HistoryItemMove(HistoryCode.MOVE, 3, 1),
+                 HistoryItem(HistoryCode.DROP_KICK, 0, 1, 3, Word("TEST", 1))]
+        history = History(items, capacity=1)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history, items)
+        self.assertEqual(history[-1].code, HistoryCode.DROP_KICK)
+        self.assertEqual(history[-1].word.weight, 1)
+        self.assertEqual(history[1].direction, 3)
+        self.assertEqual(history[1:], items[1:])
+        self.assertEqual([hist.word for hist in history], ["TEST", None, "TEST"])
+        self.assertEqual(len(history._words), 1)
+
+    def test_copy(self):
+        history = History([HistoryItem(HistoryCode.ADD, 0, 0, 0, "AB")] * 3)
+        copied = copy.copy(history)
+        self.assertIs(copied._entries, history._entries)
+        history.truncate(2)
+        history.append(HistoryItem(HistoryCode.ADD, 1, 0, 0, "CD"))
+        copied.append(HistoryItem(HistoryCode.DROP, 0, 0, 0, "AB"))
+        self.assertEqual([hist.code for hist in history], [HistoryCode.ADD] * 3)
+        self.assertEqual(history[-1].word, "CD")
+        self.assertEqual([hist.code for hist in copied], [HistoryCode.ADD] * 3 + [HistoryCode.DROP])
+        self.assertTrue(copied.startswith(history[:2]))
+        self.assertFalse(copied.startswith(history))
+        self.assertEqual(pickle.loads(pickle.dumps(copied)), copied)
+
+    def test_snapshot(self):
+        history = History(interval=2)
+        for n in range(5):
+            history.append(HistoryItem(HistoryCode.ADD, 0, n, 0, "AB"))
+            if history.due():
+                history.snapshot(n)
+        self.assertEqual(history.restore_point(1), (0, None))
+        self.assertEqual(history.restore_point(3), (2, 1))
+        self.assertEqual(history.restore_point(5), (4, 3))
+        del history[3:]
+        self.assertEqual(history.restore_point(5), (2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@ from pathlib import PurePath
 
 import numpy as np
 
-from pyzzle import Puzzle, ObjectiveFunction
+from pyzzle import Puzzle, ObjectiveFunction, Dictionary, utils
 
 
 class TestObjectiveFunction(unittest.TestCase):
@@ -21,4 +21,62 @@ class TestObjectiveFunction(unittest.TestCase):
         of_scores = puzzle.obj_func.get_score(puzzle, all=True)
         for key, value in of_scores.items():
             print(key, value, type(value))
-            self.assertTrue(type(value) in (int, float))
\ No newline at end of file
+            self.assertTrue(type(value) in (int, float))
+
+    def test_incremental_scores(self):
+        def full_scores(puzzle):
+            weight = 0
+            for uw in puzzle.uwords[puzzle.uwords != ""]:
+                weight += uw.weight
+            rect_size = 0
+            if np.any(puzzle.cover):
+                r_min, r_max, c_min, c_max = utils.get_rect(puzzle.cover)
+                rect_size = (r_max - r_min + 1)*(c_max - c_min + 1)
+            return {
+                "weight": float(weight),
+                "cross_count": int(np.sum(puzzle.cover == 2)),
+                "fill_count": int(np.sum(puzzle.cover >= 1)),
+                "gravity": float(puzzle.gravity[puzzle.cover != 0].sum()),
+                "area_rect": int(puzzle.cell.size - rect_size),
+            }
+        for gravity in (np.arange(64).reshape(8, 8), np.linspace(0, 1, 64).reshape(8, 8)):
+            puzzle = Puzzle(8, 8, gravity=gravity, seed=3)
+            puzzle.obj_func = ObjectiveFunction(["weight", "cross_count", "fill_count", "gravity", "area_rect"])
+            puzzle.import_dict(Dictionary(PurePath(__file__).parent/"data"/"pokemon.txt"))
+            puzzle.add(0, 0, 0, "ピカチュウ", weight=3)
+            puzzle.add(1, 0, 0, "ピチュー", weight=0.5)
+            for _ in range(5):
+                puzzle.add_to_limit()
+                self.assertEqual(puzzle.obj_func.get_score(puzzle, all=True), full_scores(puzzle))
+                puzzle.collapse()
+                self.assertEqual(puzzle.obj_func.get_score(puzzle, all=True), full_scores(puzzle))
+                puzzle.kick()
+                self.assertEqual(puzzle.obj_func.get_score(puzzle, all=True), full_scores(puzzle))
+                if puzzle.nwords:
+                    puzzle.move("D", limit=True)
+                self.assertEqual(puzzle.obj_func.get_score(puzzle, all=True), full_scores(puzzle))
+
+    def test_score_vector(self):
+        def letters(puzzle):
+            return int(np.sum(puzzle.cell != ""))
+        puzzle = Puzzle.from_cell(self.cell)
+        puzzle.obj_func = ObjectiveFunction(["nwords", "cross_count_r", letters])
+        self.assertEqual(puzzle.obj_func.get_funcs(), ["nwords", "cross_count_r", "letters"])
+        self.assertEqual(puzzle.obj_func.get_score(puzzle, all=True), {"nwords": 5, "cross_count_r": -4, "letters": 12})
+        self.assertEqual(puzzle.obj_func.get_score(puzzle, func="letters"), 12)
+        score = puzzle.obj_func.score(puzzle)
+        self.assertEqual(score.dtype, np.float64)
+        self.assertEqual(score.tolist(), [5, -4, 12])
+        self.assertIs(puzzle.obj_func.score(puzzle), score)
+        puzzle.drop("ET")
+        self.assertEqual(puzzle.obj_func.score(puzzle).tolist(), [4, -3, 11])
+        other = Puzzle.from_cell(self.cell)
+        other.obj_func = ObjectiveFunction(["nwords", "cross_count_r", letters])
+        self.assertTrue(puzzle < other)
+        self.assertTrue(other >= puzzle)
+        self.assertFalse(puzzle == other)
+
+    def test_compare(self):
+        self.assertEqual(ObjectiveFunction.compare(np.array([1., 0.]), np.array([0., 5.])), 1)
+        self.assertEqual(ObjectiveFunction.compare(np.array([1., 0.]), np.array([1., 5.])), -1)
+        self.assertEqual(ObjectiveFunction.compare(np.array([1., 5.]), np.array([1., 5.])), 0)
@@ -0,0 +1,43 @@
+import os
+import unittest
+
+from pyzzle import Puzzle, Dictionary
+from pyzzle.Optimizer import LocalSearch, MultiStart
+
+
+class TestMultiStart(unittest.TestCase):
+    """Test the MultiStart class."""
+    def solve(self, n_jobs):
+        puzzle = Puzzle(8, 8, seed=0)
+        puzzle.import_dict(Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt"))
+        optimizer = MultiStart(n=3, show=False, n_jobs=n_jobs)
+        return puzzle.solve(epoch=3, optimizer=optimizer, of=["nwords", "cross_count"])
+
+    def test_seeds(self):
+        seeds = MultiStart(n=4).get_seeds(0)
+        self.assertEqual(len(set(seeds)), 4)
+        self.assertEqual(seeds, MultiStart(n=4).get_seeds(0))
+
+    def test_n_jobs(self):
+        sequential = self.solve(n_jobs=1)
+        parallel = self.solve(n_jobs=2)
+        self.assertEqual(sequential.cell.tolist(), parallel.cell.tolist())
+        self.assertEqual(sequential.seed, parallel.seed)
+        self.assertGreater(parallel.dic.size, 0)
+        self.assertGreater(parallel._plc.size, 0)
+
+
+class TestLocalSearch(unittest.TestCase):
+    """Test the LocalSearch class."""
+    def solve(self, **kwargs):
+        puzzle = Puzzle(10, 10, seed=0)
+        puzzle.import_dict(Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt"))
+        return puzzle.solve(epoch=5, optimizer=LocalSearch(show=False, **kwargs), of=["nwords", "cross_count"])
+
+    def test_backend(self):
+        self.assertEqual(self.solve().cell.tolist(), self.solve(backend="fortran").cell.tolist())
+        with self.assertRaises(ValueError):
+            LocalSearch(backend="cuda")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,8 +20,8 @@ class TestPlaceable(unittest.TestCase):
         self.assertTrue(sorted(plc.ori) == ori)
         self.assertTrue(sorted(plc.i) == i)
         self.assertTrue(sorted(plc.j) == j)
-        self.assertTrue(plc.k == k)
-        self.assertTrue(plc.word == word)
+        self.assertEqual(plc.k.tolist(), k)
+        self.assertEqual(plc.word.tolist(), word)
 
     def test_add_with_mask(self):
         mask = np.array([
@@ -42,5 +42,56 @@ class TestPlaceable(unittest.TestCase):
         self.assertEqual(sorted(plc.ori), ori)
         self.assertEqual(sorted(plc.i), i)
         self.assertEqual(sorted(plc.j), j)
-        self.assertEqual(plc.k, k)
-        self.assertEqual(plc.word, word)
+        self.assertEqual(plc.k.tolist(), k)
+        self.assertEqual(plc.word.tolist(), word)
+
+    def test_crossing(self):
+        plc = Placeable(width=5, height=5)
+        plc.add(["HOGE", "FUGA"])
+        candidates = plc.crossing([1], [2], "O")
+        self.assertEqual(len(candidates), 2)
+        for c in candidates:
+            ori, i, j, word = plc.ori[c], plc.i[c], plc.j[c], plc.word[c]
+            self.assertEqual(word, "HOGE")
+            self.assertEqual((i, j), (0, 2) if ori == 0 else (1, 1))
+        self.assertEqual(len(plc.crossing([1], [2], "X")), 0)
+
+    def test_getitem(self):
+        plc = Placeable(width=5, height=5)
+        plc.add(["HOGE", "FUGA"])
+        self.assertEqual(plc.ori.dtype, np.int8)
+        self.assertEqual(plc.k.dtype, np.int32)
+        self.assertEqual(plc[0], {"ori": 0, "i": 0, "j": 0, "word": "HOGE"})
+        self.assertEqual(plc[1], {"ori": 0, "i": 0, "j": 0, "word": "FUGA"})
+        self.assertEqual(plc["k"].tolist()[:4], [0, 1, 0, 1])
+
+    def test_lazy(self):
+        words = ["HOGE", "FUGA", "PIYO", "FOO", "BARBAZ"]
+        mask = np.zeros([6, 6], dtype=bool)
+        mask[2, 3] = True
+        plc = Placeable(width=6, height=6, words=words, mask=mask)
+        lazy = Placeable(width=6, height=6, words=words, mask=mask, lazy=True)
+        self.assertEqual(lazy.size, plc.size)
+        self.assertIsNone(lazy.k)
+        for a, b in zip(plc.columns(), lazy.columns()):
+            self.assertEqual(a.tolist(), b.tolist())
+        self.assertEqual(sorted(lazy.crossing([1], [2], "O").tolist()), sorted(plc.crossing([1], [2], "O").tolist()))
+
+    def test_lazy_permutation(self):
+        plc = Placeable(width=7, height=5, words=["HOGE", "FUGA", "FOO"], lazy=True)
+        perm = plc.permutation()
+        ranks = np.arange(plc.size)
+        candidates = perm[ranks]
+        self.assertEqual(sorted(candidates.tolist()), ranks.tolist())
+        self.assertEqual(perm.rank(candidates).tolist(), ranks.tolist())
+
+    def test_fortran_arrays(self):
+        plc = Placeable(width=5, height=5, words=["HOGE", "FOO"])
+        ori, i, j, k, codes, w_len = plc.fortran_arrays()
+        self.assertIs(plc.fortran_arrays()[4], codes)
+        self.assertTrue(codes.flags.f_contiguous)
+        self.assertEqual(w_len.tolist(), [4, 3])
+        self.assertEqual((i - 1).tolist(), plc.i.tolist())
+        plc.add("FUGA", base_k=2)
+        self.assertEqual(plc.fortran_arrays()[5].tolist(), [4, 3, 4])
+
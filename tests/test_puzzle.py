@@ -1,9 +1,11 @@
+import os
 import unittest
 from unittest import mock
 
 import numpy as np
 
-from pyzzle import Puzzle
+from pyzzle import Puzzle, Dictionary
+from pyzzle.Judgement import Judgement
 
 
 class TestPuzzle(unittest.TestCase):
@@ -102,10 +104,37 @@ class TestPuzzle(unittest.TestCase):
         self.assertTrue(np.all(puzzle.cell == dropped_cell))
         self.assertTrue(np.all(puzzle.cover == dropped_cover))
         self.assertTrue(np.all(puzzle.enable == dropped_enable))
-        self.assertTrue(np.all(puzzle.uori[:puzzle.nwords] == [1, 0, 0]))
-        self.assertTrue(np.all(puzzle.ui[:puzzle.nwords] == [1, 0, 3]))
-        self.assertTrue(np.all(puzzle.uj[:puzzle.nwords] == [0, 2, 3]))
-        self.assertTrue(np.all(puzzle.uwords[:puzzle.nwords] == ["ESTA", "STEM", "ET"]))
+        # The last word fills the slot of the dropped one, and the placement order is kept
+        self.assertTrue(np.all(puzzle.uwords[:puzzle.nwords] == ["ET", "ESTA", "STEM"]))
+        order = puzzle._placement_order()
+        self.assertTrue(np.all(puzzle.uori[order] == [1, 0, 0]))
+        self.assertTrue(np.all(puzzle.ui[order] == [1, 0, 3]))
+        self.assertTrue(np.all(puzzle.uj[order] == [0, 2, 3]))
+        self.assertTrue(np.all(puzzle.uwords[order] == ["ESTA", "STEM", "ET"]))
+        self.assertEqual(puzzle._slot_of("STEM"), 2)
+        self.assertEqual(puzzle._slot_of(ori_i_j=(0, 3, 3)), 0)
+        puzzle.drop(ori_i_j=(0, 0, 2))
+        self.assertTrue(np.all(puzzle.uwords[:puzzle.nwords] == ["ET", "ESTA"]))
+
+    def test_drop_keeps_word_ends(self, *mocks):
+        from pyzzle import Word
+        puzzle = Puzzle(4, 4)
+        puzzle.cell = np.array([
+            ['', '', 'A', ''],
+            ['', '', 'B', ''],
+            ['E', 'D', '', ''],
+            ['', '', '', '']
+        ])
+        puzzle.cover = Puzzle.get_cover(puzzle.cell)
+        puzzle.enable = puzzle.get_enable(puzzle.cell)
+        puzzle.nwords = 2
+        puzzle.uori[:2] = [0, 1]
+        puzzle.ui[:2] = [0, 2]
+        puzzle.uj[:2] = [2, 0]
+        puzzle.uwords[:2] = [Word("AB"), Word("ED")]
+        puzzle.drop("AB")
+        # The cell after "ED" stays prohibited
+        self.assertFalse(puzzle.enable[2, 2])
 
     def test_move(self, *mocks):
         import copy
@@ -241,6 +270,7 @@ class TestPuzzle(unittest.TestCase):
         ])
         puzzle = Puzzle.from_cell(cell)
         self.assertTrue(puzzle.is_unique)
+        self.assertEqual(puzzle.replaceable_pairs, [])
         cell = np.array([
             ['T', '', 'S', '', ''],
             ['E', 'S', 'T', 'A', ''],
@@ -250,6 +280,8 @@ class TestPuzzle(unittest.TestCase):
         ])
         puzzle = Puzzle.from_cell(cell)
         self.assertFalse(puzzle.is_unique)
+        self.assertEqual(puzzle.replaceable_pairs, [("EA", "ET")])
+        self.assertFalse(Puzzle(5, 5).is_unique)
     
     def test_rect(self, *mocks):
         cell = np.array([
@@ -262,5 +294,205 @@ class TestPuzzle(unittest.TestCase):
         puzzle = Puzzle.from_cell(cell)
         self.assertEqual(puzzle.rect.tolist(), cell[:4, 1:4].tolist())            
 
+    def test_add_to_limit_matches_full_scan(self, *mocks):
+        dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        puzzle = Puzzle(8, 8, seed=1)
+        puzzle.import_dict(dic)
+        puzzle.add_to_limit()
+
+        # Reference: judge every candidate in every sweep
+        expected = Puzzle(8, 8, seed=1)
+        expected.import_dict(dic)
+        random = np.arange(expected._plc.size)
+        np.random.shuffle(random)
+        nwords_tmp = None
+        while expected.nwords != nwords_tmp:
+            nwords_tmp = expected.nwords
+            drop_idx = []
+            for i, r in enumerate(random):
+                code = expected._add(expected._plc.ori[r], expected._plc.i[r], expected._plc.j[r], expected._plc.words[expected._plc.k[r]])
+                if code is not Judgement.AT_LEAST_ONE_PLACE_MUST_CROSS_OTHER_WORDS:
+                    drop_idx.append(i)
+            random = np.delete(random, drop_idx)
+
+        self.assertGreater(puzzle.nwords, 1)
+        self.assertTrue(np.all(puzzle.cell == expected.cell))
+        self.assertTrue(np.all(puzzle.uwords == expected.uwords))
+
+    def test_is_placeable_batch(self, *mocks):
+        def assert_same_codes(puzzle, candidates):
+            codes = puzzle.is_placeable_batch(candidates)
+            ori, i, j, k = puzzle._plc.take(candidates)
+            for n in range(len(candidates)):
+                word = puzzle._plc.words[k[n]]
+                self.assertEqual(codes[n], puzzle.is_placeable(ori[n], i[n], j[n], word, len(word)).value)
+            return set(codes.tolist())
+
+        dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        puzzle = Puzzle(6, 6, seed=5)
+        puzzle.import_dict(dic)
+        self.assertTrue(np.all(puzzle.is_placeable_batch(np.arange(100)) == 0))
+        found = set()
+        for _ in range(2):
+            puzzle.add_to_limit()
+            found |= assert_same_codes(puzzle, np.arange(puzzle._plc.size))
+            puzzle.collapse()
+            found |= assert_same_codes(puzzle, np.arange(puzzle._plc.size))
+        self.assertEqual(found, {0, 1, 2, 3, 4, 5})
+
+        # The prohibited cell before "DE"
+        puzzle = Puzzle(5, 5)
+        puzzle.add(0, 3, 3, "DE")
+        puzzle.import_dict(Dictionary(["XYDE"]))
+        found = assert_same_codes(puzzle, np.arange(puzzle._plc.size))
+        self.assertIn(6, found)
+
+    def test_board(self, *mocks):
+        puzzle = Puzzle(4, 3)
+        puzzle.add(1, 1, 0, "ピカチュウ"[:4])
+        self.assertEqual(puzzle._board.dtype, np.int32)
+        self.assertEqual(puzzle._board[1].tolist(), list(map(ord, "ピカチュ")))
+        self.assertEqual(puzzle._board[0].tolist(), [0, 0, 0, 0])
+        self.assertEqual(puzzle.cell.tolist(), [["", "", "", ""], ["ピ", "カ", "チ", "ュ"], ["", "", "", ""]])
+        puzzle.cell = np.array([["A", "", "", ""], ["B", "", "", ""], ["", "", "", ""]])
+        self.assertEqual(puzzle._board[:, 0].tolist(), [ord("A"), ord("B"), 0])
+
+    def test_rollback(self, *mocks):
+        dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        puzzle = Puzzle(8, 8, seed=2)
+        puzzle.import_dict(dic)
+        puzzle.add_to_limit()
+        expected = puzzle.copy()
+        score = puzzle.obj_func.score(puzzle)
+        for _ in range(3):
+            puzzle.checkpoint()
+            puzzle.collapse()
+            puzzle.kick()
+            puzzle.move("U", limit=True)
+            puzzle.add_to_limit()
+            puzzle.rollback()
+            for attr in ("cell", "cover", "enable", "uori", "ui", "uj", "uwords"):
+                self.assertTrue(np.all(getattr(puzzle, attr) == getattr(expected, attr)), attr)
+            self.assertEqual(puzzle.nwords, expected.nwords)
+            self.assertEqual(puzzle.history, expected.history)
+            self.assertIs(puzzle.obj_func.score(puzzle), score)
+            self.assertEqual(puzzle.obj_func.get_score(puzzle, all=True), expected.obj_func.get_score(expected, all=True))
+
+    def test_crossing_graph(self, *mocks):
+        def assert_graph(puzzle):
+            self.assertEqual(puzzle._get_n_components(), puzzle.component)
+            graph = {word: set(crosses) for word, crosses in puzzle._graph.items()}
+            puzzle._graph = None
+            puzzle._refresh_graph()
+            self.assertEqual(graph, puzzle._graph)
+
+        puzzle = Puzzle(5, 5)
+        puzzle.add(1, 1, 0, "ESTA")
+        self.assertEqual(puzzle._get_n_components(), 1)
+        puzzle.add(0, 0, 0, "TEST")
+        puzzle.add(0, 0, 2, "STEM")
+        self.assertEqual(puzzle._graph, {"ESTA": {"TEST", "STEM"}, "TEST": {"ESTA"}, "STEM": {"ESTA"}})
+        puzzle.drop("ESTA")
+        self.assertEqual(puzzle._get_n_components(), 2)
+
+        dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        puzzle = Puzzle(10, 10, seed=3)
+        puzzle.import_dict(dic)
+        puzzle.add_to_limit()
+        assert_graph(puzzle)
+        for n in range(6):
+            puzzle.checkpoint()
+            puzzle.collapse()
+            assert_graph(puzzle)
+            puzzle.kick()
+            assert_graph(puzzle)
+            self.assertEqual(puzzle.component, 1)
+            puzzle.add_to_limit()
+            if n % 2 == 0:
+                puzzle.rollback()
+            else:
+                puzzle.commit()
+            assert_graph(puzzle)
+
+    def test_crossing_graph_touching_words(self, *mocks):
+        puzzle = Puzzle(7, 7)
+        puzzle.add(1, 2, 0, "ABCDEF")
+        puzzle.add(0, 2, 1, "BXY")
+        puzzle.add(0, 0, 2, "PQC")
+        puzzle.add(0, 2, 4, "EGH")
+        puzzle._refresh_graph()
+        # Without "ABCDEF", "BXY" and "PQC" still touch side by side on the board
+        puzzle.drop("ABCDEF")
+        self.assertEqual(puzzle.component, 2)
+        self.assertEqual(puzzle._get_n_components(), 2)
+        self.assertEqual(puzzle._graph, {"BXY": {"PQC"}, "PQC": {"BXY"}, "EGH": set()})
+        puzzle._graph = None
+        self.assertEqual(puzzle._get_n_components(), 2)
+        # Kick keeps the largest component of the board
+        puzzle.kick()
+        self.assertEqual(sorted(puzzle.uwords[:puzzle.nwords]), ["BXY", "PQC"])
+        self.assertEqual(puzzle.component, 1)
+
+    def test_collapse_order(self, *mocks):
+        dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        puzzle = Puzzle(10, 10, seed=0)
+        puzzle.import_dict(dic)
+        puzzle.add_to_limit()
+        puzzle.drop(puzzle.uwords[puzzle._placement_order()[1]])
+        puzzle.add_to_limit()
+        order = puzzle._placement_order()
+        self.assertFalse(np.all(order == np.arange(puzzle.nwords)))
+        # Collapse draws the words to drop by shuffling the placement order
+        np.random.seed(5)
+        random = np.arange(puzzle.nwords)
+        np.random.shuffle(random)
+        expected = puzzle.uwords[:puzzle.nwords][order][random].tolist()
+        np.random.seed(5)
+        with mock.patch.object(puzzle, "_drop") as drop, mock.patch.object(puzzle, "_get_n_components", return_value=1):
+            puzzle.collapse()
+        dropped = [call.args[3] for call in drop.call_args_list]
+        self.assertGreater(len(dropped), 2)
+        self.assertEqual(dropped, [word for word in expected if word in dropped])
+
+    def test_jump(self, *mocks):
+        from pyzzle import History
+        dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        puzzle = Puzzle(8, 8, seed=1)
+        puzzle.import_dict(dic)
+        puzzle.history = History(interval=4)
+        puzzle.add_to_limit()
+        states = {len(puzzle.history): puzzle.cell.tolist()}
+        for _ in range(4):
+            puzzle.collapse()
+            puzzle.kick()
+            puzzle.add_to_limit()
+            states[len(puzzle.history)] = puzzle.cell.tolist()
+        self.assertGreater(len(puzzle.history._snapshots), 1)
+        for idx, cell in states.items():
+            jumped = puzzle.jump(idx)
+            self.assertEqual(jumped.cell.tolist(), cell)
+            self.assertEqual(jumped.history, puzzle.history[:idx])
+            self.assertIs(jumped.dic, puzzle.dic)
+        first = min(states)
+        jumped = puzzle.jump(first)
+        self.assertEqual(jumped.get_latest().cell.tolist(), puzzle.cell.tolist())
+        self.assertEqual(len(jumped.get_next(2).history), first + 2)
+        self.assertEqual(len(jumped.get_next(2).get_prev().history), first + 1)
+        with self.assertRaises(RuntimeError):
+            puzzle.jump(len(puzzle.history) + 1)
+
+    def test_copy_shares_dictionary(self, *mocks):
+        dic = Dictionary(f"{os.path.dirname(__file__)}/data/pokemon.txt")
+        puzzle = Puzzle(8, 8)
+        puzzle.import_dict(dic)
+        copied = puzzle.copy()
+        self.assertIs(copied.dic, puzzle.dic)
+        self.assertIs(copied._plc, puzzle._plc)
+        copied.add(0, 0, 0, "HOGE")
+        self.assertIsNot(copied.dic, puzzle.dic)
+        self.assertTrue(copied.dic.include("HOGE"))
+        self.assertFalse(puzzle.dic.include("HOGE"))
+        self.assertGreater(copied._plc.size, puzzle._plc.size)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+import copy
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pyzzle import Puzzle, ScoreLog
+
+
+class TestScoreLog(unittest.TestCase):
+    """Test the ScoreLog class."""
+    def test_append(self):
+        log = ScoreLog(["nwords", "weight"], capacity=2)
+        for epoch, nwords in enumerate([1, 2, 2, 3, 3, 3]):
+            log.append({"nwords": nwords, "weight": 0.5}, epoch=epoch, wall_time=float(epoch))
+        self.assertEqual(len(log), 6)
+        self.assertEqual(log.values[:, 0].tolist(), [1, 2, 2, 3, 3, 3])
+        self.assertEqual(log.epochs.tolist(), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(log.stability, 2)
+        frame = log.to_frame()
+        self.assertEqual(list(frame.columns), ["nwords", "weight"])
+        self.assertEqual(frame.index.name, "epoch")
+        self.assertTrue(np.shares_memory(frame.values, log.values))
+        self.assertEqual(log.to_frame(wall_time=True)["time"].tolist(), [0, 1, 2, 3, 4, 5])
+
+    def test_copy(self):
+        log = ScoreLog(["nwords"])
+        log.append({"nwords": 1})
+        log.append({"nwords": 2})
+        copied = copy.copy(log)
+        self.assertIs(copied.values.base, log.values.base)
+        log.append({"nwords": 2})
+        copied.append({"nwords": 3})
+        self.assertEqual(log.values[:, 0].tolist(), [1, 2, 2])
+        self.assertEqual(copied.values[:, 0].tolist(), [1, 2, 3])
+        self.assertEqual((log.stability, copied.stability), (1, 0))
+        copied.append({"nwords": 2})
+        self.assertEqual(copied.stability, 2)
+
+        loaded = pickle.loads(pickle.dumps(log))
+        self.assertEqual(loaded.values.tolist(), log.values.tolist())
+        loaded.append({"nwords": 2})
+        self.assertEqual(loaded.stability, 2)
+
+    def test_copies_of_full_log(self):
+        log = ScoreLog(["nwords"], capacity=2)
+        log.append({"nwords": 1})
+        log.append({"nwords": 2})
+        a, b = copy.copy(log), copy.copy(log)
+        a.append({"nwords": 3})
+        b.append({"nwords": 4})
+        a.append({"nwords": 4})
+        b.append({"nwords": 3})
+        self.assertEqual((a.stability, b.stability), (0, 0))
+        self.assertEqual(a.values[:, 0].tolist(), [1, 2, 3, 4])
+        self.assertEqual(b.values[:, 0].tolist(), [1, 2, 4, 3])
+
+    def test_signed_zero(self):
+        log = ScoreLog(["nwords", "weight"])
+        log.append({"nwords": 1, "weight": 0.0})
+        log.append({"nwords": 1, "weight": -0.0})
+        self.assertEqual(log.stability, 1)
+
+    def test_from_frame(self):
+        log = ScoreLog(["nwords", "weight"])
+        for epoch, nwords in enumerate([1, 2, 2]):
+            log.append({"nwords": nwords, "weight": 0.5}, epoch=epoch, wall_time=float(epoch))
+        loaded = ScoreLog.from_frame(log.to_frame(wall_time=True))
+        self.assertEqual(loaded.columns, log.columns)
+        self.assertEqual(loaded.values.tolist(), log.values.tolist())
+        self.assertEqual(loaded.epochs.tolist(), log.epochs.tolist())
+        self.assertEqual(loaded.times.tolist(), log.times.tolist())
+        self.assertEqual(loaded.stability, log.stability)
+
+        # A DataFrame assigned to Puzzle.log is kept as a ScoreLog
+        puzzle = Puzzle(5, 5)
+        puzzle.log = log.to_frame()
+        self.assertIsInstance(puzzle._log, ScoreLog)
+        self.assertTrue(puzzle.log.equals(log.to_frame()))
+        self.assertEqual(puzzle.stability, 1)
+        puzzle.log = pd.DataFrame({"nwords": [3.0, 4.0]}, index=pd.Index(["a", "b"]))
+        self.assertEqual(puzzle.log.index.tolist(), [0, 1])
+        with self.assertRaises(TypeError):
+            puzzle.log = [1, 2]
+
+
+if __name__ == '__main__':
+    unittest.main()